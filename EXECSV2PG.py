@@ -1,242 +1,19 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from tkinter import filedialog, messagebox, scrolledtext
-import pandas as pd
+from tkinter import filedialog, messagebox, scrolledtext, TclError
 import psycopg2
+import db_pool
+import import_engine
+import excel_readers
+import import_geometry
+from import_engine import sanitize_db_identifier
+from import_batch import excel_multi_sheet_to_postgres, csv_files_to_postgres # Tk'siz toplu aktarım (import_cli ile ortak)
 import os
-import glob
-import re
 import threading
 import warnings # Pandas/Geopandas uyarıları için (gerçi bu scriptte geopandas yok)
 
-# --- Yardımcı Fonksiyon: Tablo/Sütun Adlarını Güvenli Hale Getirme ---
-def sanitize_db_identifier(name, is_schema=False):
-    """
-    PostgreSQL tablo/sütun/şema adları için bir ismi güvenli hale getirir.
-    """
-    name = str(name).strip()
-    if not is_schema:
-        name = name.lower()
-    
-    name = re.sub(r'[\s\-.\(\)]+', '_', name)
-    name = re.sub(r'[^\w_]', '', name) 
-    name = re.sub(r'__+', '_', name) 
-    
-    if not name: 
-        name = "unnamed_object" if not is_schema else "public"
-    
-    if name and name[0].isdigit() and not is_schema: 
-        name = '_' + name
-        
-    name = name.strip('_')
-    return name[:63]
-
-# --- Excel İşleme Fonksiyonu (Çoklu Sayfa Destekli) ---
-def excel_multi_sheet_to_postgres(db_config, schema_name, folder_path, status_callback):
-    status_callback(f"Excel Aktarımı Başlatılıyor: {db_config.get('host')}/{db_config.get('dbname')}")
-    conn = None
-    cur = None
-    overall_success = True
-    processed_files_count = 0
-    try:
-        conn = psycopg2.connect(**db_config)
-        cur = conn.cursor()
-        status_callback("Veritabanı bağlantısı başarılı (Excel).")
-
-        safe_schema_name = sanitize_db_identifier(schema_name, is_schema=True)
-        if schema_name != safe_schema_name:
-            status_callback(f"Bilgi: Şema adı '{schema_name}' -> '{safe_schema_name}' olarak düzenlendi.")
-        status_callback(f"Şema '{safe_schema_name}' kontrol ediliyor/oluşturuluyor...")
-        cur.execute(f"CREATE SCHEMA IF NOT EXISTS \"{safe_schema_name}\";")
-        conn.commit()
-
-        xlsx_files = glob.glob(os.path.join(folder_path, '*.xlsx'))
-        if not xlsx_files:
-            status_callback("Bilgi: Seçilen klasörde XLSX dosyası bulunamadı.")
-            return
-
-        total_files = len(xlsx_files)
-        status_callback(f"Toplam {total_files} XLSX dosyası bulundu.")
-
-        for i, xlsx_path in enumerate(xlsx_files):
-            excel_file_base = os.path.splitext(os.path.basename(xlsx_path))[0]
-            status_callback(f"İşleniyor ({i+1}/{total_files}): {excel_file_base}.xlsx")
-            file_processed_at_least_one_sheet = False
-            try:
-                xls = pd.ExcelFile(xlsx_path)
-                sheet_names = xls.sheet_names
-                if not sheet_names:
-                    status_callback(f"  UYARI: {excel_file_base}.xlsx içinde sayfa bulunamadı, atlanıyor.")
-                    continue
-            except Exception as e:
-                status_callback(f"  HATA: {excel_file_base}.xlsx okunamadı/açılamadı: {e}")
-                overall_success = False
-                continue
-
-            for sheet_name in sheet_names:
-                safe_excel_base = sanitize_db_identifier(excel_file_base)
-                safe_sheet_name = sanitize_db_identifier(sheet_name)
-                table_name = f"{safe_excel_base}_{safe_sheet_name}"
-                table_name = sanitize_db_identifier(table_name) 
-                qualified_table_name = f'"{safe_schema_name}"."{table_name}"'
-                status_callback(f"  Sayfa: '{sheet_name}' -> Tablo: {qualified_table_name}")
-
-                try:
-                    df = pd.read_excel(xls, sheet_name=sheet_name)
-                    if df.empty:
-                        status_callback(f"    UYARI: '{sheet_name}' sayfası boş, atlanıyor.")
-                        continue
-
-                    original_cols = df.columns.tolist()
-                    safe_cols = []
-                    seen_cols = set()
-                    for idx, col in enumerate(original_cols):
-                        s_col = sanitize_db_identifier(col if pd.notna(col) else f"column_{idx+1}")
-                        if not s_col: s_col = f"unnamed_col_{idx+1}"
-                        temp_s_col = s_col
-                        counter = 1
-                        while temp_s_col in seen_cols:
-                            temp_s_col = f"{s_col}_{counter}"
-                            counter += 1
-                        s_col = temp_s_col
-                        safe_cols.append(s_col)
-                        seen_cols.add(s_col)
-                    df.columns = safe_cols
-                    quoted_safe_cols = [f'"{col}"' for col in safe_cols]
-
-                    cur.execute(f"DROP TABLE IF EXISTS {qualified_table_name} CASCADE;") # CASCADE eklendi
-                    create_sql = f"CREATE TABLE {qualified_table_name} ({', '.join([f'{c} TEXT' for c in quoted_safe_cols])});"
-                    cur.execute(create_sql)
-
-                    temp_csv_filename = sanitize_db_identifier(f"temp_excel_page_{table_name}") + ".csv"
-                    temp_csv_path = os.path.join(folder_path, temp_csv_filename)
-                    df.to_csv(temp_csv_path, index=False, header=False, encoding='utf-8', quoting=1)
-                    with open(temp_csv_path, 'r', encoding='utf-8') as f:
-                        copy_sql = f"COPY {qualified_table_name} ({', '.join(quoted_safe_cols)}) FROM STDIN WITH (FORMAT CSV, HEADER FALSE, ENCODING 'UTF8')"
-                        cur.copy_expert(sql=copy_sql, file=f)
-                    conn.commit()
-                    if os.path.exists(temp_csv_path): os.remove(temp_csv_path)
-                    status_callback(f"    '{qualified_table_name}' başarıyla aktarıldı.")
-                    file_processed_at_least_one_sheet = True
-                except Exception as e:
-                    conn.rollback()
-                    status_callback(f"    HATA ({qualified_table_name}): {e}")
-                    overall_success = False
-            if file_processed_at_least_one_sheet:
-                processed_files_count +=1
-        
-        if processed_files_count == total_files and total_files > 0:
-             status_callback(f"Tüm {total_files} Excel dosyası ve sayfaları başarıyla işlendi.")
-        elif processed_files_count > 0:
-             status_callback(f"{processed_files_count}/{total_files} Excel dosyası kısmen veya tamamen işlendi. Detaylar için logları kontrol edin.")
-        elif total_files > 0:
-             status_callback(f"Hiçbir Excel dosyası başarıyla işlenemedi. Detaylar için logları kontrol edin.")
-
-
-    except Exception as e:
-        status_callback(f"Excel Aktarımında Genel HATA: {e}")
-        overall_success = False
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
-        status_callback("Veritabanı bağlantısı kapatıldı (Excel).")
-    return overall_success
-
-# --- CSV İşleme Fonksiyonu ---
-def csv_files_to_postgres(db_config, schema_name, folder_path, status_callback):
-    status_callback(f"CSV Aktarımı Başlatılıyor: {db_config.get('host')}/{db_config.get('dbname')}")
-    conn = None
-    cur = None
-    overall_success = True
-    processed_files_count = 0
-    try:
-        conn = psycopg2.connect(**db_config)
-        cur = conn.cursor()
-        status_callback("Veritabanı bağlantısı başarılı (CSV).")
-
-        safe_schema_name = sanitize_db_identifier(schema_name, is_schema=True)
-        if schema_name != safe_schema_name:
-            status_callback(f"Bilgi: Şema adı '{schema_name}' -> '{safe_schema_name}' olarak düzenlendi.")
-        status_callback(f"Şema '{safe_schema_name}' kontrol ediliyor/oluşturuluyor...")
-        cur.execute(f"CREATE SCHEMA IF NOT EXISTS \"{safe_schema_name}\";")
-        conn.commit()
-
-        csv_files = glob.glob(os.path.join(folder_path, '*.csv'))
-        if not csv_files:
-            status_callback("Bilgi: Seçilen klasörde CSV dosyası bulunamadı.")
-            return
-            
-        total_files = len(csv_files)
-        status_callback(f"Toplam {total_files} CSV dosyası bulundu.")
-
-        for i, csv_path in enumerate(csv_files):
-            csv_file_base = os.path.splitext(os.path.basename(csv_path))[0]
-            table_name = sanitize_db_identifier(csv_file_base)
-            qualified_table_name = f'"{safe_schema_name}"."{table_name}"'
-            status_callback(f"İşleniyor ({i+1}/{total_files}): {csv_file_base}.csv -> Tablo: {qualified_table_name}")
-            try:
-                # CSV okurken olası encoding sorunları için bir deneme
-                try:
-                    df = pd.read_csv(csv_path, encoding='utf-8')
-                except UnicodeDecodeError:
-                    status_callback(f"  UYARI: {csv_file_base}.csv UTF-8 ile okunamadı, 'latin1' ile deneniyor.")
-                    df = pd.read_csv(csv_path, encoding='latin1')
-                
-                if df.empty:
-                    status_callback(f"  UYARI: {csv_file_base}.csv dosyası boş, atlanıyor.")
-                    continue
-
-                original_cols = df.columns.tolist()
-                safe_cols = []
-                seen_cols = set()
-                for idx, col in enumerate(original_cols):
-                    s_col = sanitize_db_identifier(col if pd.notna(col) else f"column_{idx+1}")
-                    if not s_col: s_col = f"unnamed_col_{idx+1}"
-                    temp_s_col = s_col
-                    counter = 1
-                    while temp_s_col in seen_cols:
-                        temp_s_col = f"{s_col}_{counter}"
-                        counter += 1
-                    s_col = temp_s_col
-                    safe_cols.append(s_col)
-                    seen_cols.add(s_col)
-                df.columns = safe_cols
-                quoted_safe_cols = [f'"{col}"' for col in safe_cols]
-
-                cur.execute(f"DROP TABLE IF EXISTS {qualified_table_name} CASCADE;") # CASCADE eklendi
-                create_sql = f"CREATE TABLE {qualified_table_name} ({', '.join([f'{c} TEXT' for c in quoted_safe_cols])});"
-                cur.execute(create_sql)
-
-                temp_csv_filename = sanitize_db_identifier(f"temp_csv_direct_{table_name}") + ".csv"
-                temp_csv_for_copy = os.path.join(folder_path, temp_csv_filename)
-                df.to_csv(temp_csv_for_copy, index=False, header=False, encoding='utf-8', quoting=1)
-                with open(temp_csv_for_copy, 'r', encoding='utf-8') as f:
-                    copy_sql = f"COPY {qualified_table_name} ({', '.join(quoted_safe_cols)}) FROM STDIN WITH (FORMAT CSV, HEADER FALSE, ENCODING 'UTF8')"
-                    cur.copy_expert(sql=copy_sql, file=f)
-                conn.commit()
-                if os.path.exists(temp_csv_for_copy): os.remove(temp_csv_for_copy)
-                status_callback(f"  '{qualified_table_name}' başarıyla aktarıldı.")
-                processed_files_count +=1
-            except Exception as e:
-                conn.rollback()
-                status_callback(f"  HATA ({qualified_table_name}): {e}")
-                overall_success = False
-        
-        if processed_files_count == total_files and total_files > 0:
-             status_callback(f"Tüm {total_files} CSV dosyası başarıyla işlendi.")
-        elif processed_files_count > 0:
-             status_callback(f"{processed_files_count}/{total_files} CSV dosyası kısmen veya tamamen işlendi. Detaylar için logları kontrol edin.")
-        elif total_files > 0:
-             status_callback(f"Hiçbir CSV dosyası başarıyla işlenemedi. Detaylar için logları kontrol edin.")
-
-    except Exception as e:
-        status_callback(f"CSV Aktarımında Genel HATA: {e}")
-        overall_success = False
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
-        status_callback("Veritabanı bağlantısı kapatıldı (CSV).")
-    return overall_success
+# Arayüzde gösterilen yükleme modu adı -> import_engine yükleme modu
+LOAD_MODE_LABELS = {label: mode for mode, label in import_engine.LOAD_MODES.items()}
 
 # --- Ana GUI Sınıfı ---
 class DataImporterApp:
@@ -253,6 +30,13 @@ class DataImporterApp:
         self.user_var = ttk.StringVar(value='postgres')
         self.password_var = ttk.StringVar(value='postgres')
         self.schema_var = ttk.StringVar(value='public')
+        self.workers_var = ttk.IntVar(value=1)
+        self.excel_engine_var = ttk.StringVar(value='auto')
+        self.infer_types_var = ttk.BooleanVar(value=True)
+        self.build_geometry_var = ttk.BooleanVar(value=True)
+        self.srid_var = ttk.IntVar(value=import_geometry.DEFAULT_SRID)
+        self.load_mode_var = ttk.StringVar(value=next(iter(LOAD_MODE_LABELS)))
+        self.upsert_key_var = ttk.StringVar(value='')
         self.folder_path_display_var = ttk.StringVar(value="Lütfen dosyaların bulunduğu klasörü seçin.")
         self.selected_folder_internal = ""
 
@@ -302,6 +86,37 @@ class DataImporterApp:
         self.select_folder_button.pack(side=RIGHT)
         self.update_folder_label() 
 
+        # --- YENİ: Paralel Aktarım Ayarı ---
+        workers_frame = ttk.Frame(action_frame)
+        workers_frame.pack(fill=X)
+        ttk.Label(workers_frame, text="Paralel İşçi Sayısı (1 = sıralı):").pack(side=LEFT, padx=(0, 5))
+        ttk.Spinbox(workers_frame, textvariable=self.workers_var, from_=1, to=max(os.cpu_count() or 1, 1) * 2,
+                    width=5).pack(side=LEFT)
+        # YENİ: Excel okuma motoru ('auto' = kurulu en hızlı motor)
+        ttk.Label(workers_frame, text="Excel Okuma Motoru:").pack(side=LEFT, padx=(15, 5))
+        ttk.Combobox(workers_frame, textvariable=self.excel_engine_var, state="readonly", width=10,
+                     values=['auto'] + excel_readers.available_excel_readers()).pack(side=LEFT)
+        # YENİ: Sütun tipleri örnekten tahmin edilir (kapalıysa bütün sütunlar TEXT)
+        ttk.Checkbutton(workers_frame, text="Sütun tiplerini tahmin et", variable=self.infer_types_var,
+                        bootstyle="round-toggle").pack(side=LEFT, padx=(15, 0))
+
+        # --- YENİ: Geometri Oluşturma Ayarı (lat/lon, x/y veya WKT sütunlarından 'geom') ---
+        geometry_frame = ttk.Frame(action_frame)
+        geometry_frame.pack(fill=X, pady=(5, 0))
+        ttk.Checkbutton(geometry_frame, text="Koordinat/WKT sütunlarından geometri oluştur", variable=self.build_geometry_var,
+                        bootstyle="round-toggle").pack(side=LEFT, padx=(0, 15))
+        ttk.Label(geometry_frame, text="SRID:").pack(side=LEFT, padx=(0, 5))
+        ttk.Entry(geometry_frame, textvariable=self.srid_var, width=8).pack(side=LEFT)
+
+        # --- YENİ: Yükleme Modu (tabloyu baştan yaz veya anahtar sütun(lar)la artımlı birleştir) ---
+        load_mode_frame = ttk.Frame(action_frame)
+        load_mode_frame.pack(fill=X, pady=(5, 0))
+        ttk.Label(load_mode_frame, text="Yükleme Modu:").pack(side=LEFT, padx=(0, 5))
+        ttk.Combobox(load_mode_frame, textvariable=self.load_mode_var, state="readonly", width=16,
+                     values=list(LOAD_MODE_LABELS)).pack(side=LEFT)
+        ttk.Label(load_mode_frame, text="Anahtar Sütun(lar):").pack(side=LEFT, padx=(15, 5))
+        ttk.Entry(load_mode_frame, textvariable=self.upsert_key_var, width=25).pack(side=LEFT, fill=X, expand=YES)
+
         # --- Aktarım Butonu ---
         self.transfer_button = ttk.Button(action_frame, text="Veritabanına Aktar", command=self.start_transfer_thread, bootstyle=SUCCESS)
         self.transfer_button.pack(fill=X, ipady=8, pady=(10,0))
@@ -382,12 +197,14 @@ class DataImporterApp:
         self.root.after(100, self._check_thread_completion, thread, "Bağlantı testi")
 
     def _execute_test_connection(self, db_config):
+        pool = db_pool.get_pool(db_config)
         conn = None
         try:
             with warnings.catch_warnings(): # Pandas uyarılarını bastır
                 warnings.simplefilter("ignore", UserWarning)
-                conn = psycopg2.connect(**db_config, connect_timeout=5)
+                conn = pool.acquire(check=True) # Havuzdaki bağlantı olsa bile 'SELECT 1' ile denetlenir
             self.log_status_thread_safe("Bağlantı testi BAŞARILI!")
+            self.log_status_thread_safe(pool.format_stats())
         except psycopg2.Error as e:
             self.log_status_thread_safe(f"Bağlantı testi BAŞARISIZ: {e}")
             messagebox.showerror("Bağlantı Testi Başarısız", f"Bağlantı kurulamadı:\n{e}", parent=self.root)
@@ -395,7 +212,7 @@ class DataImporterApp:
             self.log_status_thread_safe(f"Bağlantı testi sırasında beklenmedik HATA: {e}")
             messagebox.showerror("Bağlantı Testi Hatası", f"Beklenmedik bir hata oluştu:\n{e}", parent=self.root)
         finally:
-            if conn: conn.close()
+            pool.release(conn)
             # Butonlar _check_thread_completion tarafından aktif edilecek
 
 
@@ -413,6 +230,26 @@ class DataImporterApp:
             if not messagebox.askyesno("Şifre Eksik", "PostgreSQL şifresi girmediniz. Devam etmek istiyor musunuz?", parent=self.root):
                 return
         
+        try:
+            workers = max(int(self.workers_var.get()), 1)
+        except (ValueError, TclError):
+            messagebox.showerror("Hata", "Paralel işçi sayısı geçerli bir sayı olmalıdır.", parent=self.root)
+            return
+        try:
+            srid = int(self.srid_var.get())
+            if srid <= 0:
+                raise ValueError
+        except (ValueError, TclError):
+            messagebox.showerror("Hata", "SRID pozitif bir tam sayı olmalıdır (ör. 4326).", parent=self.root)
+            return
+
+        load_mode = LOAD_MODE_LABELS[self.load_mode_var.get()]
+        upsert_key = tuple(sanitize_db_identifier(col.strip()) for col in self.upsert_key_var.get().split(',') if col.strip())
+        if load_mode == 'upsert' and not upsert_key:
+            messagebox.showerror("Eksik Bilgi", "Artımlı yükleme için en az bir anahtar sütun girin (virgülle ayırarak).",
+                                 parent=self.root)
+            return
+
         folder_path = self.selected_folder_internal
         source_type = self.source_type_var.get()
         if not folder_path or not os.path.isdir(folder_path):
@@ -426,8 +263,12 @@ class DataImporterApp:
         self.log_status_thread_safe(f"{source_type} aktarım işlemi başlatılıyor...")
 
         target_function = None
+        transfer_kwargs = {'workers': workers, 'infer_types': self.infer_types_var.get(),
+                           'build_geometry': self.build_geometry_var.get(), 'srid': srid,
+                           'load_mode': load_mode, 'upsert_key': upsert_key}
         if source_type == "Excel":
             target_function = excel_multi_sheet_to_postgres
+            transfer_kwargs['engine'] = self.excel_engine_var.get()
         elif source_type == "CSV":
             target_function = csv_files_to_postgres
         
@@ -435,6 +276,7 @@ class DataImporterApp:
             transfer_thread = threading.Thread(
                 target=target_function,
                 args=(db_config, schema_name, folder_path, self.log_status_thread_safe),
+                kwargs=transfer_kwargs,
                 daemon=True
             )
             transfer_thread.start()
@@ -456,3 +298,4 @@ if __name__ == "__main__":
     main_root = ttk.Window(themename="darkly") # Koyu tema: darkly, superhero, cyborg
     app = DataImporterApp(main_root)
     main_root.mainloop()
+    db_pool.close_all()
@@ -1,15 +1,74 @@
+import time
+STARTUP_T0 = time.perf_counter() # Başlangıç ölçümü (ilk pencere / ilk sorgu) bu andan itibaren yapılır
+import json
+import os
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from tkinter import filedialog, messagebox, scrolledtext, Toplevel
+from tkinter import filedialog, messagebox, scrolledtext, Toplevel, TclError
 import psycopg2
-import geopandas as gpd
-from tkintermapview import TkinterMapView
+from tkintermapview import TkinterMapView, osm_to_decimal
 from PIL import Image, ImageTk, ImageDraw
+import io
+import math
 import threading
 import warnings
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import sqlite3
+import numpy as np
 from tkinter import Toplevel
-from EXECSV2PG import DataImporterApp 
+import db_pool
+import map_layers
+import map_render
+import lazy_modules
+import result_cache
+import tile_cache
+import vector_tiles
+from data_grid import VirtualDataGrid, format_cell
+
+# --- YENİ: Gecikmeli Yüklenen Modüller ---
+# pandas/geopandas (query_engine) ve içe aktarma aracı (EXECSV2PG) pencere açılmadan yüklenmez;
+# pencere gösterildikten sonra arka planda ısıtılır, ısınma bitmeden kullanılırlarsa o anda yüklenir.
+pd = lazy_modules.LazyModule('pandas')
+query_engine = lazy_modules.LazyModule('query_engine')
+WARM_UP_MODULES = ('pandas', 'geopandas', 'query_engine', 'EXECSV2PG')
+# Ayarlanırsa başlangıç ölçümleri stdout'a JSON olarak yazılır ve ısınma bitince pencere kapanır
+# (benchmarks/bench_startup.py kullanır)
+STARTUP_BENCH_ENV = 'GEOPG_STARTUP_BENCH'
+
+# --- Harita Görünümü Takibi ---
+VIEW_POLL_MS = 150      # Harita kapsamının kontrol edilme aralığı
+VIEW_DEBOUNCE_MS = 400  # Kaydırma/zoom bittikten sonra yeniden sorgu için beklenen süre
+
+# --- Detay Seviyesi (LOD) Modları ---
+LOD_MODES = {
+    "Kapalı": 'off',
+    "İstemci (shapely)": 'client',
+    "Sunucu (SQL)": 'server',
+}
+
+# Ayarlanırsa altlık listesine bu URL şablonuyla "Yerel Karo Sunucusu" eklenir
+LOCAL_TILE_SERVER_ENV = 'GEOPG_TILE_SERVER'
+
+QUERY_TIMEOUT_S = 120  # Varsayılan sorgu zaman aşımı (saniye); 0 sınırsız
+
+# --- Çizim Motorları ---
+RENDERERS = {
+    "Otomatik": 'auto',
+    "Vektör (Tk)": 'vector',
+    "Raster (PIL)": 'raster',
+}
+
+# --- Nokta Gösterim Modları ---
+POINT_MODES = {
+    "Her Nokta Ayrı": 'single',
+    "Kümeleme": 'cluster',
+}
+
+# --- Obje Sorgulama (Tıklama) ve Seçim ---
+SELECTION_HIGHLIGHT_LIMIT = 1000  # Haritada vurgulanacak en fazla seçili obje (fazlası yalnızca tabloda seçilir)
+IDENTIFY_MAX_FIELDS = 6           # Tıklanan objenin etiketinde gösterilecek en fazla öznitelik
+BOX_SELECT_MIN_PX = 4             # Bundan küçük sürüklemeler kutu seçimi sayılmaz
 
 # --- KÜÇÜK DAİRE İKONU OLUŞTURMA ---
 def create_small_circle_icon(size, color_tuple):
@@ -19,6 +78,63 @@ def create_small_circle_icon(size, color_tuple):
     draw.ellipse((0, 0, size - 1, size - 1), fill=color_tuple, outline=color_tuple)
     return ImageTk.PhotoImage(image)
 
+# --- KÜME İKONU OLUŞTURMA ---
+def create_cluster_icon(size, fill_tuple, outline_tuple):
+    """Nokta kümeleri için kenarlıklı, yarı saydam dairesel bir PIL Image nesnesi oluşturur."""
+    image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((0, 0, size - 1, size - 1), fill=fill_tuple, outline=outline_tuple, width=2)
+    return ImageTk.PhotoImage(image)
+
+# --- YENİ: Önbellekli Harita Widget'ı ---
+TILE_MEMORY_BASEMAPS = 2  # Bellekte (PhotoImage) karoları tutulan altlık sayısı (etkin + bir önceki)
+
+
+class CachedTileMapView(TkinterMapView):
+    """
+    Karoları doğrudan sunucudan değil, altlığın tile_cache.TileSource'undan (MBTiles + ağ) yükleyen
+    TkinterMapView. Altlık değiştirildiğinde bellekteki karolar silinmez, altlık adıyla saklanır.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.tile_source = None
+        self._basemap_images = {}
+        super().__init__(*args, **kwargs)
+
+    def set_tile_source(self, source, max_zoom=19):
+        if self.tile_source is not None:
+            self._basemap_images[self.tile_source.name] = self.tile_image_cache
+        images = self._basemap_images.pop(source.name, {})
+        while len(self._basemap_images) >= TILE_MEMORY_BASEMAPS:
+            self._basemap_images.pop(next(iter(self._basemap_images)))
+        # TkinterMapView.set_tile_server ile aynı, ancak bellekteki karolar atılmaz: daha önce
+        # görüntülenmiş altlığa dönüldüğünde karolar ağ ve disk beklenmeden çizilir
+        self.tile_source = source
+        self.image_load_queue_tasks = []
+        self.max_zoom = max_zoom
+        self.tile_server = source.url_template
+        self.tile_image_cache = images
+        self.canvas.delete("tile")
+        self.image_load_queue_results = []
+        self.draw_initial_array()
+
+    def request_image(self, zoom, x, y, db_cursor=None):
+        source = self.tile_source
+        if source is None:
+            return super().request_image(zoom, x, y, db_cursor=db_cursor)
+        data = source.get(zoom, x, y)
+        if data is None or not self.running:
+            # Bellek önbelleğine yazılmaz; çevrimiçi olunca veya karo tekrar görününce yeniden denenir
+            return self.empty_tile_image
+        try:
+            image_tk = ImageTk.PhotoImage(Image.open(io.BytesIO(data)))
+        except Exception:
+            return self.empty_tile_image
+        if source is self.tile_source:
+            self.tile_image_cache[f"{zoom}{x}{y}"] = image_tk
+        return image_tk
+
+
 class PostGISApp:
     def __init__(self, root):
         self.root = root
@@ -30,9 +146,49 @@ class PostGISApp:
         self.create_menubar()
         # --- YENİ BÖLÜM SONU ---
 
+        # --- YENİ: Başlangıç Ölçümleri (ilk pencere, arka plan ısınması, ilk sorgu) ---
+        self.startup_marks = {}
+        self._first_query_started = None
+        self._startup_bench = bool(os.environ.get(STARTUP_BENCH_ENV))
+        self.root.bind("<Map>", self._on_first_map, add="+")
+        # --- YENİ BÖLÜM SONU ---
+
         self.db_params = None
         self.connection_window = None
+        self._query_generation = 0 # Her yeni sorguda artar; eski sorguların çizimleri bu sayede durdurulur
+        self._active_query_conn = None
+        self._last_query_sql = None
+        self._current_gdf = None      # Son sonucun tam detaylı hali (LOD yeniden sadeleştirmesi için)
+        self._current_options = None
+        self._lod_zoom = None
+        self._cluster_index = None    # Nokta kümeleme indeksi (sonuç kümesi başına bir kez kurulur)
+        self._feature_index = None    # _current_gdf üzerindeki STRtree (map_render.FeatureIndex)
+        self._culled = None           # Görünüm ayıklamalı çizimin durumu (hangi satırlar çizildi)
+        self._highlight_items = []    # Seçili objelerin vurgu nesneleri
+        self._identify_marker = None
+        self._box_select_origin = None
+        self._cluster_markers = []
+        self._cluster_icons = {}
+        self._raster_layer = None     # Raster çizim motorunun projekte edilmiş koordinat önbelleği
+        self._raster_photo = None
+        self._raster_origin = None
+        self._raster_token = 0
+        self._raster_render_pending = False
+        self._result_cache = None     # İlk kullanımda açılır (bkz. _get_result_cache)
+        self._tree_tables = {}        # Ağaçtaki tablo öğesi -> geometry_columns bilgisi (karo katmanı için)
+        self._vector_layer = None     # Açık vektör karo katmanı (vector_tiles.VectorTileLayer)
+        self._vector_tile_items = {}  # (z, x, y) -> (canvas öğesi, PhotoImage); boş karolar (None, None)
+        self._vector_tiles_wanted = set()
+        self._vector_tile_generation = 0
+        self._vector_tile_executor = None
+        self._query_layers = []          # Sorgu katmanları, üstten alta çizim sırasıyla (map_layers.QueryLayer)
+        self._layer_items = {}           # Katman id -> (PhotoImage, (sol üst karo, zoom)) son çizilen görüntü
+        self._layer_render_wanted = {}   # Katman id -> en son istenen çizimin numarası (eski çizimler atılır)
+        self._layer_render_token = 0
+        self._layer_fetch_executor = None
+        self._layer_render_executor = None
         self.small_orange_icon = create_small_circle_icon(10, (255, 165, 0, 255))
+        self.highlight_icon = create_small_circle_icon(14, (0, 255, 255, 255))
 
         main_paned_window = ttk.PanedWindow(self.root, orient=HORIZONTAL)
         main_paned_window.pack(fill=BOTH, expand=YES, padx=10, pady=10)
@@ -47,6 +203,57 @@ class PostGISApp:
         self.db_tree.pack(fill=BOTH, expand=YES)
         self.db_tree.bind("<Double-1>", self.on_tree_double_click)
         self.db_tree.heading("#0", text="Şema / Tablo", anchor=W)
+        # YENİ: Seçili tablo, sonuç kümesi çekilmeden sunucuda üretilen vektör karolarla (ST_AsMVT) gösterilir
+        tile_layer_frame = ttk.Frame(sidebar_frame)
+        tile_layer_frame.pack(side=TOP, fill=X, pady=(5, 0))
+        ttk.Button(tile_layer_frame, text="Karo Katmanı Olarak Aç", command=self.open_vector_tile_layer,
+                   bootstyle=INFO).pack(side=LEFT, fill=X, expand=YES)
+        ttk.Button(tile_layer_frame, text="Kapat", command=self.close_vector_tile_layer,
+                   bootstyle=SECONDARY).pack(side=LEFT, padx=(5, 0))
+
+        # YENİ: Sorgu katmanları - her katman kendi sorgusu, rengi ve görünürlüğüyle ayrı bir görüntü olarak
+        # çizilir; katmanlar arka planda paralel çekilir, gizleme/sıralama/renk değişikliği sorguyu tekrarlamaz
+        layers_frame = ttk.LabelFrame(sidebar_frame, text="Sorgu Katmanları", padding=5)
+        layers_frame.pack(side=TOP, fill=X, pady=(10, 0))
+        self.layer_tree = ttk.Treeview(layers_frame, columns=("visible", "color", "rows", "memory", "status"),
+                                       height=6, selectmode="browse", bootstyle=INFO)
+        self.layer_tree.heading("#0", text="Katman", anchor=W)
+        self.layer_tree.column("#0", width=110)
+        for column, heading, width in (("visible", "Görünür", 55), ("color", "Renk", 75), ("rows", "Obje", 60),
+                                       ("memory", "MB", 50), ("status", "Durum", 90)):
+            self.layer_tree.heading(column, text=heading, anchor=W)
+            self.layer_tree.column(column, width=width, stretch=False)
+        self.layer_tree.pack(fill=X)
+        self.layer_tree.bind("<Double-1>", lambda e: self.toggle_query_layer())
+        self.layer_tree.bind("<<TreeviewSelect>>", self._on_query_layer_selected)
+        layer_buttons = ttk.Frame(layers_frame)
+        layer_buttons.pack(fill=X, pady=(5, 0))
+        ttk.Button(layer_buttons, text="Göster/Gizle", command=self.toggle_query_layer,
+                   bootstyle=INFO).pack(side=LEFT, fill=X, expand=YES)
+        ttk.Button(layer_buttons, text="▲", width=3, command=lambda: self.move_query_layer(-1),
+                   bootstyle=SECONDARY).pack(side=LEFT, padx=(5, 0))
+        ttk.Button(layer_buttons, text="▼", width=3, command=lambda: self.move_query_layer(1),
+                   bootstyle=SECONDARY).pack(side=LEFT, padx=(5, 0))
+        layer_actions = ttk.Frame(layers_frame)
+        layer_actions.pack(fill=X, pady=(5, 0))
+        self.layer_color_var = ttk.StringVar(value="Sarı")
+        layer_color_combo = ttk.Combobox(layer_actions, textvariable=self.layer_color_var,
+                                         values=list(map_layers.LAYER_COLORS.keys()), state="readonly", width=10,
+                                         bootstyle=INFO)
+        layer_color_combo.pack(side=LEFT)
+        layer_color_combo.bind("<<ComboboxSelected>>", self.on_query_layer_color_changed)
+        ttk.Button(layer_actions, text="Yenile", command=self.refresh_query_layer,
+                   bootstyle=INFO).pack(side=LEFT, padx=(5, 0), fill=X, expand=YES)
+        ttk.Button(layer_actions, text="Kaldır", command=self.remove_query_layer,
+                   bootstyle=DANGER).pack(side=LEFT, padx=(5, 0))
+        layer_limit_frame = ttk.Frame(layers_frame)
+        layer_limit_frame.pack(fill=X, pady=(5, 0))
+        ttk.Label(layer_limit_frame, text="Katman Bellek Sınırı (MB):").pack(side=LEFT, padx=(0, 5))
+        self.layer_memory_limit_var = ttk.IntVar(value=map_layers.LAYER_MEMORY_LIMIT_MB)
+        ttk.Spinbox(layer_limit_frame, textvariable=self.layer_memory_limit_var, from_=16, to=8192,
+                    increment=64, width=6).pack(side=LEFT)
+        self.layer_memory_label = ttk.Label(layers_frame, text="", bootstyle=SECONDARY)
+        self.layer_memory_label.pack(fill=X, pady=(5, 0))
         main_paned_window.add(sidebar_frame, weight=1)
 
         # --- 2. Sağ İçerik Alanı ---
@@ -57,9 +264,65 @@ class PostGISApp:
                                                     font=('Consolas', 10), bg="#292929", fg="#cccccc", insertbackground="#ffffff")
         self.query_text.pack(expand=YES, fill=BOTH)
         self.query_text.insert(INSERT, "SELECT * FROM public.your_spatial_table LIMIT 100;")
-        self.run_button = ttk.Button(right_content_frame, text="Sorguyu Çalıştır ve Haritada Göster",
+        run_frame = ttk.Frame(right_content_frame)
+        run_frame.pack(pady=10, fill=X)
+        self.run_button = ttk.Button(run_frame, text="Sorguyu Çalıştır ve Haritada Göster",
                                      command=self.run_query_and_map_thread, bootstyle=SUCCESS)
-        self.run_button.pack(pady=10, fill=X, ipady=5)
+        self.run_button.pack(side=LEFT, fill=X, expand=YES, ipady=5)
+        # YENİ: Sorguyu, haritadaki sonucu silmeden ayrı bir katman olarak ekler (bkz. Sorgu Katmanları)
+        ttk.Button(run_frame, text="Katman Olarak Ekle", command=self.add_query_layer,
+                   bootstyle=INFO).pack(side=LEFT, padx=(10, 0), ipady=5)
+        # YENİ: Çalışan sorguyu sunucuda iptal eder ve bekleyen çizimleri durdurur
+        self.cancel_button = ttk.Button(run_frame, text="İptal", command=self.cancel_query,
+                                        bootstyle=DANGER, state=DISABLED)
+        self.cancel_button.pack(side=LEFT, padx=(10, 0), ipady=5)
+
+        # --- Sorgu Seçenekleri ---
+        self.query_options_frame = ttk.Frame(right_content_frame)
+        self.query_options_frame.pack(fill=X, pady=(0, 5))
+        self.stream_mode_var = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(self.query_options_frame, text="Akış Modu (Sunucu Tarafı İmleç)",
+                        variable=self.stream_mode_var, bootstyle="round-toggle").pack(side=LEFT, padx=(0, 15))
+        self.viewport_mode_var = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(self.query_options_frame, text="Görünüm Modu (Yalnızca Görünen Alan)",
+                        variable=self.viewport_mode_var, command=self._on_viewport_mode_toggled,
+                        bootstyle="round-toggle").pack(side=LEFT, padx=(0, 15))
+        ttk.Label(self.query_options_frame, text="Zaman Aşımı (sn):").pack(side=LEFT, padx=(0, 5))
+        self.query_timeout_var = ttk.IntVar(value=QUERY_TIMEOUT_S)
+        ttk.Spinbox(self.query_options_frame, textvariable=self.query_timeout_var, from_=0, to=3600,
+                    increment=30, width=6).pack(side=LEFT, padx=(0, 15))
+        # YENİ: Sonuç önbelleği - aynı sorgu diskteki çözülmüş sonuçtan çizilir; doğrulama açıksa
+        # sorgunun okuduğu tablolar değiştiyse önbellek kullanılmaz (tek bir hafif istatistik sorgusu)
+        self.cache_mode_var = ttk.BooleanVar(value=result_cache.cache_available())
+        ttk.Checkbutton(self.query_options_frame, text="Sonuç Önbelleği", variable=self.cache_mode_var,
+                        bootstyle="round-toggle").pack(side=LEFT, padx=(0, 15))
+        self.cache_validate_var = ttk.BooleanVar(value=True)
+        ttk.Checkbutton(self.query_options_frame, text="Tablo Değişince Geçersiz Kıl",
+                        variable=self.cache_validate_var, bootstyle="round-toggle").pack(side=LEFT)
+
+        # --- Çizim (LOD) Seçenekleri ---
+        self.render_options_frame = ttk.Frame(right_content_frame)
+        self.render_options_frame.pack(fill=X, pady=(0, 5))
+        ttk.Label(self.render_options_frame, text="Detay Seviyesi (LOD):").pack(side=LEFT, padx=(0, 5))
+        self.lod_mode_var = ttk.StringVar(value="Kapalı")
+        ttk.Combobox(self.render_options_frame, textvariable=self.lod_mode_var, values=list(LOD_MODES.keys()),
+                     state="readonly", width=18, bootstyle=INFO).pack(side=LEFT, padx=(0, 15))
+        ttk.Label(self.render_options_frame, text="Köşe Bütçesi:").pack(side=LEFT, padx=(0, 5))
+        self.vertex_budget_var = ttk.IntVar(value=map_render.LOD_VERTEX_BUDGET)
+        ttk.Spinbox(self.render_options_frame, textvariable=self.vertex_budget_var, from_=1000, to=10000000,
+                    increment=50000, width=10).pack(side=LEFT, padx=(0, 15))
+        ttk.Label(self.render_options_frame, text="Nokta Gösterimi:").pack(side=LEFT, padx=(0, 5))
+        self.point_mode_var = ttk.StringVar(value="Her Nokta Ayrı")
+        ttk.Combobox(self.render_options_frame, textvariable=self.point_mode_var, values=list(POINT_MODES.keys()),
+                     state="readonly", width=14, bootstyle=INFO).pack(side=LEFT, padx=(0, 15))
+        ttk.Label(self.render_options_frame, text="Çizim Motoru:").pack(side=LEFT, padx=(0, 5))
+        self.renderer_var = ttk.StringVar(value="Otomatik")
+        ttk.Combobox(self.render_options_frame, textvariable=self.renderer_var, values=list(RENDERERS.keys()),
+                     state="readonly", width=12, bootstyle=INFO).pack(side=LEFT, padx=(0, 15))
+        ttk.Label(self.render_options_frame, text="Kare Bütçesi (ms):").pack(side=LEFT, padx=(0, 5))
+        self.frame_budget_var = ttk.IntVar(value=map_render.DRAW_FRAME_BUDGET_MS)
+        ttk.Spinbox(self.render_options_frame, textvariable=self.frame_budget_var, from_=2, to=100,
+                    increment=2, width=5).pack(side=LEFT)
         
 # PostGISApp __init__ metodunuzda, bu bölümü bulun ve güncelleyin:
 
@@ -90,6 +353,9 @@ class PostGISApp:
             "Esri World Imagery": "https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}",
             "CartoDB Positron (Açık Tema)": "https://a.basemaps.cartocdn.com/light_all/{z}/{x}/{y}.png"
         }
+        # YENİ: Test/saha için yerel karo sunucusu (ör. http://127.0.0.1:8080/{z}/{x}/{y}.png)
+        if os.environ.get(LOCAL_TILE_SERVER_ENV):
+            self.tile_servers["Yerel Karo Sunucusu"] = os.environ[LOCAL_TILE_SERVER_ENV]
         
         self.basemap_var = ttk.StringVar(value="Google Uydu")
         self.basemap_combo = ttk.Combobox(basemap_frame, 
@@ -99,15 +365,42 @@ class PostGISApp:
                                           bootstyle=INFO)
         self.basemap_combo.pack(side=LEFT, fill=X, expand=YES)
         self.basemap_combo.bind("<<ComboboxSelected>>", self.on_basemap_changed)
+
+        # YENİ: Çevrimdışı modda karolar yalnızca diskteki önbellekten okunur, ağa gidilmez
+        self.offline_tiles_var = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(basemap_frame, text="Çevrimdışı", variable=self.offline_tiles_var,
+                        command=self.on_offline_tiles_changed, bootstyle="round-toggle").pack(side=LEFT, padx=(10, 0))
         # --- YENİ BÖLÜM SONU ---
         
-        self.map_widget = TkinterMapView(map_tab, corner_radius=0)
+        # YENİ: Karolar altlık başına MBTiles önbelleğinden yüklenir, komşular arka planda ön yüklenir
+        self._tile_sources = {}
+        self.tile_prefetcher = tile_cache.TilePrefetcher()
+        self.map_widget = CachedTileMapView(map_tab, corner_radius=0)
         self.map_widget.pack(fill=BOTH, expand=YES)
         
         # Başlangıç haritasını ayarla
-        self.map_widget.set_tile_server(self.tile_servers["Google Uydu"], max_zoom=22)
+        self.map_widget.set_tile_source(self._get_tile_source("Google Uydu"), max_zoom=22)
         self.map_widget.set_position(39.925533, 32.866287) # Ankara
         self.map_widget.set_zoom(6)
+
+        # --- YENİ: Harita görünümü değişikliklerini (kaydırma/zoom) izle ---
+        self._view_change_listeners = [self._on_view_changed_viewport, self._on_view_changed_lod,
+                                       self._on_view_changed_cluster, self._on_view_changed_raster,
+                                       self._on_view_changed_tiles, self._on_view_changed_vector_tiles,
+                                       self._on_view_changed_culling, self._on_view_changed_query_layers]
+        self.map_widget.canvas.bind("<B1-Motion>", self._position_raster_overlay, add="+")
+        self.map_widget.canvas.bind("<B1-Motion>", self._position_vector_tiles, add="+")
+        self.map_widget.canvas.bind("<B1-Motion>", self._position_query_layers, add="+")
+        # YENİ: Tıklanan obje mekânsal indeksle bulunur; Shift+sürükle ile kutu seçimi yapılır
+        self.map_widget.add_left_click_map_command(self._on_map_click)
+        self.map_widget.canvas.bind("<Shift-Button-1>", self._on_box_select_start)
+        self.map_widget.canvas.bind("<Shift-B1-Motion>", self._on_box_select_drag)
+        self.map_widget.canvas.bind("<Shift-ButtonRelease-1>", self._on_box_select_end)
+        self.map_widget.canvas.bind("<ButtonRelease-1>", self._on_box_select_end, add="+")
+        self._pending_view_signature = None
+        self._committed_view_signature = None
+        self._view_changed_at = 0.0
+        self.root.after(VIEW_POLL_MS, self._watch_map_view)
         
         # ... __init__ metodunun geri kalanı aynı şekilde devam eder ...
 
@@ -115,19 +408,10 @@ class PostGISApp:
         table_tab = ttk.Frame(self.notebook, padding=5)
         self.notebook.add(table_tab, text="Tablo")
         
-        grid_frame = ttk.Frame(table_tab)
-        grid_frame.pack(fill=BOTH, expand=YES)
-        
-        # Veri Izgarası için Treeview ve Kaydırma Çubukları
-        self.data_grid = ttk.Treeview(grid_frame, bootstyle=PRIMARY, show="headings")
-        
-        vsb = ttk.Scrollbar(grid_frame, orient="vertical", command=self.data_grid.yview)
-        hsb = ttk.Scrollbar(grid_frame, orient="horizontal", command=self.data_grid.xview)
-        self.data_grid.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        vsb.pack(side=RIGHT, fill=Y)
-        hsb.pack(side=BOTTOM, fill=X)
-        self.data_grid.pack(side=LEFT, fill=BOTH, expand=YES)
+        # YENİ: Sanal veri ızgarası - yalnızca ekranda görünen satırlar Treeview'a yazılır,
+        # böylece satır sayısı arayüzün tepki süresini etkilemez
+        self.data_grid = VirtualDataGrid(table_tab, bootstyle=PRIMARY)
+        self.data_grid.on_selection_changed = self._on_grid_selection_changed
 
         # İşlem Günlüğü (Log) Sekmelerin Altına Taşındı
         log_labelframe = ttk.LabelFrame(display_frame, text="İşlem Günlüğü", padding=5, bootstyle=SECONDARY)
@@ -144,9 +428,47 @@ class PostGISApp:
     # PostGISApp sınıfınıza bu iki yeni metodu ekleyin
 
         
+    # --- YENİ: Başlangıç Ölçümleri ve Arka Plan Isınması ---
+    def _mark_startup(self, name):
+        if name not in self.startup_marks:
+            self.startup_marks[name] = round((time.perf_counter() - STARTUP_T0) * 1000, 1)
+        return self.startup_marks[name]
+
+    def _on_first_map(self, event=None):
+        """Ana pencere ilk kez ekrana geldiğinde süreyi kaydeder ve ağır modülleri arka planda yüklemeye başlar."""
+        if event is not None and event.widget is not self.root or 'first_window' in self.startup_marks:
+            return
+        self.root.update_idletasks() # Pencerenin içeriği çizilmiş olsun
+        window_ms = self._mark_startup('first_window')
+        self._log_status(f"Başlangıç: pencere {window_ms:.0f} ms'de açıldı; sorgu modülleri arka planda yükleniyor...")
+        lazy_modules.warm_up(WARM_UP_MODULES,
+                             on_done=lambda seconds, errors: self.root.after(0, self._on_warm_up_done, seconds, errors))
+
+    def _on_warm_up_done(self, seconds, errors):
+        ready_ms = self._mark_startup('query_ready')
+        self.startup_marks['warm_up'] = round(seconds * 1000, 1)
+        if errors:
+            self._log_status(f"UYARI: Arka planda yüklenemeyen modüller: {', '.join(errors)} "
+                             f"(ilk kullanımda yeniden denenecek).")
+        self._log_status(f"Başlangıç: sorgu modülleri hazır ({seconds * 1000:.0f} ms arka planda, "
+                         f"başlangıçtan {ready_ms:.0f} ms).")
+        if self._startup_bench:
+            print(json.dumps(self.startup_marks), flush=True)
+            self.root.after(0, self.root.destroy)
+
+    def _mark_first_query(self):
+        """İlk sorgu tamamlandığında sorgunun kendi süresini ve başlangıçtan geçen süreyi günlüğe yazar."""
+        if self._first_query_started is None or 'first_query' in self.startup_marks:
+            return
+        total_ms = self._mark_startup('first_query')
+        query_ms = (time.perf_counter() - self._first_query_started) * 1000
+        self.startup_marks['first_query_duration'] = round(query_ms, 1)
+        self._log_status(f"Başlangıç: ilk sorgu {query_ms:.0f} ms sürdü (başlangıçtan {total_ms / 1000:.1f} sn).")
+
     def on_basemap_changed(self, event=None):
         """
         Harita altlığı seçim menüsünden yeni bir seçim yapıldığında çalışır.
+        YENİ: Önceki altlığın karoları silinmez; her altlık kendi disk önbelleğine geçer.
         """
         # Seçilen altlığın adını al
         selected_name = self.basemap_var.get()
@@ -155,11 +477,58 @@ class PostGISApp:
         new_url = self.tile_servers.get(selected_name)
         
         if new_url:
-            # Harita widget'ının tile sunucusunu güncelle
-            self.map_widget.set_tile_server(new_url)
+            previous = self.map_widget.tile_source
+            if previous is not None:
+                self._log_status(f"Karo önbelleği - {previous.format_stats()}")
+            # Harita widget'ının karo kaynağını güncelle
+            source = self._get_tile_source(selected_name)
+            self.map_widget.set_tile_source(source)
             self._log_status(f"Harita altlığı değiştirildi: {selected_name}")
         else:
             self._log_status(f"HATA: '{selected_name}' için geçerli bir URL bulunamadı.")
+
+    # --- YENİ: Karo Önbelleği ve Ön Yükleme ---
+    def _get_tile_source(self, name):
+        source = self._tile_sources.get(name)
+        if source is None:
+            source = tile_cache.TileSource(name, self.tile_servers[name], offline=self.offline_tiles_var.get())
+            self._tile_sources[name] = source
+        return source
+
+    def on_offline_tiles_changed(self):
+        offline = self.offline_tiles_var.get()
+        for source in self._tile_sources.values():
+            source.offline = offline
+        if offline:
+            self._log_status("Çevrimdışı harita: karolar yalnızca diskteki önbellekten okunacak.")
+        else:
+            self._log_status("Çevrimiçi harita: eksik karolar sunucudan indiriliyor...")
+            self.map_widget.draw_initial_array() # Çevrimdışıyken boş kalan karolar yeniden istenir
+
+    def _on_view_changed_tiles(self, view_state):
+        """Görünüm oturduğunda çevredeki karoları ve bir sonraki zoom'u arka planda önbelleğe indirir."""
+        source = self.map_widget.tile_source
+        if source is None or source.offline:
+            return
+        plan = tile_cache.prefetch_plan(view_state['bounds'], view_state['zoom'], self.map_widget.max_zoom)
+        self.tile_prefetcher.prefetch(source, plan,
+                                      on_done=lambda batch: self.root.after(0, self._on_tile_prefetch_done, batch))
+
+    def _on_tile_prefetch_done(self, batch):
+        if not batch['fetched'] and not batch['failed']:
+            return # Her şey zaten önbellekteydi veya görünüm değişti
+        self._log_status(f"Karo ön yükleme: {batch['fetched']} indirildi, {batch['cached']} zaten önbellekte, "
+                         f"{batch['failed']} hata, {batch['skipped']} atlandı ({batch['seconds']:.1f} sn).")
+        source = self._tile_sources.get(batch['source'])
+        if source is not None:
+            self._log_status(f"Karo önbelleği - {source.format_stats()}")
+
+    def log_tile_cache_stats(self):
+        if not self._tile_sources:
+            self._log_status("Karo önbelleği henüz kullanılmadı.")
+        for source in self._tile_sources.values():
+            self._log_status(f"Karo önbelleği - {source.format_stats()}")
+
     def create_menubar(self):
         """Uygulamanın ana menü çubuğunu oluşturur."""
         menubar = ttk.Menu(self.root)
@@ -170,6 +539,13 @@ class PostGISApp:
             label="Veri Aktar (Excel/CSV)...",
             command=self.open_importer_window
         )
+        file_menu.add_command(
+            label="Bağlantı Havuzu Durumu",
+            command=self.log_pool_stats
+        )
+        file_menu.add_command(label="Sonuç Önbelleği Durumu", command=self.log_result_cache_stats)
+        file_menu.add_command(label="Sonuç Önbelleğini Temizle", command=self.clear_result_cache)
+        file_menu.add_command(label="Harita Karo Önbelleği Durumu", command=self.log_tile_cache_stats)
         file_menu.add_separator()
         file_menu.add_command(label="Çıkış", command=self.root.quit)
     
@@ -177,6 +553,65 @@ class PostGISApp:
     
         self.root.config(menu=menubar)
 
+    def log_pool_stats(self):
+        """Paylaşılan bağlantı havuzunun durumunu ve alım/kullanım sürelerini günlüğe yazar."""
+        if not self.db_params:
+            self._log_status("Bağlantı havuzu yok: henüz veritabanına bağlanılmadı.")
+            return
+        self._log_status(db_pool.get_pool(self.db_params).format_stats())
+
+    # --- YENİ: Sonuç Önbelleği ---
+    def _get_result_cache(self):
+        if self._result_cache is None and result_cache.cache_available():
+            try:
+                self._result_cache = result_cache.ResultCache()
+            except (OSError, sqlite3.Error) as e:
+                self._log_status(f"UYARI: Sonuç önbelleği açılamadı: {e}")
+        return self._result_cache
+
+    def log_result_cache_stats(self):
+        cache = self._get_result_cache()
+        self._log_status(cache.format_stats() if cache else "Sonuç önbelleği kullanılamıyor (pyarrow kurulu değil).")
+
+    def clear_result_cache(self):
+        cache = self._get_result_cache()
+        if cache:
+            cache.clear()
+            self._log_status("Sonuç önbelleği temizlendi.")
+
+    def _result_cache_key(self, options):
+        """Önbellek açıksa sorgunun anahtarını döndürür. Görünüm modu sorguları (her kaydırmada farklı) saklanmaz."""
+        if not options['cache'] or options['viewport'] is not None or self._get_result_cache() is None:
+            return None
+        tolerance = map_render.tolerance_for_zoom(options['zoom']) if options['lod_mode'] == 'server' else None
+        return result_cache.cache_key(self.db_params, options['sql'], simplify_tolerance=tolerance)
+
+    def _load_cached_result(self, cache_key, conn=None):
+        """Önbellekteki sonucu okur; conn verilirse tablo değişiklik imzaları doğrulanır. Hata önbelleği devre dışı bırakmaz."""
+        start = time.perf_counter()
+        try:
+            gdf = self._result_cache.get(cache_key, conn)
+        except Exception as e:
+            self._log_status(f"UYARI: Önbellek okunamadı, sorgu veritabanında çalıştırılacak: {e}")
+            return None
+        if gdf is not None:
+            source = "tablo imzaları doğrulandı" if conn is not None else "veritabanına gidilmedi"
+            self._log_status(f"Sonuç önbellekten okundu: {len(gdf)} obje, "
+                             f"{(time.perf_counter() - start) * 1000:.0f} ms ({source}).")
+        return gdf
+
+    def _store_cached_result(self, cache_key, gdf, sql, tables=None, signatures=None):
+        start = time.perf_counter()
+        try:
+            size = self._result_cache.put(cache_key, gdf, sql, tables, signatures)
+        except Exception as e:
+            self._log_status(f"UYARI: Sonuç önbelleğe alınamadı: {e}")
+            return
+        if size:
+            self._log_status(f"Sonuç önbelleğe alındı ({size / 1e6:.1f} MB, {(time.perf_counter() - start) * 1000:.0f} ms).")
+        else:
+            self._log_status("Sonuç önbellek için çok büyük, saklanmadı.")
+
 # PostGISApp sınıfınızdaki bu metodu güncelleyin
     def open_importer_window(self):
         """Veri aktarım aracını yeni bir Toplevel penceresinde açar."""
@@ -189,6 +624,8 @@ class PostGISApp:
         self.importer_window = Toplevel(self.root)
         
         # EXECSV2PG.py'den gelen DataImporterApp sınıfını bu yeni pencere ile başlat
+        # (modül ilk kullanımda yüklenir; arka plan ısınması bittiyse hazırdır)
+        from EXECSV2PG import DataImporterApp
         importer_app = DataImporterApp(self.importer_window)
         
         # --- DEĞİŞİKLİK BURADA ---
@@ -206,35 +643,26 @@ class PostGISApp:
             self.importer_window = None
 
     # --- YENİ METOT: Veri Izgarasını Doldurmak İçin ---
-    def _populate_data_grid(self, dataframe):
+    def _populate_data_grid(self, dataframe, append=False):
         """
         Veri çerçevesini (DataFrame) alarak Tablo sekmesindeki ızgarayı doldurur.
         Geometri sütununu göstermez.
+        append=True ise (akış modu) mevcut satırlar korunur ve yeni satırlar sona eklenir.
         """
-        # Önceki verileri ve sütunları temizle
-        self.data_grid.delete(*self.data_grid.get_children())
-        self.data_grid["columns"] = []
-
         if dataframe.empty:
+            if not append:
+                self.data_grid.clear()
             return
             
         # Geometri sütununu çıkar
         df_attributes = dataframe.drop(columns=[dataframe.geometry.name])
         
-        # Sütunları ayarla
-        columns = list(df_attributes.columns)
-        self.data_grid["columns"] = columns
-        self.data_grid["show"] = "headings" # Sütun başlıklarını göster
-
-        for col in columns:
-            self.data_grid.heading(col, text=col)
-            self.data_grid.column(col, width=120, anchor=W) # Varsayılan sütun genişliği
-            
-        # Satırları ekle
-        for index, row in df_attributes.iterrows():
-            self.data_grid.insert("", END, values=list(row))
-        
-        self._log_status(f"Tabloya {len(df_attributes)} kayıt yüklendi.")
+        # Satırlar Treeview'a eklenmez; ızgara DataFrame'i tutar ve yalnızca görünen sayfayı çizer
+        if append:
+            self.data_grid.append(df_attributes)
+        else:
+            self.data_grid.set_dataframe(df_attributes)
+            self._log_status(f"Tabloya {len(df_attributes)} kayıt yüklendi.")
 
 
     def _log_status(self, message):
@@ -311,14 +739,16 @@ class PostGISApp:
 
     def _execute_populate_tree(self):
         """Veritabanından şema ve coğrafi tablo bilgilerini çeker."""
+        pool = db_pool.get_pool(self.db_params)
         conn = None
+        discard = False
         try:
-            conn = psycopg2.connect(**self.db_params, connect_timeout=5)
+            conn = pool.acquire(check=True)
             self._log_status("Bağlantı başarılı. Coğrafi tablolar sorgulanıyor...")
             
             # PostGIS'in metadata tablosundan coğrafi tabloları çeken sorgu
             sql = """
-            SELECT f_table_schema, f_table_name, type 
+            SELECT f_table_schema, f_table_name, type, f_geometry_column, srid
             FROM geometry_columns
             WHERE f_table_schema NOT IN ('pg_catalog', 'information_schema', 'topology')
             ORDER BY f_table_schema, f_table_name;
@@ -336,14 +766,15 @@ class PostGISApp:
         except psycopg2.Error as e:
             self._log_status(f"Bağlantı/Sorgu Hatası: {e}")
             messagebox.showerror("Bağlantı Başarısız", f"Veritabanına bağlanılamadı:\n{e}", parent=self.connection_window or self.root)
+            discard = True
+            db_pool.close_pool(self.db_params)
             self.db_params = None # Başarısız olursa parametreleri temizle
         except Exception as e:
             self._log_status(f"Beklenmedik bir hata oluştu: {e}")
             messagebox.showerror("Hata", f"Beklenmedik bir hata oluştu:\n{e}", parent=self.connection_window or self.root)
             self.db_params = None
         finally:
-            if conn:
-                conn.close()
+            pool.release(conn, discard=discard)
             # İşlem bitince butonları tekrar aktif et
             self.root.after(0, self._set_buttons_state, NORMAL)
 
@@ -353,6 +784,7 @@ class PostGISApp:
         # Ağacı temizle
         for item in self.db_tree.get_children():
             self.db_tree.delete(item)
+        self._tree_tables = {}
 
         schemas = {}
         for index, row in df.iterrows():
@@ -367,7 +799,9 @@ class PostGISApp:
                 schemas[schema_name] = schema_node
             
             # Tabloyu ilgili şemanın altına ekle
-            self.db_tree.insert(schemas[schema_name], END, text=f" {table_name} ({geom_type})")
+            table_node = self.db_tree.insert(schemas[schema_name], END, text=f" {table_name} ({geom_type})")
+            self._tree_tables[table_node] = {'schema': schema_name, 'table': table_name, 'type': geom_type,
+                                             'geom_col': row['f_geometry_column'], 'srid': int(row['srid'] or 0)}
 
         # Dialog penceresini kapat
         if self.connection_window and self.connection_window.winfo_exists():
@@ -410,157 +844,1380 @@ class PostGISApp:
             messagebox.showwarning("Bağlantı Yok", "Lütfen önce veritabanına bağlanın.", parent=self.root)
             return
 
+        sql_sorgusu = self.query_text.get("1.0", END).strip()
+        if not sql_sorgusu:
+            messagebox.showerror("Eksik Bilgi", "Lütfen SQL sorgusunu girin.", parent=self.root)
+            return
+
         self._set_buttons_state(DISABLED)
         self._log_status("Sorgu ve haritalama işlemi başlatılıyor...")
-        thread = threading.Thread(target=self._execute_run_query_and_map, daemon=True)
+        self._last_query_sql = sql_sorgusu
+        viewport = self._get_map_view_state() if self.viewport_mode_var.get() else None
+        self._start_query_thread(viewport)
+
+    def _start_query_thread(self, viewport=None, fit_to_data=None):
+        """
+        Yeni bir sorgu nesli başlatır. Önceki sorgu (artık geçersiz) sunucuda iptal edilir;
+        böylece aynı anda birden fazla ağır sorgu birikmez.
+        """
+        self._query_generation += 1
+        if self._first_query_started is None:
+            self._first_query_started = time.perf_counter()
+        self._cancel_active_query()
+        self.cancel_button.config(state=NORMAL)
+        options = self._collect_query_options(viewport, fit_to_data)
+        self._current_gdf = None
+        self._current_options = options
+        self._lod_zoom = options['zoom']
+        self._cluster_index = None
+        self._feature_index = None
+        thread = threading.Thread(target=self._execute_run_query_and_map,
+                                  args=(self._query_generation, options), daemon=True)
         thread.start()
 
+    def _collect_query_options(self, viewport=None, fit_to_data=None):
+        """Sorgu seçeneklerini ana thread'de (Tk değişkenlerinden) okuyup worker'a aktarılacak sözlüğe çevirir."""
+        view_state = viewport or self._get_map_view_state()
+        return {
+            'sql': self._last_query_sql,
+            'viewport': viewport,
+            'stream': self.stream_mode_var.get(),
+            'lod_mode': LOD_MODES.get(self.lod_mode_var.get(), 'off'),
+            'vertex_budget': self._get_vertex_budget(),
+            'zoom': view_state['zoom'],
+            'point_mode': POINT_MODES.get(self.point_mode_var.get(), 'single'),
+            'renderer': RENDERERS.get(self.renderer_var.get(), 'auto'),
+            'frame_budget_ms': self._get_frame_budget(),
+            'timeout_s': self._get_query_timeout(),
+            'cache': self.cache_mode_var.get(),
+            'cache_validate': self.cache_validate_var.get(),
+            'fit_to_data': (viewport is None) if fit_to_data is None else fit_to_data,
+        }
+
+    def _get_vertex_budget(self):
+        try:
+            return max(int(self.vertex_budget_var.get()), 1)
+        except (ValueError, TclError):
+            return map_render.LOD_VERTEX_BUDGET
+
+    def _get_query_timeout(self):
+        try:
+            return max(int(self.query_timeout_var.get()), 0)
+        except (ValueError, TclError):
+            return QUERY_TIMEOUT_S
+
+    def _get_frame_budget(self):
+        try:
+            return min(max(int(self.frame_budget_var.get()), 1), 1000)
+        except (ValueError, TclError):
+            return map_render.DRAW_FRAME_BUDGET_MS
+
+    def _cancel_active_query(self):
+        """Çalışmakta olan sorguyu PostgreSQL tarafında iptal eder (connection.cancel thread-safe'dir)."""
+        conn = self._active_query_conn
+        if conn is not None and not conn.closed:
+            try:
+                conn.cancel()
+            except psycopg2.Error:
+                pass
+
+    def cancel_query(self):
+        """
+        İptal butonu: sorgu neslini geçersiz kılar (bekleyen çekim ve çizim adımları durur)
+        ve çalışan ifadeyi PostgreSQL tarafında iptal eder.
+        """
+        self._query_generation += 1
+        self._cancel_active_query()
+        self._raster_token += 1
+        self.cancel_button.config(state=DISABLED)
+        self._set_buttons_state(NORMAL)
+        self._log_status("Sorgu kullanıcı tarafından iptal edildi.")
+
+    def _on_query_finished(self, generation):
+        """Sorgunun çekim ve çizimi tamamlandığında (geçersiz kılınmadıysa) İptal butonunu pasifleştirir."""
+        if not self._is_stale(generation):
+            self.cancel_button.config(state=DISABLED)
+            self._mark_first_query()
+
+    def _is_stale(self, generation):
+        """Sorgu, kendisinden sonra başlatılan bir sorgu tarafından geçersiz kılınmışsa True döner."""
+        return generation is not None and generation != self._query_generation
+
+    def _guard_generation(self, feature_gen, generation):
+        """Yeni bir sorgu başladığında eski sorgunun çizim zincirini durdurur."""
+        for item in feature_gen:
+            if self._is_stale(generation):
+                return
+            yield item
+
+    def _clear_map(self):
+        self.map_widget.delete_all_polygon()
+        self.map_widget.delete_all_marker()
+        self.map_widget.delete_all_path()
+        self._cluster_markers = []
+        self._culled = None
+        self._highlight_items = []
+        self._identify_marker = None
+        self._raster_layer = None
+        self._raster_origin = None
+        self._raster_token += 1
+        self.map_widget.canvas.delete('raster_overlay')
+
     # --- _execute_run_query_and_map İÇİNDE GÜNCELLEME ---
-    def _execute_run_query_and_map(self):
-        sql_sorgusu = self.query_text.get("1.0", END).strip()
+    def _execute_run_query_and_map(self, generation=None, options=None):
+        sql_sorgusu = options['sql'] if options else None
         if not self.db_params or not sql_sorgusu:
-            if not sql_sorgusu:
-                messagebox.showerror("Eksik Bilgi", "Lütfen SQL sorgusunu girin.", parent=self.root)
             self.root.after(0, self._set_buttons_state, NORMAL)
             return
+        viewport = options['viewport']
 
-        # Haritayı ve veri ızgarasını temizle
-        self.map_widget.delete_all_polygon()
-        self.map_widget.delete_all_marker()
-        self.map_widget.delete_all_path()
+        # Haritayı ve veri ızgarasını temizle (widget'lara yalnızca ana thread dokunur; sonraki çizimlerden önce çalışır)
+        self.root.after(0, self._clear_map)
         self.root.after(0, self._populate_data_grid, pd.DataFrame()) # Boş DataFrame ile ızgarayı temizle
         
+        pool = db_pool.get_pool(self.db_params)
         conn = None
+        discard = False
+        watchdog = None
+        drawing_scheduled = False
         try:
-            self._log_status("Veritabanına bağlanılıyor...")
-            conn = psycopg2.connect(**self.db_params, connect_timeout=10)
+            # YENİ: Doğrulama kapalıyken önbellekteki sonuç veritabanına hiç gidilmeden çizilir
+            cache_key = self._result_cache_key(options)
+            validate_cache = cache_key is not None and options['cache_validate']
+            if cache_key is not None and not validate_cache:
+                gdf = self._load_cached_result(cache_key)
+                if gdf is not None:
+                    drawing_scheduled = not self._is_stale(generation) and self._present_result(gdf, generation, options)
+                    return
+
+            # YENİ: Bağlantı her sorguda yeniden açılmaz, paylaşılan havuzdan alınır
+            acquire_start = time.perf_counter()
+            conn = pool.acquire()
+            self._log_status(f"Bağlantı havuzdan alındı ({(time.perf_counter() - acquire_start) * 1000:.1f} ms).")
+            if self._is_stale(generation):
+                return
+            self._active_query_conn = conn
+
+            # YENİ: Zaman aşımı hem sunucuda (statement_timeout, tek ifade için) hem de istemcide
+            # (akış modunda birden çok FETCH'e yayılan toplam süre için) uygulanır
+            timeout_s = options['timeout_s']
+            if timeout_s:
+                query_engine.set_statement_timeout(conn, timeout_s)
+                watchdog = threading.Timer(timeout_s, self._cancel_timed_out_query, args=(conn,))
+                watchdog.daemon = True
+                watchdog.start()
+
+            # YENİ: Doğrulama açıkken önbellek, sorgunun okuduğu tablolar değişmediyse kullanılır
+            if validate_cache:
+                gdf = self._load_cached_result(cache_key, conn)
+                if gdf is not None:
+                    drawing_scheduled = not self._is_stale(generation) and self._present_result(gdf, generation, options)
+                    return
             self._log_status("Bağlantı başarılı. Sorgu çalıştırılıyor...")
+
+            # YENİ: Görünüm modunda sorgu, haritanın görünen kapsamıyla sınırlandırılır
+            if viewport is not None:
+                sql_sorgusu = query_engine.wrap_viewport_sql(sql_sorgusu, viewport['bounds'], geom_col='geom')
+                self._log_status(f"Görünüm filtresi uygulandı (Zoom: {viewport['zoom']}).")
+
+            # YENİ: Sunucu tarafı LOD'da geometriler veritabanında sadeleştirilerek gelir
+            simplify_tolerance = None
+            if options['lod_mode'] == 'server':
+                simplify_tolerance = map_render.tolerance_for_zoom(options['zoom'])
+
+            # YENİ: Akış modunda sonuçlar sunucu tarafı imleçle parça parça çekilip çizilir
+            # (önbelleğe yalnızca tek seferde okunan sonuçlar yazılır)
+            if options['stream']:
+                drawing_scheduled = True
+                self._stream_query_to_map(conn, sql_sorgusu, generation, options, simplify_tolerance)
+                return
+
+            # Tablo imzaları sorgudan önce alınır: sorgu sırasında gelen değişiklik sonraki okumada yakalanır
+            cache_tables = cache_signatures = None
+            if validate_cache:
+                cache_tables, cache_signatures = result_cache.snapshot_tables(conn, sql_sorgusu)
             
             with warnings.catch_warnings():
                 warnings.filterwarnings("ignore", category=UserWarning)
-                gdf = gpd.read_postgis(sql_sorgusu, conn, geom_col='geom')
+                gdf = query_engine.read_postgis_binary(conn, sql_sorgusu, geom_col='geom',
+                                                       simplify_tolerance=simplify_tolerance)
 
-            if gdf.empty:
-                self._log_status("Sorgu sonuç döndürmedi.")
-                messagebox.showinfo("Bilgi", "Sorgu sonuç döndürmedi.", parent=self.root)
+            if self._is_stale(generation):
                 return
 
-            # YENİ: Veri ızgarasını ana thread'de doldur
-            self.root.after(0, self._populate_data_grid, gdf)
-            
-            self._log_status(f"{len(gdf)} adet coğrafi obje bulundu. Haritaya toplu çizim başlıyor...")
-
-            # ... (feature_generator ve on_drawing_complete metotları aynı kalır) ...
-            def feature_generator(geodataframe):
-                geometry_col = geodataframe.geometry.name
-                for index, row in geodataframe.iterrows():
-                    geom = row[geometry_col]
-                    if geom is None or geom.is_empty:
-                        continue
-                    
-                    popup_text = str(row['aciklama']) if 'aciklama' in geodataframe.columns and pd.notna(row['aciklama']) else f"Obje {index + 1}"
-                    geom_type = geom.geom_type
-
-                    if geom_type == 'Polygon':
-                        coords = list(geom.exterior.coords)
-                        if len(coords) >= 4:
-                            yield ('polygon', coords, popup_text)
-                        else:
-                            self._log_status(f"Uyarı: Geçersiz poligon atlandı (Nokta Sayısı: {len(coords)}).")
-                    
-                    elif geom_type == 'MultiPolygon':
-                        for poly in geom.geoms:
-                            coords = list(poly.exterior.coords)
-                            if len(coords) >= 4:
-                                yield ('polygon', coords, popup_text)
-                            else:
-                                self._log_status(f"Uyarı: Geçersiz çoklu-poligon parçası atlandı (Nokta Sayısı: {len(coords)}).")
-
-                    elif geom_type == 'Point':
-                        yield ('point', (geom.y, geom.x), popup_text)
-
-                    elif geom_type == 'LineString':
-                        coords = list(geom.coords)
-                        if len(coords) >= 2:
-                            yield ('path', coords, popup_text)
-                        else:
-                            self._log_status(f"Uyarı: Geçersiz çizgi atlandı (Nokta Sayısı: {len(coords)}).")
-
-                    elif geom_type == 'MultiLineString':
-                        for line in geom.geoms:
-                            coords = list(line.coords)
-                            if len(coords) >= 2:
-                                yield ('path', coords, popup_text)
-                            else:
-                                self._log_status(f"Uyarı: Geçersiz çoklu-çizgi parçası atlandı (Nokta Sayısı: {len(coords)}).")
-            
-            def on_drawing_complete():
-                self._log_status("Haritaya çizim tamamlandı.")
-                if not gdf.empty:
-                    if not gdf.total_bounds.any() is None and all(gdf.total_bounds != float('inf')) and all(gdf.total_bounds != float('-inf')):
-                        min_lon, min_lat, max_lon, max_lat = gdf.total_bounds
-                        self.map_widget.fit_bounding_box((max_lat, min_lon), (min_lat, max_lon))
-                        current_zoom = self.map_widget.zoom
-                        if current_zoom > 18:
-                            self.map_widget.set_zoom(18)
-                        elif len(gdf) == 1 and gdf.geom_type.iloc[0] == 'Point':
-                            self.map_widget.set_position(gdf.geometry.y.iloc[0], gdf.geometry.x.iloc[0], zoom=15)
-                    else:
-                        self._log_status("Uyarı: Geçerli bir kapsama alanı (bounds) hesaplanamadı.")
-
-            
-            gen = feature_generator(gdf)
-            self.root.after(10, self._draw_features_in_batches, gen, on_drawing_complete)
+            drawing_scheduled = self._present_result(gdf, generation, options)
+            if cache_key is not None and not gdf.empty:
+                if cache_tables is not None or not validate_cache:
+                    self._store_cached_result(cache_key, gdf, sql_sorgusu, cache_tables, cache_signatures)
+                else:
+                    self._log_status("Sonuç önbelleğe alınmadı: sorgunun okuduğu tablolar belirlenemedi "
+                                     "(doğrulama açıkken yalnızca doğrulanabilen sonuçlar saklanır).")
 
+        except psycopg2.extensions.QueryCanceledError:
+            if self._is_stale(generation) or not options['timeout_s']:
+                self._log_status("Sorgu iptal edildi.")
+            else:
+                # Kullanıcı iptali ve yeni sorgu nesli eskiyi geçersiz kılar; geriye yalnızca zaman aşımı kalır
+                self._log_status(f"Sorgu {options['timeout_s']} sn zaman aşımına uğradı ve sunucuda iptal edildi.")
+                messagebox.showwarning("Zaman Aşımı",
+                                       f"Sorgu {options['timeout_s']} saniye içinde tamamlanmadığı için iptal edildi.",
+                                       parent=self.root)
         except psycopg2.Error as e:
-            self._log_status(f"Veritabanı veya SQL Hatası: {e}")
-            messagebox.showerror("Veritabanı/SQL Hatası", f"Detaylar: {str(e)}", parent=self.root)
+            # Bağlantı kopmuşsa havuza geri konmaz; sonraki sorgu yeni bağlantı açar
+            discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if self._is_stale(generation):
+                self._log_status(f"Eski sorgu sonlandırıldı: {e}")
+            else:
+                self._log_status(f"Veritabanı veya SQL Hatası: {e}")
+                messagebox.showerror("Veritabanı/SQL Hatası", f"Detaylar: {str(e)}", parent=self.root)
         except Exception as e:
             import traceback
             tb_str = traceback.format_exc()
             self._log_status(f"Genel Bir Hata Oluştu: {e}\n{tb_str}")
             messagebox.showerror("Bir Hata Oluştu", f"Detaylar: {str(e)}\n\nTraceback:\n{tb_str}", parent=self.root)
         finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            if self._active_query_conn is conn:
+                self._active_query_conn = None
             if conn:
-                conn.close()
-                self._log_status("Veritabanı bağlantısı kapatıldı.")
-            self.root.after(0, self._set_buttons_state, NORMAL)
+                pool.release(conn, discard=discard)
+                self._log_status("Bağlantı havuza iade edildi.")
+            if not self._is_stale(generation):
+                self.root.after(0, self._set_buttons_state, NORMAL)
+                if not drawing_scheduled:
+                    self.root.after(0, self._on_query_finished, generation)
+
+    def _present_result(self, gdf, generation, options):
+        """
+        Worker thread'de çalışır. Sonucu (veritabanından veya önbellekten) LOD, kümeleme ve raster
+        hazırlığından geçirip ızgaraya ve haritaya gönderir. Çizim zamanlandıysa True döner.
+        """
+        if gdf.empty:
+            self._log_status("Sorgu sonuç döndürmedi.")
+            if options['viewport'] is None:
+                messagebox.showinfo("Bilgi", "Sorgu sonuç döndürmedi.", parent=self.root)
+            return False
+
+        draw_geoms, lod_stats = self._apply_lod(gdf.geometry.values, options)
+
+        # YENİ: Kümeleme modunda noktalar tek tek çizilmez, bir kez kurulan indeksle kümelenir
+        if options['point_mode'] == 'cluster':
+            cluster_index = map_render.PointClusterIndex.from_geometries(gdf.geometry.values)
+            if cluster_index is not None:
+                draw_geoms = map_render.without_points(draw_geoms)
+                self.root.after(0, self._set_cluster_index, cluster_index, generation)
+
+        # YENİ: Büyük sonuçlar tek tek Tk nesnesi yerine tek bir raster görüntü olarak çizilir
+        raster_layer = self._build_raster_layer(draw_geoms, options, len(gdf))
+
+        # YENİ: Görünüm ayıklaması, tıklama ve kutu seçimi için sonuç kümesi başına bir kez kurulur
+        feature_index = map_render.FeatureIndex(gdf.geometry.values)
+        self._log_status(f"Mekânsal indeks (STRtree) kuruldu: {len(feature_index)} obje, "
+                         f"{feature_index.build_seconds * 1000:.0f} ms.")
+
+        # YENİ: Veri ızgarasını ana thread'de doldur
+        self.root.after(0, self._populate_data_grid, gdf)
+        self.root.after(0, self._set_current_result, gdf, generation, feature_index)
+        
+        self._log_status(f"{len(gdf)} adet coğrafi obje bulundu. Haritaya toplu çizim başlıyor...")
+        self.root.after(10, self._draw_result, gdf, draw_geoms, generation, options, lod_stats, raster_layer)
+        return True
+
+    def _cancel_timed_out_query(self, conn):
+        """Zaman aşımı zamanlayıcısı (ayrı thread): sorgu hâlâ çalışıyorsa sunucuda iptal eder."""
+        if self._active_query_conn is conn:
+            try:
+                conn.cancel()
+            except psycopg2.Error:
+                pass
+
+    def _set_current_result(self, gdf, generation, feature_index=None):
+        """Son sorgunun tam detaylı sonucunu ve mekânsal indeksini saklar (LOD, tıklama ve seçim için)."""
+        if not self._is_stale(generation):
+            self._current_gdf = gdf
+            self._feature_index = feature_index
+
+    def _draw_result(self, gdf, draw_geoms, generation, options, lod_stats=None, raster_layer=None):
+        """
+        Ana thread'de çalışır. Sonucu (gerekirse sadeleştirilmiş geometrilerle) haritaya toplu olarak çizer.
+        raster_layer verilirse objeler Tk nesneleri yerine tek bir raster görüntü olarak gösterilir.
+        """
+        if self._is_stale(generation):
+            return
+        draw_start = time.perf_counter()
+        if self._cluster_index is not None:
+            self._render_clusters()
+
+        draw_stats = map_render.new_draw_stats()
+
+        def on_drawing_complete():
+            if self._is_stale(generation):
+                return
+            self._log_status("Haritaya çizim tamamlandı.")
+            self._on_query_finished(generation)
+            self._log_draw_stats(draw_stats)
+            if lod_stats:
+                self._log_lod_stats(lod_stats, time.perf_counter() - draw_start)
+            if options['fit_to_data']:
+                first_geom = gdf.geometry.iloc[0] if len(gdf) == 1 else None
+                self._fit_map_to_bounds(gdf.total_bounds, len(gdf), first_geom)
+
+        if raster_layer is not None:
+            self._raster_layer = raster_layer
+            self._render_raster_overlay()
+            on_drawing_complete()
+            return
+
+        # YENİ: Harita merkezine yakın objeler önce çizilir; yalnızca görünen alandakiler çizilir
+        center = self.map_widget.get_position()
+        rows = self._start_culling(gdf, draw_geoms, generation, options)
+        gen = self._guard_generation(self._feature_generator(gdf, draw_geoms, center, rows), generation)
+        self._draw_features_in_batches(gen, on_drawing_complete, options['frame_budget_ms'], draw_stats)
+
+    def _feature_generator(self, geodataframe, geometries=None, center=None, rows=None):
+        """
+        GeoDataFrame'i haritaya çizilecek ('polygon' | 'path' | 'point', koordinatlar, popup) öğelerine çevirir.
+        Koordinatlar satır satır değil, bütün geometri kolonu için tek seferde (vektörel) çıkarılır.
+        geometries verilirse (ör. LOD ile sadeleştirilmiş) çizimde GeoDataFrame'in geometrileri yerine kullanılır.
+        center (lat, lon) verilirse parçalar bu noktaya yakından uzağa doğru sıralanır.
+        rows (satır pozisyonları) verilirse yalnızca bu satırlar çizilir (görünüm ayıklaması, vurgulama).
+        """
+        if geometries is None:
+            geometries = geodataframe.geometry.values
+        if rows is not None:
+            geometries = np.asarray(geometries, dtype=object)[rows]
+            geodataframe = geodataframe.iloc[rows]
+        parts = query_engine.explode_draw_parts(geometries)
+        skipped_labels = {'polygon': "poligon", 'path': "çizgi"}
+        for kind, skipped_count in parts.skipped.items():
+            self._log_status(f"Uyarı: {skipped_count} geçersiz {skipped_labels.get(kind, kind)} parçası atlandı.")
+
+        popup_texts = np.array([f"Obje {index + 1}" for index in geodataframe.index], dtype=object)
+        if 'aciklama' in geodataframe.columns:
+            aciklama = geodataframe['aciklama']
+            popup_texts = np.where(aciklama.notna().to_numpy(), aciklama.astype(str).to_numpy(), popup_texts)
+
+        coords = parts.coords
+        if center is not None:
+            order = map_render.order_parts_by_distance(parts, center)
+            parts = parts._replace(kinds=parts.kinds[order], sources=parts.sources[order],
+                                   starts=parts.starts[order], counts=parts.counts[order])
+        for kind, source, start, count in zip(parts.kinds, parts.sources, parts.starts, parts.counts):
+            if kind == 'point':
+                lon, lat = coords[start]
+                yield ('point', (lat, lon), popup_texts[source])
+            else:
+                yield (kind, coords[start:start + count].tolist(), popup_texts[source])
+
+    def _fit_map_to_bounds(self, total_bounds, feature_count, single_geom=None):
+        """Haritayı verilen kapsama alanına (minx, miny, maxx, maxy) yaklaştırır."""
+        if total_bounds is None or not np.all(np.isfinite(total_bounds)):
+            self._log_status("Uyarı: Geçerli bir kapsama alanı (bounds) hesaplanamadı.")
+            return
+        min_lon, min_lat, max_lon, max_lat = total_bounds
+        self.map_widget.fit_bounding_box((max_lat, min_lon), (min_lat, max_lon))
+        current_zoom = self.map_widget.zoom
+        if current_zoom > 18:
+            self.map_widget.set_zoom(18)
+        elif feature_count == 1 and single_geom is not None and single_geom.geom_type == 'Point':
+            self.map_widget.set_position(single_geom.y, single_geom.x, zoom=15)
+
+    # --- YENİ: Akış Modu (Sunucu Tarafı İmleç) ---
+    def _stream_query_to_map(self, conn, sql_sorgusu, generation, options, simplify_tolerance=None):
+        """
+        Worker thread'de çalışır. Sorgu sonucunu sunucu tarafı imleçle parça parça çeker
+        ve her parçayı sınırlı boyutlu bir kuyruk üzerinden ana thread'e aktarır.
+        Kuyruk dolduğunda çekim bekler; böylece bellek kullanımı parça boyutuyla sınırlı kalır.
+        LOD açıksa köşe bütçesi parçalar arasında paylaştırılır.
+        """
+        chunk_queue = queue.Queue(maxsize=2)
+        stream_state = {'rows': 0, 'bounds': None, 'single_geom': None,
+                        'generation': generation, 'fit_to_data': options['fit_to_data'],
+                        'frame_budget_ms': options['frame_budget_ms'], 'draw_stats': map_render.new_draw_stats()}
+        self.root.after(0, self._consume_stream_queue, chunk_queue, stream_state)
+
+        start_time = time.perf_counter()
+        fetched_rows = 0
+        lod_totals = None
+        remaining_budget = options['vertex_budget']
+        cluster_parts = [] # Kümeleme modunda (lon, lat, satır) parçaları; indeks akış sonunda bir kez kurulur
+        try:
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", category=UserWarning)
+                for chunk in query_engine.stream_query_chunks(conn, sql_sorgusu, geom_col='geom',
+                                                              simplify_tolerance=simplify_tolerance):
+                    if fetched_rows == 0:
+                        self._log_status(f"İlk {len(chunk)} obje {time.perf_counter() - start_time:.2f} sn içinde alındı. Çizim başlıyor...")
+                    fetched_rows += len(chunk)
+                    draw_geoms, lod_stats = self._apply_lod(chunk.geometry.values, options,
+                                                            vertex_budget=max(remaining_budget, 4 * len(chunk)))
+                    if lod_stats:
+                        remaining_budget -= lod_stats['vertices_after']
+                        lod_totals = map_render.merge_lod_stats(lod_totals, lod_stats)
+                    if options['point_mode'] == 'cluster':
+                        cluster_parts.append(map_render.point_coordinates(chunk.geometry.values, chunk.index.to_numpy()))
+                        draw_geoms = map_render.without_points(draw_geoms)
+                    raster_layer = self._build_raster_layer(draw_geoms, options, fetched_rows)
+                    if not self._put_stream_item(chunk_queue, (chunk, draw_geoms, raster_layer), generation):
+                        return
+            if cluster_parts:
+                lons, lats, sources = (np.concatenate(column) for column in zip(*cluster_parts))
+                if len(lons):
+                    cluster_index = map_render.PointClusterIndex(lons, lats, sources)
+                    self.root.after(0, self._set_cluster_index, cluster_index, generation, True)
+        finally:
+            self._put_stream_item(chunk_queue, None, generation) # Akış sonu işareti
+
+        if fetched_rows == 0:
+            self._log_status("Sorgu sonuç döndürmedi.")
+        else:
+            self._log_status(f"Akış tamamlandı: {fetched_rows} obje {time.perf_counter() - start_time:.2f} sn içinde çekildi.")
+            if lod_totals:
+                self._log_lod_stats(lod_totals)
+
+    def _put_stream_item(self, chunk_queue, item, generation):
+        """Kuyrukta yer açılana kadar bekler; sorgu geçersiz kılınırsa beklemeyi bırakıp False döner."""
+        while not self._is_stale(generation):
+            try:
+                chunk_queue.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _consume_stream_queue(self, chunk_queue, stream_state):
+        """Ana thread'de çalışır. Kuyruktaki sıradaki parçayı tabloya ekler ve haritaya çizer."""
+        if self._is_stale(stream_state['generation']):
+            return
+        try:
+            item = chunk_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(20, self._consume_stream_queue, chunk_queue, stream_state)
+            return
+
+        if item is None:
+            self._on_query_finished(stream_state['generation'])
+            if stream_state['rows'] > 0:
+                self._log_status("Haritaya çizim tamamlandı.")
+                self._log_draw_stats(stream_state['draw_stats'])
+                if stream_state['fit_to_data']:
+                    self._fit_map_to_bounds(stream_state['bounds'], stream_state['rows'], stream_state['single_geom'])
+            return
+
+        chunk, draw_geoms, raster_layer = item
+        self._populate_data_grid(chunk, append=stream_state['rows'] > 0)
+        if stream_state['rows'] == 0 and len(chunk) == 1:
+            stream_state['single_geom'] = chunk.geometry.iloc[0]
+        stream_state['rows'] += len(chunk)
+
+        chunk_bounds = chunk.total_bounds
+        if stream_state['bounds'] is None:
+            stream_state['bounds'] = chunk_bounds
+        else:
+            stream_state['bounds'] = np.concatenate([
+                np.fmin(stream_state['bounds'][:2], chunk_bounds[:2]),
+                np.fmax(stream_state['bounds'][2:], chunk_bounds[2:]),
+            ])
+
+        if raster_layer is not None:
+            if self._raster_layer is None:
+                self._raster_layer = raster_layer
+            else:
+                self._raster_layer.extend(raster_layer)
+            self._schedule_raster_render()
+            self.root.after(0, self._consume_stream_queue, chunk_queue, stream_state)
+            return
+
+        gen = self._guard_generation(self._feature_generator(chunk, draw_geoms, self.map_widget.get_position()),
+                                     stream_state['generation'])
+        self._draw_features_in_batches(gen, lambda: self._consume_stream_queue(chunk_queue, stream_state),
+                                       stream_state['frame_budget_ms'], stream_state['draw_stats'])
+
+    # --- YENİ: Harita Görünümü Takibi ve Görünüm Modu ---
+    def _get_map_view_state(self):
+        """Haritanın o anki görünen kapsamını (min_lon, min_lat, max_lon, max_lat) ve zoom seviyesini döndürür."""
+        zoom = round(self.map_widget.zoom)
+        upper_left = self.map_widget.upper_left_tile_pos
+        lower_right = self.map_widget.lower_right_tile_pos
+        north, west = osm_to_decimal(upper_left[0], upper_left[1], zoom)
+        south, east = osm_to_decimal(lower_right[0], lower_right[1], zoom)
+        signature = (round(upper_left[0], 2), round(upper_left[1], 2),
+                     round(lower_right[0], 2), round(lower_right[1], 2), zoom)
+        return {'bounds': (west, south, east, north), 'zoom': zoom, 'signature': signature}
+
+    def _watch_map_view(self):
+        """
+        TkinterMapView kaydırma/zoom için olay üretmediği için kapsam periyodik olarak kontrol edilir.
+        Görünüm VIEW_DEBOUNCE_MS boyunca sabit kaldığında kayıtlı dinleyiciler bir kez çağrılır.
+        """
+        try:
+            self._position_raster_overlay()
+            self._position_vector_tiles()
+            self._position_query_layers()
+            view_state = self._get_map_view_state()
+            now = time.perf_counter()
+            if view_state['signature'] != self._pending_view_signature:
+                self._pending_view_signature = view_state['signature']
+                self._view_changed_at = now
+            elif (view_state['signature'] != self._committed_view_signature
+                  and (now - self._view_changed_at) * 1000 >= VIEW_DEBOUNCE_MS):
+                self._committed_view_signature = view_state['signature']
+                for listener in self._view_change_listeners:
+                    listener(view_state)
+        finally:
+            self.root.after(VIEW_POLL_MS, self._watch_map_view)
+
+    def _on_viewport_mode_toggled(self):
+        if not self.viewport_mode_var.get():
+            self._log_status("Görünüm modu kapatıldı.")
+        else:
+            self._log_status("Görünüm modu açıldı. Sorgu, haritanın görünen alanıyla sınırlandırılacak.")
+
+    def _on_view_changed_viewport(self, view_state):
+        """Görünüm modunda harita kaydırılıp/zoom yapıldığında sorguyu yeni kapsam için tekrarlar."""
+        if not self.viewport_mode_var.get() or not self._last_query_sql or not self.db_params:
+            return
+        self._log_status("Harita görünümü değişti, sorgu yenileniyor...")
+        self._start_query_thread(view_state)
     
-    # ... (_draw_features_in_batches metodu değişmeden kalır) ...
-    def _draw_features_in_batches(self, feature_generator, on_complete_callback, batch_size=25):
+    # --- YENİ: Detay Seviyesi (LOD) ---
+    def _apply_lod(self, geometries, options, vertex_budget=None):
+        """
+        Worker thread'de çalışır. Seçili LOD moduna göre çizilecek geometrileri ve istatistikleri döndürür.
+        İstemci modunda zoom'a göre shapely ile sadeleştirilir; sunucu modunda geometriler zaten
+        sadeleştirilmiş geldiği için yalnızca köşe bütçesi aşıldığında ek sadeleştirme yapılır.
+        """
+        if options['lod_mode'] == 'off':
+            return geometries, None
+        budget = options['vertex_budget'] if vertex_budget is None else vertex_budget
+        if options['lod_mode'] == 'client':
+            return map_render.simplify_to_budget(geometries, options['zoom'], budget)
+
+        server_tolerance = map_render.tolerance_for_zoom(options['zoom'])
+        start_time = time.perf_counter()
+        vertices = map_render.count_vertices(geometries)
+        if vertices <= budget:
+            return geometries, {'zoom': options['zoom'], 'tolerance': server_tolerance, 'vertices_before': None,
+                                'vertices_after': vertices, 'seconds': time.perf_counter() - start_time}
+        return map_render.simplify_to_budget(geometries, options['zoom'], budget, start_tolerance=server_tolerance * 2)
+
+    def _log_lod_stats(self, stats, draw_seconds=None):
+        """LOD sonucunu (köşe sayıları, sadeleştirme süresi ve tahmini kazanılan çizim süresi) loglar."""
+        before, after = stats['vertices_before'], stats['vertices_after']
+        if before is None:
+            self._log_status(f"LOD (Sunucu, zoom {stats['zoom']}): tolerans {stats['tolerance']:.2e}°, {after:,} köşe çizildi.")
+            return
+        removed = before - after
+        reduction = 100.0 * removed / before if before else 0.0
+        message = (f"LOD (zoom {stats['zoom']}): {before:,} → {after:,} köşe (%{reduction:.0f} azaltıldı, "
+                   f"tolerans {stats['tolerance']:.2e}°, sadeleştirme {stats['seconds'] * 1000:.0f} ms)")
+        if draw_seconds and after > 0 and removed > 0:
+            message += f", tahmini kazanılan çizim süresi: {removed * draw_seconds / after:.2f} sn"
+        self._log_status(message)
+
+    def _on_view_changed_lod(self, view_state):
+        """Zoom seviyesi değiştiğinde mevcut sonucu yeni zoom'a göre yeniden sadeleştirir."""
+        lod_mode = LOD_MODES.get(self.lod_mode_var.get(), 'off')
+        if lod_mode == 'off' or self._lod_zoom is None or view_state['zoom'] == self._lod_zoom:
+            return
+        if self.viewport_mode_var.get():
+            return # Görünüm modu her kaydırma/zoom'da zaten yeniden sorgular
+        if lod_mode == 'client' and self._current_gdf is not None:
+            self._redraw_current_result(view_state['zoom'])
+        elif self._last_query_sql and self.db_params:
+            self._log_status(f"Zoom değişti ({self._lod_zoom} → {view_state['zoom']}), sorgu yeni detay seviyesiyle yenileniyor...")
+            self._start_query_thread(None, fit_to_data=False)
+
+    def _redraw_current_result(self, zoom):
+        """Saklanan tam detaylı sonucu veritabanına gitmeden yeni zoom seviyesine göre yeniden çizer."""
+        self._query_generation += 1
+        generation = self._query_generation
+        gdf = self._current_gdf
+        options = dict(self._current_options, lod_mode=LOD_MODES.get(self.lod_mode_var.get(), 'off'),
+                       vertex_budget=self._get_vertex_budget(), zoom=zoom, fit_to_data=False,
+                       frame_budget_ms=self._get_frame_budget())
+        self._current_options = options
+        self._lod_zoom = zoom
+        self._clear_map()
+        self._log_status(f"Zoom {zoom} için geometriler yeniden sadeleştiriliyor...")
+
+        def _simplify_worker():
+            draw_geoms, lod_stats = self._apply_lod(gdf.geometry.values, options)
+            if self._cluster_index is not None:
+                draw_geoms = map_render.without_points(draw_geoms)
+            raster_layer = self._build_raster_layer(draw_geoms, options, len(gdf))
+            if not self._is_stale(generation):
+                self.root.after(0, self._draw_result, gdf, draw_geoms, generation, options, lod_stats, raster_layer)
+
+        threading.Thread(target=_simplify_worker, daemon=True).start()
+
+    # --- YENİ: Nokta Kümeleme ---
+    def _set_cluster_index(self, cluster_index, generation, render=False):
+        if self._is_stale(generation):
+            return
+        self._cluster_index = cluster_index
+        self._log_status(f"{len(cluster_index)} nokta için kümeleme indeksi kuruldu.")
+        if render:
+            self._render_clusters()
+
+    def _get_cluster_icon(self, count):
+        """Küme ikonunu nokta sayısının basamak sayısına göre boyutlandırır (ikonlar önbellekte tutulur)."""
+        size = min(14 + 6 * len(str(count)), 44)
+        if size not in self._cluster_icons:
+            self._cluster_icons[size] = create_cluster_icon(size, (255, 165, 0, 180), (255, 120, 0, 255))
+        return self._cluster_icons[size]
+
+    def _render_clusters(self):
+        """Görünen alandaki kümeleri o anki zoom seviyesine göre (yeniden) çizer."""
+        for marker in self._cluster_markers:
+            marker.delete()
+        self._cluster_markers = []
+        cluster_index = self._cluster_index
+        if cluster_index is None:
+            return
+
+        view_state = self._get_map_view_state()
+        zoom = view_state['zoom']
+        lons, lats, counts, keys = cluster_index.clusters(zoom, bounds=view_state['bounds'])
+        for lon, lat, count, key in zip(lons, lats, counts, keys):
+            if count == 1:
+                marker = self.map_widget.set_marker(lat, lon, text="", icon=self.small_orange_icon)
+            else:
+                marker = self.map_widget.set_marker(
+                    lat, lon, text=str(count), icon=self._get_cluster_icon(count),
+                    command=lambda _marker, z=zoom, k=key: self._on_cluster_click(z, k))
+            self._cluster_markers.append(marker)
+        self._log_status(f"Kümeleme (zoom {zoom}): görünen alanda {int(counts.sum())} nokta → {len(counts)} küme.")
+
+    def _on_cluster_click(self, zoom, key):
+        """Tıklanan kümeyi, kümenin bölündüğü ilk zoom seviyesine yaklaşarak açar."""
+        cluster_index = self._cluster_index
+        if cluster_index is None:
+            return
+        members = cluster_index.members(zoom, key)
+        if not len(members):
+            return
+        lons, lats = map_render.unit_mercator_to_lonlat(cluster_index.x[members].mean(), cluster_index.y[members].mean())
+        self.map_widget.set_position(float(lats), float(lons))
+        self.map_widget.set_zoom(cluster_index.expansion_zoom(zoom, key))
+
+    def _on_view_changed_cluster(self, view_state):
+        if self._cluster_index is not None:
+            self._render_clusters()
+
+    # --- YENİ: Mekânsal İndeks (Görünüm Ayıklama, Tıklama ve Kutu Seçimi) ---
+    def _start_culling(self, gdf, draw_geoms, generation, options):
+        """
+        Vektör çizimde yalnızca görünen alandaki (kenar payıyla) satırları döndürür ve hangi satırların
+        çizildiğini saklar; kaydırma/zoom sonrası yeni görünenler _on_view_changed_culling ile eklenir.
+        İndeks yoksa veya harita sonuca yaklaştırılacaksa (bütün sonuç görünür) None döner ve hepsi çizilir.
+        """
+        self._culled = None
+        index = self._feature_index
+        if index is None or len(index) != len(gdf) or options['fit_to_data']:
+            return None
+        view_bounds = map_render.expand_bounds(self._get_map_view_state()['bounds'], map_render.CULL_MARGIN)
+        rows = index.query_bounds(view_bounds)
+        drawn = np.zeros(len(gdf), dtype=bool)
+        drawn[rows] = True
+        self._culled = {'gdf': gdf, 'draw_geoms': draw_geoms, 'generation': generation,
+                        'frame_budget_ms': options['frame_budget_ms'], 'drawn': drawn}
+        if len(rows) < len(gdf):
+            self._log_status(f"Görünüm ayıklaması: görünen alandaki {len(rows)} / {len(gdf)} obje çiziliyor.")
+        return rows
+
+    def _on_view_changed_culling(self, view_state):
+        """Kaydırma/zoom sonrası görünen alana giren ve henüz çizilmemiş objeleri çizer."""
+        culled = self._culled
+        if culled is None or self._is_stale(culled['generation']) or self._feature_index is None:
+            return
+        visible = self._feature_index.query_bounds(map_render.expand_bounds(view_state['bounds'], map_render.CULL_MARGIN))
+        rows = visible[~culled['drawn'][visible]]
+        if not len(rows):
+            return
+        culled['drawn'][rows] = True
+        generation = culled['generation']
+
+        def on_drawing_complete():
+            if not self._is_stale(generation):
+                self._log_status(f"Görünüm ayıklaması: görünen alana giren {len(rows)} obje eklendi "
+                                 f"(çizilen {int(culled['drawn'].sum())} / {len(culled['drawn'])}).")
+
+        gen = self._guard_generation(self._feature_generator(culled['gdf'], culled['draw_geoms'],
+                                                             self.map_widget.get_position(), rows), generation)
+        self._draw_features_in_batches(gen, on_drawing_complete, culled['frame_budget_ms'])
+
+    def _on_map_click(self, coordinate):
+        """Tıklanan noktadaki objeyi mekânsal indeksle bulur, özniteliklerini gösterir ve tabloda seçer."""
+        index, gdf = self._feature_index, self._current_gdf
+        if index is None or gdf is None:
+            return
+        lat, lon = coordinate
+        start = time.perf_counter()
+        row = index.identify(lon, lat, map_render.identify_tolerance(self.map_widget.zoom, lat))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if self._identify_marker is not None:
+            self._identify_marker.delete()
+            self._identify_marker = None
+        if row is None:
+            self._select_rows(np.zeros(0, dtype=np.int64))
+            self._log_status(f"Tıklanan noktada obje bulunamadı ({elapsed_ms:.2f} ms).")
+            return
+        lines = self._describe_row(gdf, row)
+        self._identify_marker = self.map_widget.set_marker(lat, lon, text="\n".join(lines), font=("Consolas", 9))
+        self._log_status(f"Obje {row + 1} ({elapsed_ms:.2f} ms): " + " | ".join(lines))
+        self._select_rows(np.array([row], dtype=np.int64))
+
+    def _describe_row(self, gdf, row):
+        """Obje etiketinin satırları: 'aciklama' doluysa o, değilse satırın ilk öznitelikleri."""
+        record = gdf.iloc[row]
+        if 'aciklama' in gdf.columns and pd.notna(record['aciklama']):
+            return [format_cell(record['aciklama'])]
+        columns = [col for col in gdf.columns if col != gdf.geometry.name]
+        lines = [f"{col}: {format_cell(record[col])}" for col in columns[:IDENTIFY_MAX_FIELDS]]
+        if len(columns) > IDENTIFY_MAX_FIELDS:
+            lines.append(f"… (+{len(columns) - IDENTIFY_MAX_FIELDS} alan)")
+        return lines or [f"Obje {row + 1}"]
+
+    def _select_rows(self, rows, from_grid=False):
+        """Seçili satırları haritada vurgular; seçim haritadan geldiyse 'Tablo' sekmesinde de seçer."""
+        for item in self._highlight_items:
+            item.delete()
+        self._highlight_items = []
+        if not from_grid:
+            self.data_grid.select_positions(rows)
+        gdf = self._current_gdf
+        if gdf is None or not len(rows):
+            return
+        shown = rows[:SELECTION_HIGHLIGHT_LIMIT]
+        for geom_type, data, _ in self._feature_generator(gdf, rows=shown):
+            self._highlight_items.append(self._draw_feature(geom_type, data, highlight=True))
+        if len(rows) > len(shown):
+            self._log_status(f"Seçili {len(rows)} objenin ilk {len(shown)} tanesi haritada vurgulandı.")
+
+    def _on_grid_selection_changed(self, positions):
+        """Tabloda seçilen satırları haritada vurgular (akış modunda tam sonuç tutulmadığı için yapılmaz)."""
+        gdf = self._current_gdf
+        if gdf is None or len(self.data_grid) != len(gdf):
+            return
+        self._select_rows(positions, from_grid=True)
+
+    def _on_box_select_start(self, event):
+        if self._feature_index is None:
+            return
+        self._box_select_origin = (event.x, event.y)
+        canvas = self.map_widget.canvas
+        canvas.delete('box_select')
+        canvas.create_rectangle(event.x, event.y, event.x, event.y, outline="cyan", dash=(4, 2), width=2,
+                                tags='box_select')
+
+    def _on_box_select_drag(self, event):
+        if self._box_select_origin is not None:
+            x0, y0 = self._box_select_origin
+            self.map_widget.canvas.coords('box_select', x0, y0, event.x, event.y)
+
+    def _on_box_select_end(self, event):
+        """Shift+sürükle ile çizilen kutuyla kesişen objeleri seçer ve tabloda işaretler."""
+        origin = self._box_select_origin
+        if origin is None:
+            return
+        self._box_select_origin = None
+        self.map_widget.canvas.delete('box_select')
+        index = self._feature_index
+        x0, y0 = origin
+        if index is None or max(abs(event.x - x0), abs(event.y - y0)) < BOX_SELECT_MIN_PX:
+            return
+        lat0, lon0 = self.map_widget.convert_canvas_coords_to_decimal_coords(x0, y0)
+        lat1, lon1 = self.map_widget.convert_canvas_coords_to_decimal_coords(event.x, event.y)
+        start = time.perf_counter()
+        rows = index.select_box((min(lon0, lon1), min(lat0, lat1), max(lon0, lon1), max(lat0, lat1)))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._select_rows(rows)
+        self._log_status(f"Kutu seçimi: {len(rows)} obje ({elapsed_ms:.2f} ms); seçim 'Tablo' sekmesinde işaretlendi.")
+
+    # --- YENİ: Raster Çizim Motoru ---
+    def _build_raster_layer(self, draw_geoms, options, feature_count):
+        """
+        Worker thread'de çalışır. Raster motoru seçiliyse (veya 'Otomatik' modda obje sayısı eşiği
+        aştıysa) çizim parçalarını projekte ederek bir RasterLayer kurar; aksi halde None döner.
+        """
+        renderer = options['renderer']
+        if renderer == 'vector' or (renderer == 'auto' and feature_count < map_render.RASTER_AUTO_THRESHOLD):
+            return None
+        return map_render.RasterLayer.from_parts(query_engine.explode_draw_parts(draw_geoms))
+
+    def _schedule_raster_render(self, delay_ms=300):
+        """Akış modunda raster görüntüyü her parçada değil, en fazla delay_ms aralıklarla yeniden çizer."""
+        if self._raster_render_pending:
+            return
+        self._raster_render_pending = True
+
+        def _render():
+            self._raster_render_pending = False
+            self._render_raster_overlay()
+
+        self.root.after(delay_ms, _render)
+
+    def _render_raster_overlay(self):
+        """Raster katmanı o anki görünüm için arka planda çizer; sonuç ana thread'de tek bir canvas görüntüsü olarak gösterilir."""
+        raster_layer = self._raster_layer
+        if raster_layer is None:
+            return
+        self._raster_token += 1
+        token = self._raster_token
+        upper_left = self.map_widget.upper_left_tile_pos
+        zoom = round(self.map_widget.zoom)
+        width = self.map_widget.canvas.winfo_width()
+        height = self.map_widget.canvas.winfo_height()
+        tile_size = self.map_widget.tile_size
+
+        def _render_worker():
+            start_time = time.perf_counter()
+            image = raster_layer.render(upper_left, zoom, width, height, tile_size=tile_size)
+            elapsed = time.perf_counter() - start_time
+            self.root.after(0, self._show_raster_overlay, image, token, upper_left, zoom, len(raster_layer), elapsed)
+
+        threading.Thread(target=_render_worker, daemon=True).start()
+
+    def _show_raster_overlay(self, image, token, upper_left, zoom, part_count, elapsed):
+        if token != self._raster_token:
+            return # Bu arada daha yeni bir çizim istendi
+        self._raster_photo = ImageTk.PhotoImage(image) # Referans tutulmazsa görüntü silinir
+        canvas = self.map_widget.canvas
+        canvas.delete('raster_overlay')
+        canvas.create_image(0, 0, image=self._raster_photo, anchor=NW, tags='raster_overlay')
+        self._raster_origin = (upper_left, zoom)
+        self._position_raster_overlay()
+        self._log_status(f"Raster çizim: {part_count} obje, {image.width}x{image.height} px, {elapsed * 1000:.0f} ms.")
+
+    def _position_raster_overlay(self, event=None):
+        """Raster görüntüyü, yeniden çizilene kadar haritanın kaydırılmasıyla birlikte taşır."""
+        if self._raster_origin is None:
+            return
+        canvas = self.map_widget.canvas
+        (origin_x, origin_y), zoom = self._raster_origin
+        if round(self.map_widget.zoom) != zoom:
+            canvas.itemconfigure('raster_overlay', state='hidden') # Zoom değişti; yeni görüntü çizilene kadar gizle
+            return
+        upper_left = self.map_widget.upper_left_tile_pos
+        tile_size = self.map_widget.tile_size
+        canvas.coords('raster_overlay', (origin_x - upper_left[0]) * tile_size, (origin_y - upper_left[1]) * tile_size)
+        canvas.itemconfigure('raster_overlay', state='normal')
         try:
-            for _ in range(batch_size):
+            canvas.tag_raise('raster_overlay', 'tile') # Altlık karolarının üstünde, işaretçilerin altında kalsın
+        except TclError:
+            pass
+
+    def _on_view_changed_raster(self, view_state):
+        if self._raster_layer is not None:
+            self._render_raster_overlay()
+
+    # --- YENİ: Vektör Karo (MVT) Katmanı ---
+    def open_vector_tile_layer(self):
+        """Kenar çubuğunda seçili tabloyu, görünen karolar sunucuda ST_AsMVT ile üretilerek gösterir."""
+        if not self.db_params:
+            messagebox.showwarning("Bağlantı Yok", "Önce veritabanına bağlanın.", parent=self.root)
+            return
+        table = self._tree_tables.get(self.db_tree.focus())
+        if table is None:
+            messagebox.showinfo("Bilgi", "Kenar çubuğundan bir tablo seçin.", parent=self.root)
+            return
+        self.close_vector_tile_layer(log=False)
+        self._vector_layer = vector_tiles.VectorTileLayer(table['schema'], table['table'], table['geom_col'],
+                                                          table['srid'], table['type'],
+                                                          tile_size=self.map_widget.tile_size)
+        self._log_status(f"Karo katmanı açıldı: {self._vector_layer.name} "
+                         f"(karo başına en fazla {vector_tiles.VECTOR_TILE_MAX_FEATURES} obje).")
+        self._refresh_vector_tiles()
+
+    def close_vector_tile_layer(self, log=True, shutdown=False):
+        layer = self._vector_layer
+        self._vector_layer = None
+        self._vector_tile_generation += 1 # Kuyruktaki karo üretimleri atlanır
+        self._vector_tile_items = {}
+        self._vector_tiles_wanted = set()
+        self.map_widget.canvas.delete('vector_tile')
+        if self._vector_tile_executor is not None and shutdown:
+            self._vector_tile_executor.shutdown(wait=False, cancel_futures=True)
+            self._vector_tile_executor = None
+        if layer is not None and log:
+            self._log_status(layer.format_stats())
+            self._log_status("Karo katmanı kapatıldı.")
+
+    def _visible_tile_keys(self):
+        """Ekrandaki karoların (zoom, x, y) anahtarları; merkeze yakın olanlar önce."""
+        zoom = round(self.map_widget.zoom)
+        upper_left = self.map_widget.upper_left_tile_pos
+        lower_right = self.map_widget.lower_right_tile_pos
+        last = 2 ** zoom - 1
+        x0, y0 = max(math.floor(upper_left[0]), 0), max(math.floor(upper_left[1]), 0)
+        x1, y1 = min(math.ceil(lower_right[0]) - 1, last), min(math.ceil(lower_right[1]) - 1, last)
+        center_x, center_y = (x0 + x1) / 2, (y0 + y1) / 2
+        keys = [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+        keys.sort(key=lambda key: abs(key[1] - center_x) + abs(key[2] - center_y))
+        return keys
+
+    def _refresh_vector_tiles(self):
+        """
+        Görünen karoları gösterir: bellekteki (LRU) karolar hemen çizilir, eksikler thread havuzunda paralel
+        üretilir. Ekrandan çıkan karoların canvas öğeleri silinir; iş miktarı tablonun değil ekranın boyutuna bağlıdır.
+        """
+        layer = self._vector_layer
+        if layer is None:
+            return
+        self._vector_tile_generation += 1
+        generation = self._vector_tile_generation
+        visible = self._visible_tile_keys()
+        self._vector_tiles_wanted = set(visible)
+        canvas = self.map_widget.canvas
+        for key in [key for key in self._vector_tile_items if key not in self._vector_tiles_wanted]:
+            item, _ = self._vector_tile_items.pop(key)
+            if item is not None:
+                canvas.delete(item)
+
+        missing = []
+        for key in visible:
+            if key in self._vector_tile_items:
+                continue
+            found, image = layer.cached(key)
+            if found:
+                self._show_vector_tile(layer, key, image)
+            else:
+                missing.append(key)
+        if not missing:
+            return
+        batch = {'visible': len(visible), 'cached': len(visible) - len(missing), 'loaded': 0, 'failed': 0,
+                 'remaining': len(missing), 'error': None, 'started': time.perf_counter()}
+        if self._vector_tile_executor is None:
+            self._vector_tile_executor = ThreadPoolExecutor(max_workers=vector_tiles.VECTOR_TILE_WORKERS,
+                                                            thread_name_prefix="vector-tile")
+        for key in missing:
+            self._vector_tile_executor.submit(self._load_vector_tile, generation, layer, key, batch)
+
+    def _load_vector_tile(self, generation, layer, key, batch):
+        """Worker thread'de çalışır. Karo hâlâ gerekiyorsa sunucuda üretilir; sonuç ana thread'e aktarılır."""
+        if generation != self._vector_tile_generation:
+            return # Görünüm değişti; karo hâlâ görünüyorsa yeni görünüm onu yeniden ister
+        found, image = layer.cache.get(key) # Önceki görünümün üretimi bu arada bitirmiş olabilir
+        error = None
+        if not found:
+            pool = db_pool.get_pool(self.db_params)
+            conn = None
+            discard = False
+            try:
+                conn = pool.acquire(background=True) # Ana sorguya ayrılan bağlantılara dokunmaz
+                image = layer.load_tile(conn, *key)
+            except psycopg2.Error as e:
+                discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+                error = str(e).strip()
+            except Exception as e:
+                error = str(e)
+            finally:
+                if conn:
+                    pool.release(conn, discard=discard)
+        self.root.after(0, self._on_vector_tile_loaded, layer, key, image, error, batch)
+
+    def _on_vector_tile_loaded(self, layer, key, image, error, batch):
+        batch['remaining'] -= 1
+        if error is not None:
+            batch['failed'] += 1
+            batch['error'] = error
+        else:
+            batch['loaded'] += 1
+            self._show_vector_tile(layer, key, image)
+        if batch['remaining'] == 0 and layer is self._vector_layer:
+            self._log_vector_tile_batch(layer, batch)
+
+    def _show_vector_tile(self, layer, key, image):
+        if layer is not self._vector_layer or key not in self._vector_tiles_wanted or key in self._vector_tile_items:
+            return
+        if image is None:
+            self._vector_tile_items[key] = (None, None) # Boş karo: canvas öğesi gerekmez
+            return
+        photo = ImageTk.PhotoImage(image) # Referans tutulmazsa görüntü silinir
+        item = self.map_widget.canvas.create_image(0, 0, image=photo, anchor=NW, tags='vector_tile')
+        self._vector_tile_items[key] = (item, photo)
+        self._position_vector_tiles()
+
+    def _position_vector_tiles(self, event=None):
+        """Karo görüntülerini haritayla birlikte taşır; zoom değiştiyse yeni karolar gelene kadar gizler."""
+        if not self._vector_tile_items:
+            return
+        canvas = self.map_widget.canvas
+        zoom = round(self.map_widget.zoom)
+        upper_left = self.map_widget.upper_left_tile_pos
+        tile_size = self.map_widget.tile_size
+        for (tile_zoom, x, y), (item, _) in self._vector_tile_items.items():
+            if item is None:
+                continue
+            if tile_zoom != zoom:
+                canvas.itemconfigure(item, state='hidden')
+                continue
+            canvas.coords(item, (x - upper_left[0]) * tile_size, (y - upper_left[1]) * tile_size)
+            canvas.itemconfigure(item, state='normal')
+        try:
+            canvas.tag_raise('vector_tile', 'tile') # Altlık karolarının üstünde, sorgu sonuçlarının altında
+        except TclError:
+            pass
+
+    def _on_view_changed_vector_tiles(self, view_state):
+        if self._vector_layer is not None:
+            self._refresh_vector_tiles()
+
+    def _log_vector_tile_batch(self, layer, batch):
+        elapsed_ms = (time.perf_counter() - batch['started']) * 1000
+        self._log_status(f"Karo katmanı: {batch['visible']} görünür karo, {batch['cached']} bellekten, "
+                         f"{batch['loaded']} sunucudan ({elapsed_ms:.0f} ms).")
+        if batch['failed']:
+            hint = " (ST_TileEnvelope için PostGIS 3.0 veya üstü gerekir)" if 'st_tileenvelope' in batch['error'].lower() else ""
+            self._log_status(f"UYARI: {batch['failed']} karo üretilemedi{hint}: {batch['error']}")
+        self._log_status(layer.format_stats())
+
+    # --- YENİ: Sorgu Katmanları ---
+    def add_query_layer(self):
+        """SQL kutusundaki sorguyu en üste yeni bir katman olarak ekler ve arka planda çeker."""
+        if not self.db_params:
+            messagebox.showwarning("Bağlantı Yok", "Önce veritabanına bağlanın.", parent=self.root)
+            return
+        sql = self.query_text.get("1.0", END).strip()
+        if not sql:
+            messagebox.showwarning("Sorgu Yok", "Lütfen bir SQL sorgusu girin.", parent=self.root)
+            return
+        used_colors = {layer.color for layer in self._query_layers}
+        color = next((name for name in map_layers.LAYER_COLORS if name not in used_colors), "Sarı")
+        layer = map_layers.QueryLayer(sql, color=color)
+        self._query_layers.insert(0, layer)
+        self._refresh_layer_list(select=layer)
+        self._fetch_query_layer(layer)
+
+    def _selected_query_layer(self):
+        focus = self.layer_tree.focus()
+        return next((layer for layer in self._query_layers if str(layer.id) == focus), None)
+
+    def _get_layer_memory_limit(self):
+        try:
+            return max(int(self.layer_memory_limit_var.get()), 1)
+        except (ValueError, TclError):
+            return map_layers.LAYER_MEMORY_LIMIT_MB
+
+    def _fetch_query_layer(self, layer):
+        """Katmanın sorgusunu thread havuzunda çeker; diğer katmanların çekimleriyle paralel çalışır."""
+        self._cancel_query_layer_fetch(layer)
+        generation = layer.start_fetch()
+        if self._layer_fetch_executor is None:
+            self._layer_fetch_executor = ThreadPoolExecutor(max_workers=map_layers.LAYER_FETCH_WORKERS,
+                                                            thread_name_prefix="query-layer")
+        self._update_layer_row(layer)
+        self._log_status(f"Katman '{layer.name}' arka planda çekiliyor...")
+        self._layer_fetch_executor.submit(self._fetch_query_layer_worker, layer, generation,
+                                          self._get_layer_memory_limit() * 1024 * 1024, self._get_query_timeout())
+
+    def _cancel_query_layer_fetch(self, layer):
+        """Katmanın süren çekimini sunucuda iptal eder (connection.cancel thread-safe'dir)."""
+        conn = layer.active_conn
+        if conn is not None and not conn.closed:
+            try:
+                conn.cancel()
+            except psycopg2.Error:
+                pass
+
+    def _fetch_query_layer_worker(self, layer, generation, memory_limit_bytes, timeout_s):
+        """
+        Worker thread'de çalışır. Bağlantıyı havuzdan alır, katmanı bellek sınırıyla parça parça çeker
+        ve sonucu ana thread'e aktarır. Katman kaldırılır veya yeniden çekilirse çekim yarıda bırakılır.
+        """
+        if not layer.is_current(generation):
+            return
+        pool = db_pool.get_pool(self.db_params)
+        conn = None
+        discard = False
+        result = error = None
+        start_time = time.perf_counter()
+        try:
+            conn = pool.acquire(background=True) # Ana sorguya ayrılan bağlantılara dokunmaz
+            layer.active_conn = conn
+            if timeout_s:
+                query_engine.set_statement_timeout(conn, timeout_s)
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", category=UserWarning)
+                result = map_layers.fetch_layer(conn, layer.sql, memory_limit_bytes,
+                                                is_cancelled=lambda: not layer.is_current(generation))
+        except psycopg2.extensions.QueryCanceledError:
+            error = f"{timeout_s} sn zaman aşımı" if timeout_s else "sorgu iptal edildi"
+        except psycopg2.Error as e:
+            discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            error = str(e).strip()
+        except Exception as e:
+            error = str(e)
+        finally:
+            if layer.active_conn is conn:
+                layer.active_conn = None
+            if conn:
+                pool.release(conn, discard=discard)
+        self.root.after(0, self._on_query_layer_fetched, layer, generation, result, error,
+                        time.perf_counter() - start_time)
+
+    def _on_query_layer_fetched(self, layer, generation, result, error, seconds):
+        if layer not in self._query_layers:
+            return
+        if error is not None:
+            if layer.set_error(generation, error):
+                self._update_layer_row(layer)
+                self._log_status(f"Katman '{layer.name}' çekilemedi: {error}")
+            return
+        if result is None:
+            return # Çekim iptal edildi; yerine yenisi başlatıldı
+        raster, rows, truncated = result
+        if not layer.set_result(generation, raster, rows, truncated, seconds):
+            return
+        self._update_layer_row(layer)
+        self._log_status(layer.format_stats())
+        if truncated:
+            self._log_status(f"UYARI: Katman '{layer.name}' {self._get_layer_memory_limit()} MB bellek sınırına "
+                             f"ulaştı; ilk {rows} obje gösteriliyor.")
+        self._render_query_layer(layer)
+
+    def _render_query_layer(self, layer):
+        """Görünür katmanı o anki görünüm için kendi rengiyle arka planda çizer."""
+        if not layer.visible or layer.raster is None:
+            return
+        self._layer_render_token += 1
+        token = self._layer_render_token
+        self._layer_render_wanted[layer.id] = token
+        view = (self.map_widget.upper_left_tile_pos, round(self.map_widget.zoom),
+                self.map_widget.canvas.winfo_width(), self.map_widget.canvas.winfo_height(), self.map_widget.tile_size)
+        if self._layer_render_executor is None:
+            self._layer_render_executor = ThreadPoolExecutor(max_workers=map_layers.LAYER_RENDER_WORKERS,
+                                                             thread_name_prefix="query-layer-render")
+        self._layer_render_executor.submit(self._render_query_layer_worker, layer, token, view)
+
+    def _render_query_layer_worker(self, layer, token, view):
+        if self._layer_render_wanted.get(layer.id) != token:
+            return # Görünüm bu arada yine değişti
+        upper_left, zoom, width, height, tile_size = view
+        image, _ = map_layers.render_layer(layer, upper_left, zoom, width, height, tile_size)
+        self.root.after(0, self._show_query_layer, layer, token, image, upper_left, zoom)
+
+    def _show_query_layer(self, layer, token, image, upper_left, zoom):
+        if image is None or self._layer_render_wanted.get(layer.id) != token or layer not in self._query_layers:
+            return
+        photo = ImageTk.PhotoImage(image) # Referans tutulmazsa görüntü silinir
+        canvas = self.map_widget.canvas
+        canvas.delete(layer.tag)
+        canvas.create_image(0, 0, image=photo, anchor=NW, tags=('query_layer', layer.tag))
+        self._layer_items[layer.id] = (photo, (upper_left, zoom))
+        self._position_query_layers()
+
+    def _position_query_layers(self, event=None):
+        """
+        Katman görüntülerini haritayla birlikte taşır ve listedeki sıraya göre üst üste dizer
+        (listede üstteki katman haritada da üstte). Gizli katmanlar ve eski zoom'un görüntüleri gizlenir.
+        """
+        if not self._layer_items:
+            return
+        canvas = self.map_widget.canvas
+        zoom = round(self.map_widget.zoom)
+        upper_left = self.map_widget.upper_left_tile_pos
+        tile_size = self.map_widget.tile_size
+        for layer in self._query_layers:
+            item = self._layer_items.get(layer.id)
+            if item is None:
+                continue
+            _, ((origin_x, origin_y), origin_zoom) = item
+            if not layer.visible or origin_zoom != zoom:
+                canvas.itemconfigure(layer.tag, state='hidden')
+                continue
+            canvas.coords(layer.tag, (origin_x - upper_left[0]) * tile_size, (origin_y - upper_left[1]) * tile_size)
+            canvas.itemconfigure(layer.tag, state='normal')
+            try:
+                # Üstten alta gidildiği için her katman bir öncekinin altına, altlık karolarının hemen üstüne iner
+                canvas.tag_raise(layer.tag, 'tile')
+            except TclError:
+                pass
+
+    def _on_view_changed_query_layers(self, view_state):
+        for layer in self._query_layers:
+            self._render_query_layer(layer)
+
+    def _on_query_layer_selected(self, event=None):
+        layer = self._selected_query_layer()
+        if layer is not None:
+            self.layer_color_var.set(layer.color)
+
+    def toggle_query_layer(self):
+        """Seçili katmanı gizler/gösterir; sorgu tekrarlanmaz, gösterilen katman yalnızca yeniden çizilir."""
+        layer = self._selected_query_layer()
+        if layer is None:
+            return
+        layer.visible = not layer.visible
+        self._update_layer_row(layer)
+        self._position_query_layers()
+        self._render_query_layer(layer)
+        self._log_status(f"Katman '{layer.name}' {'gösterildi' if layer.visible else 'gizlendi'}.")
+
+    def move_query_layer(self, step):
+        """Seçili katmanı listede (ve haritadaki çizim sırasında) bir adım yukarı/aşağı taşır."""
+        layer = self._selected_query_layer()
+        if layer is None:
+            return
+        index = self._query_layers.index(layer)
+        target = index + step
+        if not 0 <= target < len(self._query_layers):
+            return
+        self._query_layers[index], self._query_layers[target] = self._query_layers[target], layer
+        self._refresh_layer_list(select=layer)
+        self._position_query_layers()
+
+    def on_query_layer_color_changed(self, event=None):
+        layer = self._selected_query_layer()
+        if layer is None or layer.color == self.layer_color_var.get():
+            return
+        layer.color = self.layer_color_var.get()
+        self._update_layer_row(layer)
+        self._render_query_layer(layer)
+
+    def refresh_query_layer(self):
+        """Seçili katmanın sorgusunu yeniden çalıştırır (tablo değiştiyse veya bellek sınırı değiştirildiyse)."""
+        layer = self._selected_query_layer()
+        if layer is not None:
+            self._fetch_query_layer(layer)
+
+    def remove_query_layer(self):
+        layer = self._selected_query_layer()
+        if layer is None:
+            return
+        self._query_layers.remove(layer)
+        self._cancel_query_layer_fetch(layer)
+        layer.release()
+        self.map_widget.canvas.delete(layer.tag)
+        self._layer_items.pop(layer.id, None)
+        self._layer_render_wanted.pop(layer.id, None)
+        self._refresh_layer_list()
+        self._log_status(f"Katman '{layer.name}' kaldırıldı.")
+
+    def close_query_layers(self):
+        """Uygulama kapanırken süren katman çekimlerini iptal eder ve thread havuzlarını kapatır."""
+        for layer in self._query_layers:
+            self._cancel_query_layer_fetch(layer)
+            layer.release()
+        for executor in (self._layer_fetch_executor, self._layer_render_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._layer_fetch_executor = self._layer_render_executor = None
+
+    def _layer_row_values(self, layer):
+        return ("✓" if layer.visible else "–", layer.color, layer.rows, f"{layer.memory_bytes / 1e6:.1f}", layer.status)
+
+    def _refresh_layer_list(self, select=None):
+        self.layer_tree.delete(*self.layer_tree.get_children())
+        for layer in self._query_layers:
+            self.layer_tree.insert("", END, iid=str(layer.id), text=layer.name, values=self._layer_row_values(layer))
+        if select is not None:
+            self.layer_tree.selection_set(str(select.id))
+            self.layer_tree.focus(str(select.id))
+        self._update_layer_memory_label()
+
+    def _update_layer_row(self, layer):
+        if self.layer_tree.exists(str(layer.id)):
+            self.layer_tree.item(str(layer.id), values=self._layer_row_values(layer))
+        self._update_layer_memory_label()
+
+    def _update_layer_memory_label(self):
+        if not self._query_layers:
+            self.layer_memory_label.config(text="")
+            return
+        total = sum(layer.memory_bytes for layer in self._query_layers)
+        self.layer_memory_label.config(text=f"{len(self._query_layers)} katman, toplam {total / 1e6:.1f} MB "
+                                            f"(katman başına sınır {self._get_layer_memory_limit()} MB)")
+
+    # --- YENİ: Kare Bütçeli Çizim Zamanlayıcısı ---
+    def _draw_features_in_batches(self, feature_generator, on_complete_callback,
+                                  budget_ms=map_render.DRAW_FRAME_BUDGET_MS, stats=None):
+        """
+        Objeleri sabit sayıda değil, kare başına ayrılan süre (budget_ms) dolana kadar çizer.
+        Obje başına çizim süresi ölçülür; bir sonraki objenin tahmini süresi bütçeyi aşacaksa
+        kare kapatılır ve kalan objeler root.after ile sonraki karede çizilir.
+        Her karede en az bir obje çizilir. Ölçümler stats sözlüğünde toplanır.
+        """
+        if stats is None:
+            stats = map_render.new_draw_stats()
+        budget = budget_ms / 1000.0
+        frame_start = time.perf_counter()
+        drawn = 0
+        try:
+            while True:
+                item_start = time.perf_counter()
+                if drawn and (item_start - frame_start) + stats['item_cost'] > budget:
+                    break
                 geom_type, data, _ = next(feature_generator) # popup_text'i almıyoruz
+                self._draw_feature(geom_type, data)
+                map_render.update_item_cost(stats, time.perf_counter() - item_start)
+                drawn += 1
 
-                if geom_type == 'polygon':
-                    coords_lon_lat = data
-                    coords_lat_lon = [(lat, lon) for lon, lat in coords_lon_lat]
-                    self.map_widget.set_polygon(coords_lat_lon,
-                                                outline_color="yellow",
-                                                fill_color="#FFFF00")
-                elif geom_type == 'path':
-                    coords_lon_lat = data
-                    coords_lat_lon = [(lat, lon) for lon, lat in coords_lon_lat]
-                    self.map_widget.set_path(coords_lat_lon,
-                                             color="yellow",
-                                             width=2)
-                elif geom_type == 'point':
-                    lat, lon = data
-                    self.map_widget.set_marker(lat, lon,
-                                               text="",
-                                               icon=self.small_orange_icon)
-
-            self.root.after(1, self._draw_features_in_batches, feature_generator, on_complete_callback, batch_size)
+            self._record_draw_frame(stats, frame_start, drawn, budget_ms)
+            self.root.after(1, self._draw_features_in_batches, feature_generator, on_complete_callback, budget_ms, stats)
 
         except StopIteration:
+            self._record_draw_frame(stats, frame_start, drawn, budget_ms)
             if on_complete_callback:
                 on_complete_callback()
         except Exception as e:
             self._log_status(f"Haritaya çizerken hata oluştu: {e}")
             messagebox.showerror("Çizim Hatası", f"Bir obje çizilirken hata oluştu:\n{e}", parent=self.root)
 
+    def _draw_feature(self, geom_type, data, highlight=False):
+        """
+        Tek bir çizim öğesini haritaya Tk nesnesi olarak ekler ve oluşan nesneyi döndürür.
+        highlight=True ise seçim vurgusu olarak (dolgusuz, camgöbeği) çizilir.
+        """
+        if geom_type == 'polygon':
+            coords_lat_lon = [(lat, lon) for lon, lat in data]
+            if highlight:
+                return self.map_widget.set_polygon(coords_lat_lon, outline_color="cyan", fill_color=None,
+                                                   border_width=3)
+            return self.map_widget.set_polygon(coords_lat_lon,
+                                               outline_color="yellow",
+                                               fill_color="#FFFF00")
+        elif geom_type == 'path':
+            coords_lat_lon = [(lat, lon) for lon, lat in data]
+            return self.map_widget.set_path(coords_lat_lon,
+                                            color="cyan" if highlight else "yellow",
+                                            width=4 if highlight else 2)
+        elif geom_type == 'point':
+            lat, lon = data
+            return self.map_widget.set_marker(lat, lon,
+                                              text="",
+                                              icon=self.highlight_icon if highlight else self.small_orange_icon)
+
+    def _record_draw_frame(self, stats, frame_start, drawn, budget_ms):
+        if not drawn:
+            return
+        frame_ms = (time.perf_counter() - frame_start) * 1000
+        stats['items'] += drawn
+        stats['frames'] += 1
+        stats['busy_seconds'] += frame_ms / 1000
+        stats['max_frame_ms'] = max(stats['max_frame_ms'], frame_ms)
+        if frame_ms > budget_ms:
+            stats['overruns'] += 1
+
+    def _log_draw_stats(self, stats):
+        """Çizim hızını (obje/sn) ve bütçeyi aşan kare sayısını günlüğe yazar."""
+        if not stats['items']:
+            return
+        wall_seconds = time.perf_counter() - stats['started']
+        self._log_status(
+            f"Çizim: {stats['items']} obje, {stats['frames']} kare, "
+            f"{stats['items'] / max(stats['busy_seconds'], 1e-6):.0f} obje/sn (çizim), "
+            f"{stats['items'] / max(wall_seconds, 1e-6):.0f} obje/sn (toplam). "
+            f"Bütçeyi aşan kare: {stats['overruns']} (en uzun {stats['max_frame_ms']:.0f} ms).")
+
 
 if __name__ == "__main__":
     root = ttk.Window(themename="darkly")
     app = PostGISApp(root)
     root.mainloop()
+    app.tile_prefetcher.close()
+    app.close_vector_tile_layer(log=False, shutdown=True)
+    app.close_query_layers()
+    db_pool.close_all()
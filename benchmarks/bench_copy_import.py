@@ -0,0 +1,155 @@
+"""
+COPY besleme yolu karşılaştırması.
+
+Eski yol : df.to_csv(geçici dosya) + dosyayı yeniden açıp copy_expert
+Yeni yol : import_engine.FrameCopyStream (parça parça kodlama, geçici dosya yok)
+
+Her yöntem ayrı bir süreçte çalıştırılır; tepe bellek (peak RSS), DataFrame oluşturulduktan
+sonraki ek artış olarak raporlanır (Linux'ta VmHWM sıfırlanarak ölçülür). Veritabanı verilmezse
+COPY yerine copy_expert'in okuma düzeni (8 KB'lık read çağrıları) taklit edilir.
+
+Kullanım:
+    python benchmarks/bench_copy_import.py --rows 500000
+    python benchmarks/bench_copy_import.py --dsn "host=localhost dbname=postgres user=postgres password=..."
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import import_engine  # noqa: E402
+
+COPY_READ_SIZE = 8192  # psycopg2 copy_expert varsayılan okuma boyutu
+
+
+def synthetic_frame(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'ad': rng.choice(['Ankara', 'İstanbul', 'İzmir', 'Bursa', 'Antalya'], rows),
+        'deger': rng.normal(100, 25, rows),
+        'tarih': pd.date_range('2020-01-01', periods=rows, freq='min').astype(str),
+        'aciklama': [f"kayıt {i} - örnek açıklama metni" for i in range(rows)],
+        'lat': rng.uniform(36, 42, rows),
+        'lon': rng.uniform(26, 45, rows),
+    })
+
+
+def _proc_status_mb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def reset_peak_rss():
+    """Linux'ta tepe RSS sayacını (VmHWM) sıfırlar; DataFrame üretiminin tepe değeri ölçüme karışmaz."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def current_rss_mb():
+    try:
+        return _proc_status_mb('VmRSS')
+    except OSError:
+        return float('nan')
+
+
+def peak_rss_mb():
+    try:
+        return _proc_status_mb('VmHWM')
+    except OSError:
+        try:
+            import resource
+        except ImportError:  # Windows
+            return float('nan')
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class FakeCursor:
+    """copy_expert'in dosyayı COPY_READ_SIZE'lık parçalarla tüketmesini taklit eder."""
+
+    def __init__(self):
+        self.received = 0
+
+    def copy_expert(self, sql, file):
+        while True:
+            data = file.read(COPY_READ_SIZE)
+            if not data:
+                break
+            self.received += len(data.encode('utf-8')) if isinstance(data, str) else len(data)
+
+
+def legacy_copy(cur, table, cols, df, workdir):
+    temp_path = os.path.join(workdir, "temp_csv_direct_bench.csv")
+    df.to_csv(temp_path, index=False, header=False, encoding='utf-8', quoting=1)
+    with open(temp_path, 'r', encoding='utf-8') as f:
+        cur.copy_expert(sql=f"COPY {table} ({', '.join(cols)}) FROM STDIN WITH (FORMAT CSV, HEADER FALSE, ENCODING 'UTF8')", file=f)
+    size = os.path.getsize(temp_path)
+    os.remove(temp_path)
+    return size
+
+
+def streaming_copy(cur, table, cols, df, workdir):
+    return import_engine.copy_dataframe(cur, table, cols, df)
+
+
+METHODS = {'eski (geçici dosya)': legacy_copy, 'yeni (akış)': streaming_copy}
+
+
+def run_method(name, rows, dsn, result_queue):
+    df = synthetic_frame(rows)
+    cols = [f'"{c}"' for c in df.columns]
+    reset_peak_rss()
+    baseline = current_rss_mb()
+    conn = None
+    if dsn:
+        import psycopg2
+        conn = psycopg2.connect(dsn)
+        cur = conn.cursor()
+        cur.execute("DROP TABLE IF EXISTS bench_copy_import")
+        cur.execute(f"CREATE TABLE bench_copy_import ({', '.join(f'{c} TEXT' for c in cols)})")
+        table = "bench_copy_import"
+    else:
+        cur = FakeCursor()
+        table = "bench_copy_import"
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        sent = METHODS[name](cur, table, cols, df, workdir)
+        elapsed = time.perf_counter() - start
+    if conn is not None:
+        conn.rollback()
+        conn.close()
+    result_queue.put((name, sent, elapsed, peak_rss_mb() - baseline))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="COPY besleme yolu karşılaştırması")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--dsn", default=os.environ.get("GEOPG_BENCH_DSN"))
+    args = parser.parse_args()
+
+    target = "PostgreSQL COPY" if args.dsn else "taklit COPY (veritabanısız)"
+    print(f"== {args.rows} satır, hedef: {target} ==")
+    print(f"{'yöntem':<22} {'MB':>8} {'süre':>8} {'MB/sn':>8} {'ek tepe RSS':>12}")
+    ctx = multiprocessing.get_context('spawn')
+    for name in METHODS:
+        result_queue = ctx.Queue()
+        proc = ctx.Process(target=run_method, args=(name, args.rows, args.dsn, result_queue))
+        proc.start()
+        name, sent, elapsed, extra_rss = result_queue.get()
+        proc.join()
+        mb = sent / 1e6
+        print(f"{name:<22} {mb:>8.1f} {elapsed:>7.2f}s {mb / elapsed:>8.1f} {extra_rss:>9.1f} MB")
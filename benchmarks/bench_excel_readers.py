@@ -0,0 +1,131 @@
+"""
+Excel okuma motorları karşılaştırması (geniş ve uzun çalışma kitapları).
+
+eski (pd.read_excel) : sayfa tek bir DataFrame'e okunur, sonra COPY'ye kodlanır
+<motor> (akış)       : excel_readers okuyucusu satır satır okur, import_engine parça parça COPY'ye kodlar
+
+Her yöntem ayrı bir süreçte çalıştırılır; süre ve tepe bellekteki ek artış (peak RSS) raporlanır.
+COPY, bench_copy_import'taki gibi copy_expert'in okuma düzeni taklit edilerek ölçülür.
+Kurulu olmayan motorlar (ör. python-calamine) atlanır.
+
+Kullanım:
+    python benchmarks/bench_excel_readers.py --tall-rows 200000 --wide-cols 300
+"""
+import argparse
+import datetime
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import excel_readers  # noqa: E402
+import import_engine  # noqa: E402
+from bench_copy_import import FakeCursor, current_rss_mb, peak_rss_mb, reset_peak_rss  # noqa: E402
+
+
+def write_workbook(path, rows, cols):
+    """openpyxl write-only modunda metin, sayı ve tarih sütunları karışık bir çalışma kitabı yazar."""
+    import openpyxl
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Veri")
+    ws.append([f"sutun_{c}" for c in range(cols)])
+    base = datetime.datetime(2020, 1, 1)
+    for r in range(rows):
+        row = []
+        for c in range(cols):
+            kind = c % 4
+            if kind == 0:
+                row.append(r * cols + c)
+            elif kind == 1:
+                row.append((r + c) * 0.25)
+            elif kind == 2:
+                row.append(f"kayıt {r}-{c}")
+            else:
+                row.append(base + datetime.timedelta(minutes=r))
+        ws.append(row)
+    wb.save(path)
+
+
+def legacy_read(path, cur):
+    sent = 0
+    with pd.ExcelFile(path) as xls:
+        for sheet_name in xls.sheet_names:
+            df = pd.read_excel(xls, sheet_name=sheet_name)
+            cols = [f'"{c}"' for c in import_engine.safe_column_names(df.columns.tolist())]
+            sent += import_engine.copy_dataframe(cur, "bench_excel", cols, df)
+    return sent
+
+
+def streaming_read(engine):
+    def run(path, cur):
+        sent = 0
+        reader = excel_readers.open_excel_reader(path, engine)
+        try:
+            for sheet_name in reader.sheet_names():
+                header, rows = excel_readers.sheet_header_and_rows(reader.iter_rows(sheet_name))
+                if header is None:
+                    continue
+                safe_cols = import_engine.safe_column_names(header)
+                _, sheet_bytes = import_engine.copy_frames(cur, "bench_excel", [f'"{c}"' for c in safe_cols],
+                                                           import_engine.iter_row_frames(safe_cols, rows))
+                sent += sheet_bytes
+        finally:
+            reader.close()
+        return sent
+    return run
+
+
+def methods():
+    found = {'eski (pd.read_excel)': legacy_read}
+    for engine in excel_readers.available_excel_readers():
+        found[f"{engine} (akış)"] = streaming_read(engine)
+    return found
+
+
+def run_method(name, path, result_queue):
+    for engine in excel_readers.available_excel_readers():
+        if engine != 'pandas':
+            __import__(excel_readers.EXCEL_READERS[engine].module) # İçe aktarma maliyeti ölçüme karışmasın
+    reset_peak_rss()
+    baseline = current_rss_mb()
+    cur = FakeCursor()
+    start = time.perf_counter()
+    sent = methods()[name](path, cur)
+    elapsed = time.perf_counter() - start
+    result_queue.put((sent, elapsed, peak_rss_mb() - baseline))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Excel okuma motorları karşılaştırması")
+    parser.add_argument("--tall-rows", type=int, default=100000, help="uzun kitabın satır sayısı (8 sütun)")
+    parser.add_argument("--wide-rows", type=int, default=2000, help="geniş kitabın satır sayısı")
+    parser.add_argument("--wide-cols", type=int, default=200, help="geniş kitabın sütun sayısı")
+    args = parser.parse_args()
+
+    missing = [name for name in excel_readers.EXCEL_READER_PRIORITY
+               if name not in excel_readers.available_excel_readers()]
+    if missing:
+        print(f"Kurulu olmadığı için atlanan motorlar: {', '.join(missing)}")
+
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as workdir:
+        workbooks = {
+            f"uzun ({args.tall_rows}x8)": (args.tall_rows, 8),
+            f"geniş ({args.wide_rows}x{args.wide_cols})": (args.wide_rows, args.wide_cols),
+        }
+        for label, (rows, cols) in workbooks.items():
+            path = os.path.join(workdir, f"bench_{rows}x{cols}.xlsx")
+            write_workbook(path, rows, cols)
+            print(f"== {label}: {os.path.getsize(path) / 1e6:.1f} MB xlsx ==")
+            print(f"{'yöntem':<22} {'CSV MB':>8} {'süre':>8} {'satır/sn':>10} {'ek tepe RSS':>12}")
+            for name in methods():
+                result_queue = ctx.Queue()
+                proc = ctx.Process(target=run_method, args=(name, path, result_queue))
+                proc.start()
+                sent, elapsed, extra_rss = result_queue.get()
+                proc.join()
+                print(f"{name:<22} {sent / 1e6:>8.1f} {elapsed:>7.2f}s {rows / elapsed:>10,.0f} {extra_rss:>9.1f} MB")
@@ -0,0 +1,104 @@
+"""
+Sorgu katmanları ölçümü.
+
+Bellek     : sentetik çokgen/çizgi/nokta sonuçları için katman başına bellek (projekte koordinatlar)
+             ve çizim süresi; veritabanısız
+Veritabanı : --dsn verilirse --layers adet tablo oluşturulur ve katmanlar önce sırayla, sonra
+             map_layers.LAYER_FETCH_WORKERS thread'lik havuzda paralel çekilir
+
+Kullanım:
+    python benchmarks/bench_query_layers.py --rows 200000
+    python benchmarks/bench_query_layers.py --dsn "host=localhost dbname=postgres user=postgres password=..." --layers 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import geopandas as gpd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import map_layers  # noqa: E402
+import map_render  # noqa: E402
+import query_engine  # noqa: E402
+from bench_wkb_decode import SYNTHETIC_SQL, synthetic_geometries  # noqa: E402
+
+VIEW_ZOOM = 8
+
+
+def bench_memory(rows):
+    print(f"== Katman belleği ve çizim ({rows} obje) ==")
+    print(f"{'tür':<8} {'bellek MB':>10} {'bayt/obje':>10} {'çizim ms':>9}")
+    for kind in ('point', 'line', 'polygon'):
+        geoms = gpd.GeoSeries(synthetic_geometries(kind, rows)).values
+        layer = map_layers.QueryLayer(f"SELECT * FROM bench_{kind}")
+        raster = map_render.RasterLayer.from_parts(query_engine.explode_draw_parts(geoms))
+        layer.set_result(layer.start_fetch(), raster, rows, False, 0.0)
+        min_lon, min_lat, max_lon, max_lat = geoms.total_bounds
+        (x0,), (y0,) = map_render.lonlat_to_unit_mercator([min_lon], [max_lat])
+        scale = 2 ** VIEW_ZOOM
+        _, seconds = map_layers.render_layer(layer, (x0 * scale, y0 * scale), VIEW_ZOOM, 1200, 800)
+        print(f"{kind:<8} {layer.memory_bytes / 1e6:>10.1f} {layer.memory_bytes / rows:>10.0f} {seconds * 1000:>9.0f}")
+
+
+def fetch(pool, sql):
+    with pool.connection(background=True) as conn:
+        start = time.perf_counter()
+        raster, rows, truncated = map_layers.fetch_layer(conn, sql, map_layers.LAYER_MEMORY_LIMIT_MB * 1024 * 1024)
+        return rows, raster.nbytes, truncated, time.perf_counter() - start
+
+
+def bench_database(dsn, rows, layers):
+    import psycopg2
+    import db_pool
+
+    kinds = list(SYNTHETIC_SQL)
+    tables = [f"bench_layer_{i}" for i in range(layers)]
+    print(f"\n== Veritabanı: {layers} katman x {rows} obje ==")
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            for i, table in enumerate(tables):
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
+                cur.execute(f"CREATE TABLE {table} AS {SYNTHETIC_SQL[kinds[i % len(kinds)]].format(n=rows)}")
+        conn.commit()
+
+        pool = db_pool.ConnectionPool({'dsn': dsn})
+        queries = [f"SELECT * FROM {table}" for table in tables]
+        start = time.perf_counter()
+        for sql in queries:
+            fetch(pool, sql)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=map_layers.LAYER_FETCH_WORKERS) as executor:
+            results = list(executor.map(lambda sql: fetch(pool, sql), queries))
+        parallel = time.perf_counter() - start
+        for table, (count, nbytes, truncated, seconds) in zip(tables, results):
+            note = " (sınırda kesildi)" if truncated else ""
+            print(f"  {table:<16} {count:>8} obje {nbytes / 1e6:>7.1f} MB {seconds:>6.2f} sn{note}")
+        print(f"sıralı çekim : {serial:>6.2f} sn")
+        print(f"paralel çekim: {parallel:>6.2f} sn ({serial / parallel:.1f}x, {map_layers.LAYER_FETCH_WORKERS} thread)")
+        pool.close()
+
+        with conn.cursor() as cur:
+            for table in tables:
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sorgu katmanları ölçümü")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--dsn", default=os.environ.get("GEOPG_BENCH_DSN"))
+    args = parser.parse_args()
+
+    bench_memory(args.rows)
+    if args.dsn:
+        bench_database(args.dsn, args.rows, args.layers)
+    else:
+        print("\n(--dsn verilmediği için veritabanı testi atlandı.)")
@@ -0,0 +1,96 @@
+"""
+Çizim motoru karşılaştırması: Tk vektör nesneleri (set_polygon/set_path/set_marker) ve
+map_render.RasterLayer ile tek bir PIL görüntüsüne çizim.
+
+Raster motoru her boyutta ölçülür. Vektör motoru bir Tk ekranı (DISPLAY) gerektirir ve
+yalnızca --vector-max'a kadar olan boyutlarda çalıştırılır; diğerleri "atlandı" olarak raporlanır.
+
+Kullanım:
+    python benchmarks/bench_renderers.py
+    python benchmarks/bench_renderers.py --sizes 1000 10000 100000 1000000 --vector-max 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import query_engine  # noqa: E402
+import map_render  # noqa: E402
+from bench_wkb_decode import synthetic_geometries, timed  # noqa: E402
+
+VIEW_ZOOM = 6
+VIEW_WIDTH, VIEW_HEIGHT = 1000, 700
+VIEW_CENTER = (35.5, 39.0)  # (lon, lat) - sentetik verinin ortası
+
+
+def view_upper_left(zoom, width, height, tile_size=256):
+    x, y = map_render.lonlat_to_unit_mercator([VIEW_CENTER[0]], [VIEW_CENTER[1]])
+    n = 2 ** zoom
+    return (x[0] * n - width / tile_size / 2, y[0] * n - height / tile_size / 2)
+
+
+def bench_raster(geoms):
+    parts, t_explode = timed(query_engine.explode_draw_parts, geoms)
+    layer, t_build = timed(map_render.RasterLayer.from_parts, parts)
+    upper_left = view_upper_left(VIEW_ZOOM, VIEW_WIDTH, VIEW_HEIGHT)
+    _, t_render = timed(layer.render, upper_left, VIEW_ZOOM, VIEW_WIDTH, VIEW_HEIGHT)
+    return t_explode + t_build, t_render
+
+
+def bench_vector(geoms):
+    from tkintermapview import TkinterMapView
+    import tkinter
+
+    root = tkinter.Tk()
+    try:
+        map_widget = TkinterMapView(root, width=VIEW_WIDTH, height=VIEW_HEIGHT, use_database_only=True)
+        map_widget.pack()
+        map_widget.set_position(VIEW_CENTER[1], VIEW_CENTER[0])
+        map_widget.set_zoom(VIEW_ZOOM)
+        root.update()
+        parts = query_engine.explode_draw_parts(geoms)
+        latlon = parts.coords[:, ::-1]
+        start = time.perf_counter()
+        for kind, s, c in zip(parts.kinds, parts.starts, parts.counts):
+            points = [tuple(p) for p in latlon[s:s + c]]
+            if kind == 'polygon':
+                map_widget.set_polygon(points)
+            elif kind == 'path':
+                map_widget.set_path(points)
+            else:
+                map_widget.set_marker(*points[0])
+        root.update()
+        return time.perf_counter() - start
+    finally:
+        root.destroy()
+
+
+def has_display():
+    if sys.platform.startswith('win') or sys.platform == 'darwin':
+        return True
+    return bool(os.environ.get('DISPLAY'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tk vektör ve raster çizim motoru karşılaştırması")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--kinds", nargs='+', default=['point', 'line', 'polygon'])
+    parser.add_argument("--vector-max", type=int, default=100000)
+    args = parser.parse_args()
+
+    display = has_display()
+    print(f"Görünüm: zoom {VIEW_ZOOM}, {VIEW_WIDTH}x{VIEW_HEIGHT} px")
+    print(f"{'tür':<8} {'obje':>9} {'raster kurulum':>15} {'raster çizim':>13} {'vektör çizim':>13}")
+    for kind in args.kinds:
+        for n in args.sizes:
+            geoms = synthetic_geometries(kind, n, vertices=16)
+            t_build, t_render = bench_raster(geoms)
+            if not display:
+                vector = "atlandı (ekran yok)"
+            elif n > args.vector_max:
+                vector = "atlandı"
+            else:
+                vector = f"{bench_vector(geoms):.2f} sn"
+            print(f"{kind:<8} {n:>9,} {t_build:>13.2f} sn {t_render:>10.2f} sn {vector:>13}")
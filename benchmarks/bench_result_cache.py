@@ -0,0 +1,128 @@
+"""
+Sorgu sonucu önbelleği ölçümü.
+
+Soğuk yol : WKB satırlarından GeoDataFrame kurma (query_engine.decode_wkb_column); veritabanı
+            verilirse read_postgis_binary ile uçtan uca okuma
+Önbellek  : ResultCache.get (bellek eşlemeli GeoParquet okuma); doğrulamalı okuma için tablo
+            imzası sorgusu da dahil edilir (--dsn ile)
+Anahtar   : ölçümden önce normalize_sql/cache_key denetlenir; yorumla biten satırdan sonraki kod
+            yoruma katılmamalı, farklı sonuç veren sorgular aynı anahtarı almamalıdır
+
+Kullanım:
+    python benchmarks/bench_result_cache.py --rows 200000
+    python benchmarks/bench_result_cache.py --dsn "host=localhost dbname=postgres user=postgres password=..."
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import geopandas as gpd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import query_engine  # noqa: E402
+import result_cache  # noqa: E402
+from bench_wkb_decode import SYNTHETIC_SQL, synthetic_geometries  # noqa: E402
+
+
+def median_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+# (sorgu, sorgu, aynı anahtar mı)
+KEY_CASES = [
+    ("SELECT * FROM t -- not\nWHERE id = 1", "SELECT * FROM t -- not WHERE id = 1", False),
+    ("SELECT * FROM a\n-- yorum\nJOIN b USING (id)", "SELECT * FROM a", False),
+    ("SELECT '--' AS x FROM t", "SELECT '' AS x FROM t", False),
+    ("SELECT $$ -- $$ FROM t", "SELECT $$ $$ FROM t", False),
+    ("SELECT *\n  FROM t /* açıklama */\n WHERE id = 1;", "select * from t where id = 1", False),
+    ("SELECT *\n  FROM t /* açıklama */\n WHERE id = 1;", "SELECT * FROM t WHERE id = 1", True),
+    ("SELECT * FROM t -- son yorum", "SELECT * FROM t", True),
+]
+
+
+def check_keys():
+    print("== Önbellek anahtarı denetimi ==")
+    for first, second, same in KEY_CASES:
+        actual = result_cache.cache_key({}, first) == result_cache.cache_key({}, second)
+        if actual != same:
+            raise SystemExit(f"HATA: {first!r} ve {second!r} için anahtarlar "
+                             f"{'aynı' if actual else 'farklı'} (beklenen: {'aynı' if same else 'farklı'})")
+    print(f"{len(KEY_CASES)} durum doğru.")
+
+
+def report(kind, rows, t_cold, t_cache, size):
+    print(f"{kind:<8} {t_cold * 1000:>10.0f} ms {t_cache * 1000:>10.0f} ms {t_cold / t_cache:>8.1f}x "
+          f"{size / 1e6:>8.1f} MB")
+
+
+def bench_decode_only(rows, repeat):
+    print(f"\n== Çözme vs önbellek ({rows} satır, medyan {repeat}) ==")
+    print(f"{'tür':<8} {'soğuk':>13} {'önbellek':>13} {'hızlanma':>9} {'dosya':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = result_cache.ResultCache(directory)
+        for kind in ('point', 'line', 'polygon'):
+            geoms = synthetic_geometries(kind, rows)
+            wkb = [memoryview(b) for b in gpd.GeoSeries(geoms).to_wkb()]
+            ids = np.arange(rows)
+
+            def cold():
+                return gpd.GeoDataFrame({'id': ids}, geometry=gpd.GeoSeries(query_engine.decode_wkb_column(wkb)))
+
+            key = result_cache.cache_key({}, kind)
+            size = cache.put(key, cold(), kind)
+            report(kind, rows, median_time(cold, repeat), median_time(lambda: cache.get(key), repeat), size)
+
+
+def bench_database(dsn, rows, repeat):
+    import psycopg2
+
+    print(f"\n== Veritabanı vs doğrulamalı önbellek ({rows} satır, medyan {repeat}) ==")
+    print(f"{'tür':<8} {'sorgu':>13} {'önbellek':>13} {'hızlanma':>9} {'dosya':>11}")
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            for kind, sql in SYNTHETIC_SQL.items():
+                cur.execute(f"DROP TABLE IF EXISTS bench_cache_{kind}")
+                cur.execute(f"CREATE TABLE bench_cache_{kind} AS {sql.format(n=rows)}")
+        conn.commit()
+        with tempfile.TemporaryDirectory() as directory:
+            cache = result_cache.ResultCache(directory)
+            for kind in SYNTHETIC_SQL:
+                query = f"SELECT * FROM bench_cache_{kind}"
+                key = result_cache.cache_key({'dsn': dsn}, query)
+                tables, signatures = result_cache.snapshot_tables(conn, query)
+                size = cache.put(key, query_engine.read_postgis_binary(conn, query, geom_col='geom'),
+                                 query, tables, signatures)
+                t_cold = median_time(lambda: query_engine.read_postgis_binary(conn, query, geom_col='geom'), repeat)
+                t_cache = median_time(lambda: cache.get(key, conn), repeat)
+                report(kind, rows, t_cold, t_cache, size)
+        with conn.cursor() as cur:
+            for kind in SYNTHETIC_SQL:
+                cur.execute(f"DROP TABLE IF EXISTS bench_cache_{kind}")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sorgu sonucu önbelleği ölçümü")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dsn", default=os.environ.get("GEOPG_BENCH_DSN"))
+    args = parser.parse_args()
+
+    check_keys()
+    bench_decode_only(args.rows, args.repeat)
+    if args.dsn:
+        bench_database(args.dsn, args.rows, args.repeat)
+    else:
+        print("\n(--dsn verilmediği için veritabanı testi atlandı.)")
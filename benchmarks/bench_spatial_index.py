@@ -0,0 +1,78 @@
+"""
+Mekânsal indeks (STRtree) ölçümü.
+
+Kurulum   : map_render.FeatureIndex'in sonuç kümesi başına bir kez kurulma süresi
+Tıklama   : tek noktada obje bulma; STRtree (query_nearest) ile bütün dizi üzerinde doğrusal
+            tarama (shapely.distance) karşılaştırılır
+Ayıklama  : görünen alandaki (kenar payıyla) satırların bulunması ve çizilecek parça sayısının
+            bütün sonuca oranı
+Kutu      : kutu seçimi (kesişim) için indeksli ve doğrusal sorgu
+
+Kullanım:
+    python benchmarks/bench_spatial_index.py --rows 500000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import shapely
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import map_render  # noqa: E402
+
+EXTENT = (26.0, 36.0, 45.0, 42.0)      # Türkiye kapsamı
+VIEW = (32.6, 39.8, 33.0, 40.0)        # Ankara civarı, zoom ~11 görünümü
+VIEW_ZOOM = 11
+
+
+def synthetic_polygons(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(EXTENT[:2], EXTENT[2:], (rows, 2))
+    return shapely.buffer(shapely.points(centers), rng.uniform(0.001, 0.01, rows), quad_segs=4), centers
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def run(rows, repeat):
+    geoms, centers = synthetic_polygons(rows)
+    index = map_render.FeatureIndex(geoms)
+    print(f"== {rows} çokgen ==")
+    print(f"indeks kurulumu       : {index.build_seconds * 1000:>9.1f} ms")
+
+    lon, lat = centers[rows // 2]
+    tolerance = map_render.identify_tolerance(VIEW_ZOOM, lat)
+    point = shapely.Point(lon, lat)
+    t_index = median_ms(lambda: index.identify(lon, lat, tolerance), repeat)
+    t_scan = median_ms(lambda: np.argmin(shapely.distance(geoms, point)), repeat)
+    print(f"tıklama (STRtree)     : {t_index:>9.3f} ms")
+    print(f"tıklama (doğrusal)    : {t_scan:>9.1f} ms  ({t_scan / t_index:.0f}x)")
+
+    view_bounds = map_render.expand_bounds(VIEW, map_render.CULL_MARGIN)
+    visible = index.query_bounds(view_bounds)
+    t_cull = median_ms(lambda: index.query_bounds(view_bounds), repeat)
+    print(f"görünüm ayıklama      : {t_cull:>9.3f} ms  ({len(visible)} / {rows} obje çizilir, "
+          f"%{100 * len(visible) / rows:.2f})")
+
+    box = shapely.box(*VIEW)
+    t_box = median_ms(lambda: index.select_box(VIEW), repeat)
+    t_box_scan = median_ms(lambda: np.flatnonzero(shapely.intersects(geoms, box)), repeat)
+    print(f"kutu seçimi (STRtree) : {t_box:>9.3f} ms  ({len(index.select_box(VIEW))} obje)")
+    print(f"kutu seçimi (doğrusal): {t_box_scan:>9.1f} ms  ({t_box_scan / t_box:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mekânsal indeks (STRtree) ölçümü")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
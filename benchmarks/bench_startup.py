@@ -0,0 +1,74 @@
+"""
+Uygulama açılış süresi ölçümü.
+
+Her ölçüm yeni bir Python sürecinde yapılır (modül önbelleği sıfırdan), medyan raporlanır:
+  gecikmeli     : import GeoPG (pencere açılmadan önce ödenen içe aktarma maliyeti)
+  eski (hepsi)  : import GeoPG + pandas + query_engine (geopandas) + EXECSV2PG; ağır modüllerin
+                  hepsi açılışta yüklendiğinde ödenen maliyet
+  ilk sorgu payı: ısınma olmasaydı ilk sorgunun ödeyeceği içe aktarma maliyeti (fark)
+
+Ekran varsa (DISPLAY / Windows / macOS) uygulama GEOPG_STARTUP_BENCH=1 ile açılır ve pencerenin
+ekrana gelme süresi (first_window) ile sorgu modüllerinin arka planda hazır olduğu an (query_ready)
+uygulamanın kendi ölçümünden okunur. Gerçek ilk sorgu süresi uygulamanın İşlem Günlüğü'ne yazılır.
+
+Kullanım:
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+IMPORT_CASES = {
+    'gecikmeli': "import GeoPG",
+    'eski (hepsi)': "import GeoPG, pandas, geopandas, query_engine, EXECSV2PG",
+}
+TIMER = "import time; _t = time.perf_counter(); {code}; print((time.perf_counter() - _t) * 1000)"
+
+
+def time_import(code, repeat):
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", TIMER.format(code=code)], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout
+        timings.append(float(out.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def has_display():
+    return sys.platform in ('win32', 'darwin') or bool(os.environ.get('DISPLAY'))
+
+
+def time_window(repeat):
+    marks = []
+    env = dict(os.environ, GEOPG_STARTUP_BENCH='1')
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "GeoPG.py"], cwd=ROOT, env=env, check=True, capture_output=True,
+                             text=True, timeout=120).stdout
+        marks.append(json.loads(out.strip().splitlines()[-1]))
+    return {key: statistics.median(m[key] for m in marks) for key in ('first_window', 'query_ready', 'warm_up')}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uygulama açılış süresi ölçümü")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {name: time_import(code, args.repeat) for name, code in IMPORT_CASES.items()}
+    print(f"İçe aktarma (medyan, {args.repeat} süreç):")
+    for name, ms in results.items():
+        print(f"  {name:<14} {ms:>8.0f} ms")
+    print(f"  {'ilk sorgu payı':<14} {results['eski (hepsi)'] - results['gecikmeli']:>8.0f} ms "
+          f"(arka plan ısınmasıyla pencere açıldıktan sonra ödenir)")
+
+    if not has_display():
+        print("\nEkran bulunamadı; pencere açılış ölçümü atlandı.")
+        sys.exit(0)
+    marks = time_window(args.repeat)
+    print(f"\nUygulama (medyan, {args.repeat} açılış):")
+    print(f"  ilk pencere      {marks['first_window']:>8.0f} ms")
+    print(f"  sorguya hazır    {marks['query_ready']:>8.0f} ms (ısınma {marks['warm_up']:.0f} ms)")
@@ -0,0 +1,106 @@
+"""
+Yeniden yükleme sırasında okuyucuların gördüğü kesinti: 'replace' ve 'swap' yükleme modları.
+
+Tablo önce bir kez yüklenir (id üzerinde bir indeksle). Ardından aynı CSV her modda yeniden
+yüklenirken ayrı bir bağlantıdan tabloya sürekli kısa sorgular atılır ve şunlar raporlanır:
+  - yükleme süresi
+  - okuyucunun gördüğü en uzun sorgu süresi (tablo kilitliyken bekleme)
+  - hata alan sorgu sayısı (ör. tablo yokken) ve boş sonuç dönen sorgu sayısı
+
+Kullanım:
+    python benchmarks/bench_swap_load.py --rows 1000000 --dsn "host=localhost dbname=postgres user=postgres password=..."
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import import_engine  # noqa: E402
+from bench_copy_import import synthetic_frame  # noqa: E402
+
+SCHEMA = 'public'
+TABLE_NAME = 'bench_swap'
+READER_QUERY = 'SELECT count(*) FROM "public"."bench_swap" WHERE id BETWEEN 1000 AND 2000'
+
+
+class Reader(threading.Thread):
+    """Yükleme süresince tabloya art arda sorgu atar; en uzun bekleme, hata ve boş sonuçları sayar."""
+
+    def __init__(self, dsn):
+        super().__init__(daemon=True)
+        self.dsn = dsn
+        self.stop = threading.Event()
+        self.queries = self.errors = self.empty = 0
+        self.max_wait = 0.0
+
+    def run(self):
+        import psycopg2
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                while not self.stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        cur.execute(READER_QUERY)
+                        if cur.fetchone()[0] == 0:
+                            self.empty += 1
+                    except psycopg2.Error:
+                        self.errors += 1
+                    self.max_wait = max(self.max_wait, time.perf_counter() - start)
+                    self.queries += 1
+                    time.sleep(0.01)
+        finally:
+            conn.close()
+
+
+def reload(conn, csv_path, load_mode):
+    return import_engine.import_csv_path(conn, csv_path, SCHEMA, lambda msg: None, load_mode=load_mode,
+                                         build_geometry=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yeniden yüklemede okuyucu kesintisi (replace / swap)")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--dsn", default=os.environ.get("GEOPG_BENCH_DSN"))
+    args = parser.parse_args()
+    if not args.dsn:
+        print("Veritabanı verilmedi (--dsn / GEOPG_BENCH_DSN); bu ölçüm PostgreSQL gerektirir.")
+        sys.exit(0)
+
+    import psycopg2
+    conn = psycopg2.connect(args.dsn)
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, f"{TABLE_NAME}.csv")
+        synthetic_frame(args.rows).to_csv(csv_path, index=False)
+        print(f"== {args.rows} satır, {os.path.getsize(csv_path) / 1e6:.1f} MB CSV ==")
+        print(f"{'mod':<9} {'yükleme':>9} {'en uzun bekleme':>16} {'sorgu':>7} {'hata':>6} {'boş':>5}")
+        try:
+            for load_mode in ('replace', 'swap'):
+                reload(conn, csv_path, 'replace')
+                with conn.cursor() as cur:
+                    cur.execute(f'CREATE INDEX ON "{SCHEMA}"."{TABLE_NAME}" (id)')
+                conn.commit()
+
+                reader = Reader(args.dsn)
+                reader.start()
+                time.sleep(0.5)
+                start = time.perf_counter()
+                result = reload(conn, csv_path, load_mode)
+                elapsed = time.perf_counter() - start
+                time.sleep(0.5)
+                reader.stop.set()
+                reader.join()
+                if not result['ok']:
+                    print(f"{load_mode}: yükleme başarısız: {result['errors']}")
+                    continue
+                print(f"{load_mode:<9} {elapsed:>8.2f}s {1000 * reader.max_wait:>13.0f} ms {reader.queries:>7} "
+                      f"{reader.errors:>6} {reader.empty:>5}")
+        finally:
+            with conn.cursor() as cur:
+                cur.execute(f'DROP TABLE IF EXISTS "{SCHEMA}"."{TABLE_NAME}"')
+            conn.commit()
+            conn.close()
@@ -0,0 +1,172 @@
+"""
+Harita karo önbelleği ve ön yükleyici ölçümü (yerel karo sunucusuna karşı).
+
+Gecikmesi ayarlanabilen yerel bir karo sunucusu başlatılır (yavaş saha bağlantısı yerine) ve
+tile_cache üzerinden şu senaryolar çalıştırılır:
+  soğuk      : görünen karolar ilk kez istenir (hepsi ağdan)
+  sıcak      : aynı karolar yeniden istenir (MBTiles'tan)
+  kaydırma   : ön yükleme bittikten sonra görünüm bir karo kaydırılır / bir zoom yakınlaştırılır
+  çevrimdışı : yeni oturum, ağ kapalı; daha önce görülen karolar diskten gelir
+
+Uygulamayı aynı sunucuya karşı denemek için sunucu --serve ile açık bırakılabilir:
+    python benchmarks/bench_tile_cache.py --serve --port 8080
+    GEOPG_TILE_SERVER="http://127.0.0.1:8080/{z}/{x}/{y}.png" python GeoPG.py
+
+Kullanım:
+    python benchmarks/bench_tile_cache.py --latency-ms 150
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import tile_cache  # noqa: E402
+
+VIEW_BOUNDS = (32.2, 39.6, 33.6, 40.2)   # Ankara çevresi
+VIEW_ZOOM = 10
+
+
+# --- Yerel Karo Sunucusu ---
+def make_tile_server(port, latency_ms):
+    counter = {'requests': 0}
+    lock = threading.Lock()
+
+    class TileHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = self.path.strip('/').split('/')
+            try:
+                z, x, y = (int(p.split('.')[0]) for p in parts[-3:])
+            except ValueError:
+                self.send_error(404)
+                return
+            with lock:
+                counter['requests'] += 1
+            time.sleep(latency_ms / 1000)
+            image = Image.new('RGB', (256, 256), ((x * 37) % 256, (y * 53) % 256, (z * 20) % 256))
+            ImageDraw.Draw(image).text((10, 10), f"{z}/{x}/{y}", fill=(255, 255, 255))
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG')
+            body = buffer.getvalue()
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), TileHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counter
+
+
+def visible_tiles(bounds, zoom):
+    x0, y0, x1, y1 = tile_cache.tile_range(bounds, zoom)
+    return [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def shifted(bounds, zoom, tiles_east):
+    """Kapsamı tiles_east karo genişliği kadar doğuya kaydırır."""
+    width = 360.0 / 2 ** zoom * tiles_east
+    return bounds[0] + width, bounds[1], bounds[2] + width, bounds[3]
+
+
+def zoomed_in(bounds):
+    cx, cy = (bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2
+    hx, hy = (bounds[2] - bounds[0]) / 4, (bounds[3] - bounds[1]) / 4
+    return cx - hx, cy - hy, cx + hx, cy + hy
+
+
+def load_view(source, tiles, workers=8):
+    """Haritanın yaptığı gibi görünen karoları paralel ister; toplam süreyi ve isabet sayısını döndürür."""
+    hits_before = source.hits
+    start = time.perf_counter()
+    threads = [threading.Thread(target=lambda part: [source.get(*t) for t in part], args=(tiles[i::workers],))
+               for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, source.hits - hits_before
+
+
+def report(name, tiles, seconds, hits, counter, requests_before):
+    print(f"{name:<30} {len(tiles):>5} karo {seconds * 1000:>8.0f} ms  isabet %{100 * hits / len(tiles):>3.0f}  "
+          f"sunucu isteği {counter['requests'] - requests_before:>4}")
+
+
+def run(latency_ms, port):
+    server, counter = make_tile_server(port, latency_ms)
+    url = f"http://127.0.0.1:{server.server_address[1]}/{{z}}/{{x}}/{{y}}.png"
+    with tempfile.TemporaryDirectory() as directory:
+        source = tile_cache.TileSource("Yerel", url, directory=directory)
+        tiles = visible_tiles(VIEW_BOUNDS, VIEW_ZOOM)
+        print(f"Yerel karo sunucusu: {url} (gecikme {latency_ms} ms)\n")
+
+        before = counter['requests']
+        seconds, hits = load_view(source, tiles)
+        report("soğuk", tiles, seconds, hits, counter, before)
+
+        before = counter['requests']
+        seconds, hits = load_view(source, tiles)
+        report("sıcak (MBTiles)", tiles, seconds, hits, counter, before)
+
+        for name, bounds, zoom in (("kaydırma, ön yüklemesiz", shifted(VIEW_BOUNDS, VIEW_ZOOM, 1), VIEW_ZOOM),
+                                   ("yakınlaştırma, ön yüklemesiz", zoomed_in(VIEW_BOUNDS), VIEW_ZOOM + 1)):
+            cold = tile_cache.TileSource("Yerel", url, directory=tempfile.mkdtemp(dir=directory))
+            load_view(cold, tiles)
+            before = counter['requests']
+            target = visible_tiles(bounds, zoom)
+            seconds, hits = load_view(cold, target)
+            report(name, target, seconds, hits, counter, before)
+
+        prefetcher = tile_cache.TilePrefetcher()
+        done = threading.Event()
+        queued = prefetcher.prefetch(source, tile_cache.prefetch_plan(VIEW_BOUNDS, VIEW_ZOOM, 19),
+                                     on_done=lambda batch: done.set())
+        start = time.perf_counter()
+        if queued:
+            done.wait()
+        print(f"{'ön yükleme':<30} {queued:>5} karo {(time.perf_counter() - start) * 1000:>8.0f} ms  "
+              f"({tile_cache.TILE_PREFETCH_WORKERS} thread)")
+        for name, bounds, zoom in (("kaydırma, ön yüklemeli", shifted(VIEW_BOUNDS, VIEW_ZOOM, 1), VIEW_ZOOM),
+                                   ("yakınlaştırma, ön yüklemeli", zoomed_in(VIEW_BOUNDS), VIEW_ZOOM + 1)):
+            before = counter['requests']
+            target = visible_tiles(bounds, zoom)
+            seconds, hits = load_view(source, target)
+            report(name, target, seconds, hits, counter, before)
+        prefetcher.close()
+
+        offline = tile_cache.TileSource("Yerel", url, offline=True, directory=directory)
+        before = counter['requests']
+        seconds, hits = load_view(offline, tiles)
+        report("çevrimdışı", tiles, seconds, hits, counter, before)
+
+        print(f"\n{source.format_stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Harita karo önbelleği ölçümü")
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--serve", action="store_true", help="yalnızca yerel karo sunucusunu çalıştır")
+    args = parser.parse_args()
+
+    if args.serve:
+        server, _ = make_tile_server(args.port, args.latency_ms)
+        print(f"Yerel karo sunucusu: http://127.0.0.1:{server.server_address[1]}/{{z}}/{{x}}/{{y}}.png (Ctrl+C ile durdur)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        run(args.latency_ms, args.port)
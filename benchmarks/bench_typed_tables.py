@@ -0,0 +1,115 @@
+"""
+Tipli tablo ile tamamı TEXT tablo karşılaştırması.
+
+Aynı CSV iki kez yüklenir: import_engine.import_csv_file(infer_types=False) ile tüm sütunlar
+TEXT, infer_types=True ile tahmin edilen tiplerle. Ardından iki tablonun disk boyutu
+(pg_total_relation_size) ve tipik sorguların süresi (medyan) raporlanır. TEXT tablodaki
+sorgular, bugün analistlerin yazmak zorunda olduğu gibi açık dönüşümlerle (::) yazılmıştır.
+
+Veritabanı verilmezse yalnızca tip tahmininin hızı ve sonucu raporlanır.
+
+Kullanım:
+    python benchmarks/bench_typed_tables.py --rows 500000 --dsn "host=localhost dbname=postgres user=postgres password=..."
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import import_engine  # noqa: E402
+import type_inference  # noqa: E402
+from bench_copy_import import synthetic_frame  # noqa: E402
+
+TEXT_TABLE = 'public.bench_types_text'
+TYPED_TABLE = 'public.bench_types_typed'
+
+# (açıklama, TEXT tablo sorgusu, tipli tablo sorgusu); {t} tablo adıyla değiştirilir
+QUERIES = [
+    ("ortalama", "SELECT avg(deger::double precision) FROM {t}",
+     "SELECT avg(deger) FROM {t}"),
+    ("id aralığı (indeksli)", "SELECT count(*) FROM {t} WHERE id::bigint BETWEEN 1000 AND 2000",
+     "SELECT count(*) FROM {t} WHERE id BETWEEN 1000 AND 2000"),
+    ("zaman aralığı", "SELECT count(*) FROM {t} WHERE tarih::timestamp >= '2020-03-01' AND tarih::timestamp < '2020-03-08'",
+     "SELECT count(*) FROM {t} WHERE tarih >= '2020-03-01' AND tarih < '2020-03-08'"),
+    ("kutu filtresi", "SELECT count(*) FROM {t} WHERE lat::double precision BETWEEN 38 AND 39 "
+                      "AND lon::double precision BETWEEN 30 AND 32",
+     "SELECT count(*) FROM {t} WHERE lat BETWEEN 38 AND 39 AND lon BETWEEN 30 AND 32"),
+    ("gruplama", "SELECT ad, max(deger::double precision) FROM {t} GROUP BY ad",
+     "SELECT ad, max(deger) FROM {t} GROUP BY ad"),
+]
+
+
+def time_query(cur, sql, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql)
+        cur.fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def report_inference(frame):
+    start = time.perf_counter()
+    types = type_inference.infer_column_types(frame)
+    elapsed = time.perf_counter() - start
+    sample = min(len(frame), type_inference.TYPE_SAMPLE_ROWS)
+    print(f"Tip tahmini: {sample} satırlık örnek, {1000 * elapsed:.1f} ms")
+    for col, col_type in zip(frame.columns, types):
+        print(f"  {col:<10} {col_type}")
+
+
+def run_database(dsn, csv_path, rows, repeat):
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    try:
+        for table, infer in ((TEXT_TABLE, False), (TYPED_TABLE, True)):
+            loaded = import_engine.import_csv_file(conn, csv_path, table, lambda msg: None, infer_types=infer)
+            print(f"Yükleme {'tipli' if infer else 'TEXT '}: {loaded['rows']} satır, {loaded['seconds']:.2f} sn")
+        with conn.cursor() as cur:
+            for table in (TEXT_TABLE, TYPED_TABLE):
+                cur.execute(f"CREATE INDEX ON {table} (id)")
+                cur.execute(f"ANALYZE {table}")
+            conn.commit()
+
+            cur.execute("SELECT pg_total_relation_size(%s), pg_total_relation_size(%s)", (TEXT_TABLE, TYPED_TABLE))
+            text_size, typed_size = cur.fetchone()
+            print(f"\nDisk boyutu (tablo + indeks): TEXT {text_size / 1e6:.1f} MB, tipli {typed_size / 1e6:.1f} MB "
+                  f"(%{100 * (1 - typed_size / text_size):.0f} daha küçük)")
+
+            print(f"\n{'sorgu':<24} {'TEXT':>10} {'tipli':>10} {'hızlanma':>9}")
+            for label, text_sql, typed_sql in QUERIES:
+                text_s = time_query(cur, text_sql.format(t=TEXT_TABLE), repeat)
+                typed_s = time_query(cur, typed_sql.format(t=TYPED_TABLE), repeat)
+                print(f"{label:<24} {1000 * text_s:>8.1f}ms {1000 * typed_s:>8.1f}ms {text_s / typed_s:>8.1f}x")
+
+            for table in (TEXT_TABLE, TYPED_TABLE):
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tipli tablo / TEXT tablo karşılaştırması")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dsn", default=os.environ.get("GEOPG_BENCH_DSN"))
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.rows)
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "bench_types.csv")
+        frame.to_csv(csv_path, index=False)
+        # CSV'den okunan haliyle (tüm değerler metin) tahmin edilir
+        report_inference(pd.read_csv(csv_path, dtype=str, nrows=type_inference.TYPE_SAMPLE_ROWS))
+        if not args.dsn:
+            print("\nVeritabanı verilmedi (--dsn / GEOPG_BENCH_DSN); boyut ve sorgu karşılaştırması atlandı.")
+            sys.exit(0)
+        print(f"\n== {args.rows} satır ==")
+        run_database(args.dsn, csv_path, args.rows, args.repeat)
@@ -0,0 +1,144 @@
+"""
+Vektör karo (MVT) katmanı ölçümü.
+
+Çözme/çizim : sentetik MVT karoları (karo başına obje sayısı değişken) vector_tiles ile çözülüp
+              256 px görüntüye çizilir; karo başına süre raporlanır (veritabanısız)
+Veritabanı  : --dsn verilirse N çokgenlik bir tablo oluşturulur ve bir görünümün (--view-tiles kare)
+              karoları ST_AsMVT ile üretilir; bütün tablonun read_postgis_binary ile okunmasıyla
+              karşılaştırılır. Karo yolunun süresi tablo büyüdükçe değil, ekrandaki karo sayısıyla artar.
+
+Kullanım:
+    python benchmarks/bench_vector_tiles.py
+    python benchmarks/bench_vector_tiles.py --dsn "host=localhost dbname=postgres user=postgres password=..." --rows 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import vector_tiles  # noqa: E402
+
+
+# --- Sentetik MVT Üretimi (yalnızca geometri) ---
+def _varint(n):
+    out = bytearray()
+    while True:
+        byte, n = n & 0x7F, n >> 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _field(number, wire_type, payload):
+    key = _varint((number << 3) | wire_type)
+    return key + (_varint(payload) if wire_type == 0 else _varint(len(payload)) + payload)
+
+
+def _zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+
+def encode_polygon_feature(ring):
+    ints, cx, cy = [], 0, 0
+    for i, (x, y) in enumerate(ring):
+        if i == 0:
+            ints.append((1 & 0x7) | (1 << 3))
+        elif i == 1:
+            ints.append((2 & 0x7) | ((len(ring) - 1) << 3))
+        ints += [_zigzag(x - cx), _zigzag(y - cy)]
+        cx, cy = x, y
+    ints.append(7 | (1 << 3))
+    return _field(3, 0, 3) + _field(4, 2, b''.join(_varint(v) for v in ints))
+
+
+def synthetic_tile(features, vertices=16, seed=42):
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    encoded = []
+    for cx, cy in rng.integers(64, 4032, (features, 2)):
+        # MVT'de dış halka y-aşağı koordinatlarda pozitif alanlıdır (ekranda saat yönü)
+        ring = [(int(cx + 40 * np.cos(a)), int(cy + 40 * np.sin(a))) for a in angles]
+        encoded.append(_field(2, 2, encode_polygon_feature(ring)))
+    layer = _field(15, 0, 2) + _field(1, 2, b'katman') + b''.join(encoded) + _field(5, 0, vector_tiles.MVT_EXTENT)
+    return _field(3, 2, layer)
+
+
+def bench_decode_render(repeat=5):
+    print("== Çözme + çizim (karo başına, medyan) ==")
+    print(f"{'obje/karo':>10} {'MVT KB':>8} {'çözme ms':>9} {'çizim ms':>9}")
+    for features in (100, 1000, 5000, vector_tiles.VECTOR_TILE_MAX_FEATURES):
+        payload = synthetic_tile(features)
+        decode, render = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parts = vector_tiles.decode_tile(payload)
+            decoded = time.perf_counter()
+            vector_tiles.render_tile(parts)
+            decode.append(decoded - start)
+            render.append(time.perf_counter() - decoded)
+        print(f"{features:>10} {len(payload) / 1024:>8.0f} {np.median(decode) * 1000:>9.1f} {np.median(render) * 1000:>9.1f}")
+
+
+def bench_database(dsn, rows, view_tiles, zoom):
+    import psycopg2
+    import query_engine
+
+    print(f"\n== Veritabanı: {rows} çokgen, {view_tiles}x{view_tiles} karo görünüm (zoom {zoom}) ==")
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS bench_vector_tiles")
+            cur.execute(f"""
+                CREATE TABLE bench_vector_tiles AS
+                SELECT g AS id, ST_Buffer(ST_SetSRID(ST_MakePoint(26 + random() * 19, 36 + random() * 6), 4326), 0.01, 4) AS geom
+                FROM generate_series(1, {rows}) g""")
+            cur.execute("CREATE INDEX ON bench_vector_tiles USING gist (geom)")
+            cur.execute("ANALYZE bench_vector_tiles")
+        conn.commit()
+
+        layer = vector_tiles.VectorTileLayer('public', 'bench_vector_tiles', 'geom', 4326)
+        n = 2 ** zoom
+        center_x, center_y = int((32.8 + 180) / 360 * n), int((1 - np.arcsinh(np.tan(np.radians(39.9))) / np.pi) / 2 * n)
+        keys = [(zoom, x, y) for x in range(center_x - view_tiles // 2, center_x - view_tiles // 2 + view_tiles)
+                for y in range(center_y - view_tiles // 2, center_y - view_tiles // 2 + view_tiles)]
+        start = time.perf_counter()
+        for key in keys:
+            layer.load_tile(conn, *key)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for key in keys:
+            layer.cached(key)
+        warm = time.perf_counter() - start
+        print(f"karo yolu (soğuk)   : {cold * 1000:>8.0f} ms ({len(keys)} karo, sıralı tek bağlantı)")
+        print(f"karo yolu (LRU)     : {warm * 1000:>8.2f} ms")
+        print(f"  {layer.format_stats()}")
+
+        start = time.perf_counter()
+        gdf = query_engine.read_postgis_binary(conn, "SELECT * FROM bench_vector_tiles", geom_col='geom')
+        print(f"bütün tablo okuma   : {(time.perf_counter() - start) * 1000:>8.0f} ms ({len(gdf)} obje, çizim hariç)")
+
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS bench_vector_tiles")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vektör karo (MVT) katmanı ölçümü")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--view-tiles", type=int, default=5)
+    parser.add_argument("--zoom", type=int, default=9)
+    parser.add_argument("--dsn", default=os.environ.get("GEOPG_BENCH_DSN"))
+    args = parser.parse_args()
+
+    bench_decode_render()
+    if args.dsn:
+        bench_database(args.dsn, args.rows, args.view_tiles, args.zoom)
+    else:
+        print("\n(--dsn verilmediği için veritabanı testi atlandı.)")
@@ -0,0 +1,136 @@
+"""
+WKB geometri çözme yolu karşılaştırması.
+
+Eski yol : gpd.read_postgis + iterrows ile satır satır list(geom.exterior.coords)
+Yeni yol : ST_AsBinary + shapely.from_wkb (vektörel) + shapely.get_coordinates ofsetleri
+
+Kullanım:
+    python benchmarks/bench_wkb_decode.py                      # yalnızca çözme (veritabanısız)
+    python benchmarks/bench_wkb_decode.py --dsn "host=localhost dbname=postgres user=postgres password=..."
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import shapely
+import geopandas as gpd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+import query_engine  # noqa: E402
+
+
+# --- Sentetik Geometri Üretimi ---
+def synthetic_geometries(kind, n, vertices=32, seed=42):
+    rng = np.random.default_rng(seed)
+    centers = np.column_stack([rng.uniform(26, 45, n), rng.uniform(36, 42, n)])
+    if kind == 'point':
+        return shapely.points(centers)
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    ring = np.column_stack([np.cos(angles), np.sin(angles)]) * 0.01
+    coords = centers[:, None, :] + ring[None, :, :]
+    if kind == 'line':
+        return shapely.linestrings(coords)
+    closed = np.concatenate([coords, coords[:, :1, :]], axis=1)
+    return shapely.polygons(closed)
+
+
+SYNTHETIC_SQL = {
+    'point': "SELECT g AS id, ST_SetSRID(ST_MakePoint(26 + random() * 19, 36 + random() * 6), 4326) AS geom FROM generate_series(1, {n}) g",
+    'line': "SELECT g AS id, ST_SetSRID(ST_MakeLine(ARRAY(SELECT ST_MakePoint(26 + random() * 19 + i * 0.001, 36 + random() * 6) FROM generate_series(1, 32) i WHERE g > 0)), 4326) AS geom FROM generate_series(1, {n}) g",
+    'polygon': "SELECT g AS id, ST_Buffer(ST_SetSRID(ST_MakePoint(26 + random() * 19, 36 + random() * 6), 4326), 0.01, 8) AS geom FROM generate_series(1, {n}) g",
+}
+
+
+# --- Eski ve Yeni Koordinat Çıkarımı ---
+def legacy_extract(gdf):
+    count = 0
+    for _, row in gdf.iterrows():
+        geom = row[gdf.geometry.name]
+        if geom is None or geom.is_empty:
+            continue
+        if geom.geom_type == 'Polygon':
+            count += len(list(geom.exterior.coords))
+        elif geom.geom_type == 'LineString':
+            count += len(list(geom.coords))
+        elif geom.geom_type == 'Point':
+            count += 1
+    return count
+
+
+def vectorized_extract(gdf):
+    parts = query_engine.explode_draw_parts(gdf.geometry.values)
+    return int(parts.counts.sum())
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_decode_only(rows):
+    print(f"\n== Yalnızca çözme ({rows} satır) ==")
+    print(f"{'tür':<8} {'eski satır/sn':>14} {'yeni satır/sn':>14} {'hızlanma':>9}")
+    for kind in ('point', 'line', 'polygon'):
+        geoms = synthetic_geometries(kind, rows)
+        hex_ewkb = shapely.to_wkb(geoms, hex=True)
+        wkb = [memoryview(b) for b in shapely.to_wkb(geoms)]
+
+        def legacy():
+            gdf = gpd.GeoDataFrame({'id': np.arange(rows)}, geometry=gpd.GeoSeries([shapely.wkb.loads(h, hex=True) for h in hex_ewkb]))
+            return legacy_extract(gdf)
+
+        def vectorized():
+            gdf = gpd.GeoDataFrame({'id': np.arange(rows)}, geometry=gpd.GeoSeries(query_engine.decode_wkb_column(wkb)))
+            return vectorized_extract(gdf)
+
+        _, t_old = timed(legacy)
+        _, t_new = timed(vectorized)
+        print(f"{kind:<8} {rows / t_old:>14,.0f} {rows / t_new:>14,.0f} {t_old / t_new:>8.1f}x")
+
+
+def bench_database(dsn, rows):
+    import psycopg2
+
+    print(f"\n== Veritabanı uçtan uca ({rows} satır) ==")
+    print(f"{'tür':<8} {'eski satır/sn':>14} {'yeni satır/sn':>14} {'hızlanma':>9}")
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            for kind, sql in SYNTHETIC_SQL.items():
+                cur.execute(f"CREATE TEMP TABLE bench_{kind} AS {sql.format(n=rows)}")
+        conn.commit()
+        for kind in SYNTHETIC_SQL:
+            query = f"SELECT * FROM bench_{kind}"
+
+            def legacy():
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)
+                    gdf = gpd.read_postgis(query, conn, geom_col='geom')
+                return legacy_extract(gdf)
+
+            def vectorized():
+                gdf = query_engine.read_postgis_binary(conn, query, geom_col='geom')
+                return vectorized_extract(gdf)
+
+            _, t_old = timed(legacy)
+            _, t_new = timed(vectorized)
+            print(f"{kind:<8} {rows / t_old:>14,.0f} {rows / t_new:>14,.0f} {t_old / t_new:>8.1f}x")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WKB çözme yolu karşılaştırması")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dsn", default=os.environ.get("GEOPG_BENCH_DSN"))
+    args = parser.parse_args()
+
+    bench_decode_only(args.rows)
+    if args.dsn:
+        bench_database(args.dsn, args.rows)
+    else:
+        print("\n(--dsn verilmediği için veritabanı testi atlandı.)")
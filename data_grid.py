@@ -0,0 +1,373 @@
+import threading
+import numpy as np
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+# --- Sanal Izgara Ayarları ---
+GRID_COLUMN_WIDTH = 120       # Varsayılan sütun genişliği (piksel)
+GRID_DEFAULT_ROW_HEIGHT = 20  # Stil bilgisi okunamazsa kullanılacak satır yüksekliği
+GRID_FILTER_DELAY_MS = 300    # Filtre kutusuna yazmayı bitirdikten sonra aramaya başlamadan önce beklenecek süre
+GRID_CELL_MAX_CHARS = 200     # Hücrede gösterilecek en fazla karakter (uzun metinler kısaltılır)
+
+
+def format_cell(value):
+    """Bir hücre değerini Treeview'da gösterilecek metne çevirir."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    text = str(value)
+    if len(text) > GRID_CELL_MAX_CHARS:
+        text = text[:GRID_CELL_MAX_CHARS - 1] + "…"
+    return text
+
+
+def build_search_text(frame):
+    """Filtreleme için her satırın tüm hücrelerini küçük harfli tek bir metinde birleştirir."""
+    import pandas as pd # Izgara pandas'ı ilk veriyle birlikte yükler (uygulama açılışını yavaşlatmaz)
+    if frame.empty or len(frame.columns) == 0:
+        return pd.Series([""] * len(frame), index=frame.index, dtype=object)
+    text = frame.iloc[:, 0].astype(str)
+    for col in frame.columns[1:]:
+        text = text + "\x1f" + frame[col].astype(str)
+    return text.str.lower()
+
+
+class _EmptyFrame:
+    """İlk veri gelene kadarki boş ızgara durumu; pandas'ı yüklemeden DataFrame'in burada kullanılan kısmını taklit eder."""
+    empty = True
+    columns = ()
+
+    def __len__(self):
+        return 0
+
+
+class VirtualDataGrid:
+    """
+    DataFrame üzerinde çalışan sanal (sayfalı) tablo.
+    Treeview'da yalnızca ekrana sığan satır sayısı kadar öğe bulunur; kaydırıldığında bu öğelerin
+    değerleri DataFrame'in ilgili satırlarıyla güncellenir. Sıralama ve filtreleme, satırları
+    yeniden eklemek yerine bir satır sırası (pozisyon dizisi) üzerinde yapılır.
+    """
+
+    def __init__(self, parent, bootstyle=PRIMARY):
+        self._chunks = []               # Akış modunda eklenen, henüz birleştirilmemiş parçalar
+        self._frame = _EmptyFrame()
+        self._search_text = None        # Filtre için önbelleğe alınmış satır metinleri
+        self._order = None              # Sıralama etkinse tüm satırların sıralı pozisyonları
+        self._sort_column = None
+        self._sort_ascending = True
+        self._filter_text = ""
+        self._filter_mask = None
+        self._filter_token = 0
+        self._filter_job = None
+        self._view = np.zeros(0, dtype=np.int64)   # Ekranda gösterilecek satırların pozisyonları (sıralı + filtreli)
+        self._offset = 0
+        self._slot_positions = []       # Treeview'daki her öğenin o an gösterdiği satır pozisyonu
+        self._selected = set()
+        self.on_selection_changed = None  # Kullanıcı seçimi değiştirdiğinde seçili satır pozisyonlarıyla çağrılır
+
+        # Üst çubuk: filtre kutusu ve kayıt bilgisi
+        toolbar = ttk.Frame(parent)
+        toolbar.pack(side=TOP, fill=X, pady=(0, 5))
+        ttk.Label(toolbar, text="Filtre:").pack(side=LEFT, padx=(0, 5))
+        self.filter_var = ttk.StringVar()
+        self.filter_var.trace_add("write", self._on_filter_changed)
+        ttk.Entry(toolbar, textvariable=self.filter_var, width=30).pack(side=LEFT)
+        self.info_label = ttk.Label(toolbar, text="", bootstyle=SECONDARY)
+        self.info_label.pack(side=RIGHT)
+
+        grid_frame = ttk.Frame(parent)
+        grid_frame.pack(fill=BOTH, expand=YES)
+
+        self.tree = ttk.Treeview(grid_frame, bootstyle=bootstyle, show="headings", selectmode="extended")
+        self.vsb = ttk.Scrollbar(grid_frame, orient="vertical", command=self._on_scrollbar)
+        hsb = ttk.Scrollbar(grid_frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hsb.set)
+
+        self.vsb.pack(side=RIGHT, fill=Y)
+        hsb.pack(side=BOTTOM, fill=X)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=YES)
+
+        self.tree.bind("<Configure>", lambda e: self._refresh())
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_rows(3))
+        self.tree.bind("<Up>", lambda e: self._scroll_rows(-1) if self._at_edge(e, top=True) else None)
+        self.tree.bind("<Down>", lambda e: self._scroll_rows(1) if self._at_edge(e, top=False) else None)
+        self.tree.bind("<Prior>", lambda e: self._scroll_rows(-self._visible_rows()))
+        self.tree.bind("<Next>", lambda e: self._scroll_rows(self._visible_rows()))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    # --- Veri Yükleme ---
+    def set_dataframe(self, frame):
+        """Izgaradaki veriyi verilen DataFrame ile değiştirir. Satırlar Treeview'a eklenmez."""
+        self._cancel_filter() # Önceki veri için süren filtrenin sonucu yeni satırlara uygulanmaz
+        self._chunks = []
+        self._frame = frame.reset_index(drop=True)
+        self._search_text = None
+        self._order = None
+        self._sort_column = None
+        self._filter_mask = None
+        self._offset = 0
+        self._selected = set()
+        self._setup_columns(list(self._frame.columns))
+        if self._filter_text:
+            self._schedule_filter(0)
+        self._rebuild_view()
+
+    def append(self, frame):
+        """Akış modunda yeni satırları sona ekler. Birleştirme, satırlara ihtiyaç duyulana kadar ertelenir."""
+        if frame.empty:
+            return
+        if len(self._frame.columns) == 0 and not self._chunks:
+            self.set_dataframe(frame)
+            return
+        self._chunks.append(frame)
+        self._search_text = None
+        if self._filter_text:
+            self._cancel_filter() # Eski satırlar için hesaplanan maske yeni satır sayısına uymaz
+        if self._sort_column is not None or self._filter_text:
+            # Sıralama/filtre etkinken yeni satırların yeri ancak tüm veriyle birlikte hesaplanabilir
+            self._consolidate()
+            self._order = None
+            if self._filter_text:
+                self._schedule_filter()
+            self._rebuild_view()
+        else:
+            start = len(self._view)
+            self._view = np.concatenate([self._view, np.arange(start, start + len(frame))])
+            self._refresh()
+
+    def clear(self):
+        import pandas as pd
+        self.set_dataframe(pd.DataFrame())
+
+    def __len__(self):
+        return len(self._frame) + sum(len(c) for c in self._chunks)
+
+    def _consolidate(self):
+        if self._chunks:
+            import pandas as pd
+            self._frame = pd.concat([self._frame] + self._chunks, ignore_index=True)
+            self._chunks = []
+        return self._frame
+
+    def _setup_columns(self, columns):
+        self.tree.delete(*self.tree.get_children())
+        self._slot_positions = []
+        self.tree["columns"] = columns
+        for col in columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=GRID_COLUMN_WIDTH, anchor=W)
+
+    # --- Sıralama ve Filtreleme ---
+    def sort_by(self, column):
+        """Sütun başlığına tıklandığında çağrılır; aynı sütuna tekrar tıklamak sıralama yönünü çevirir."""
+        frame = self._consolidate()
+        if frame.empty:
+            return
+        if self._sort_column == column:
+            self._sort_ascending = not self._sort_ascending
+        else:
+            self._sort_column, self._sort_ascending = column, True
+        self._compute_order()
+        for col in frame.columns:
+            arrow = (" ▲" if self._sort_ascending else " ▼") if col == column else ""
+            self.tree.heading(col, text=f"{col}{arrow}")
+        self._offset = 0
+        self._rebuild_view()
+
+    def _compute_order(self):
+        """Seçili sütuna göre tüm satırların sıralı pozisyonlarını hesaplar (kararlı sıralama)."""
+        series = self._frame[self._sort_column]
+        try:
+            sorted_series = series.sort_values(ascending=self._sort_ascending, kind='mergesort', na_position='last')
+        except TypeError:
+            # Karışık tipli sütunlar metin olarak sıralanır
+            sorted_series = series.astype(str).sort_values(ascending=self._sort_ascending, kind='mergesort')
+        self._order = sorted_series.index.to_numpy()
+
+    def _on_filter_changed(self, *args):
+        self._filter_text = self.filter_var.get().strip().lower()
+        self._schedule_filter(GRID_FILTER_DELAY_MS)
+
+    def _schedule_filter(self, delay_ms=GRID_FILTER_DELAY_MS):
+        if self._filter_job is not None:
+            self.tree.after_cancel(self._filter_job)
+        self._filter_job = self.tree.after(delay_ms, self._start_filter)
+
+    def _cancel_filter(self):
+        """Bekleyen filtreyi iptal eder; arka planda sürenin sonucu jeton değiştiği için atılır."""
+        if self._filter_job is not None:
+            self.tree.after_cancel(self._filter_job)
+            self._filter_job = None
+        self._filter_token += 1
+
+    def _start_filter(self):
+        """Filtreyi arka planda hesaplar; bu arada yeni bir filtre yazıldıysa eski sonuç atılır."""
+        self._filter_job = None
+        self._filter_token += 1
+        token = self._filter_token
+        needle = self._filter_text
+        if not needle:
+            self._apply_filter(None, token)
+            return
+        frame = self._consolidate()
+        if isinstance(frame, _EmptyFrame):
+            self._apply_filter(np.zeros(0, dtype=bool), token)
+            return
+        search_text = self._search_text
+
+        def _filter_worker():
+            text = search_text if search_text is not None else build_search_text(frame)
+            mask = text.str.contains(needle, regex=False).to_numpy()
+            self.tree.after(0, self._apply_filter, mask, token, text)
+
+        threading.Thread(target=_filter_worker, daemon=True).start()
+
+    def _apply_filter(self, mask, token, search_text=None):
+        if token != self._filter_token:
+            return
+        if search_text is not None and len(search_text) == len(self._frame):
+            self._search_text = search_text
+        self._filter_mask = mask
+        self._offset = 0
+        self._rebuild_view()
+
+    def _rebuild_view(self):
+        """Sıralama ve filtre durumuna göre gösterilecek satır pozisyonlarını yeniden hesaplar."""
+        frame = self._consolidate()
+        if self._sort_column is not None and (self._order is None or len(self._order) != len(frame)):
+            self._compute_order()
+        view = self._order if self._order is not None else np.arange(len(frame))
+        if self._filter_mask is not None:
+            mask = self._filter_mask
+            if len(mask) < len(frame):
+                # Akışla gelen yeni satırlar, filtre yeniden hesaplanana kadar gizli kalır
+                mask = np.concatenate([mask, np.zeros(len(frame) - len(mask), dtype=bool)])
+            view = view[mask[view]]
+        self._view = view
+        self._refresh()
+
+    # --- Kaydırma ---
+    def _visible_rows(self):
+        height = self.tree.winfo_height()
+        row_height = GRID_DEFAULT_ROW_HEIGHT
+        first_y = row_height + 4  # Başlık satırı
+        if self._slot_positions:
+            bbox = self.tree.bbox(self.tree.get_children()[0])
+            if bbox:
+                first_y, row_height = bbox[1], bbox[3]
+        else:
+            style_height = ttk.Style().lookup("Treeview", "rowheight")
+            if style_height:
+                row_height = int(style_height)
+        return max(1, (height - first_y) // max(1, row_height))
+
+    def _max_offset(self):
+        return max(0, len(self._view) - self._visible_rows())
+
+    def _scroll_rows(self, delta):
+        new_offset = min(max(0, self._offset + delta), self._max_offset())
+        if new_offset != self._offset:
+            self._offset = new_offset
+            self._refresh()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        return self._scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._offset = min(max(0, int(float(value) * len(self._view))), self._max_offset())
+            self._refresh()
+        elif action == "scroll":
+            step = self._visible_rows() if unit == "pages" else 1
+            self._scroll_rows(int(value) * step)
+
+    def _at_edge(self, event, top):
+        """Klavye ile seçim ilk/son görünen satırdaysa sanal kaydırma yapılır."""
+        focus = self.tree.focus()
+        children = self.tree.get_children()
+        if not children or not focus:
+            return False
+        return focus == (children[0] if top else children[-1])
+
+    # --- Görünen Satırları Çiz ---
+    def _refresh(self):
+        """Yalnızca ekrana sığan satırları Treeview öğelerine yazar."""
+        frame = self._frame
+        if self._chunks:
+            frame = self._consolidate()
+        visible = self._visible_rows()
+        self._offset = min(self._offset, max(0, len(self._view) - visible))
+        positions = self._view[self._offset:self._offset + visible]
+
+        page_values = frame.iloc[positions].to_numpy() if len(positions) else []
+        children = list(self.tree.get_children())
+        while len(children) > len(positions):
+            self.tree.delete(children.pop())
+        for i, (pos, row) in enumerate(zip(positions, page_values)):
+            values = [format_cell(v) for v in row]
+            if i < len(children):
+                self.tree.item(children[i], values=values)
+            else:
+                children.append(self.tree.insert("", END, values=values))
+        self._slot_positions = [int(p) for p in positions]
+
+        reselect = [iid for iid, pos in zip(children, self._slot_positions) if pos in self._selected]
+        self.tree.selection_set(reselect)
+
+        total = len(self._view)
+        if total:
+            self.vsb.set(self._offset / total, min(1.0, (self._offset + len(positions)) / total))
+        else:
+            self.vsb.set(0.0, 1.0)
+        self._update_info()
+
+    def _update_info(self):
+        total = len(self)
+        shown = len(self._view)
+        if total == 0:
+            text = ""
+        elif shown == 0:
+            text = f"0 / {total} kayıt"
+        else:
+            last = min(shown, self._offset + len(self._slot_positions))
+            text = f"{self._offset + 1}–{last} / {shown} kayıt"
+            if shown != total:
+                text += f" (toplam {total}, filtreli)"
+        self.info_label.config(text=text)
+
+    # --- Seçim ---
+    def selected_positions(self):
+        """Seçili satırların (DataFrame'deki) pozisyonlarını sıralı dizi olarak döndürür."""
+        return np.array(sorted(self._selected), dtype=np.int64)
+
+    def select_positions(self, positions, see=True):
+        """
+        Verilen satır pozisyonlarını seçer (ör. haritada tıklama veya kutu seçimi).
+        see=True ise ilk seçili satır ekranda değilse ızgara o satıra kaydırılır.
+        on_selection_changed bu çağrı için tetiklenmez.
+        """
+        self._consolidate()
+        self._selected = {int(p) for p in positions}
+        if see and self._selected:
+            hits = np.flatnonzero(np.isin(self._view, self.selected_positions()))
+            if len(hits) and not self._offset <= hits[0] < self._offset + len(self._slot_positions):
+                self._offset = min(int(hits[0]), self._max_offset())
+        self._refresh()
+
+    def _on_select(self, event=None):
+        children = self.tree.get_children()
+        selected_ids = set(self.tree.selection())
+        before = len(self._selected)
+        changed = False
+        for iid, pos in zip(children, self._slot_positions):
+            if iid in selected_ids:
+                changed |= pos not in self._selected
+                self._selected.add(pos)
+            else:
+                self._selected.discard(pos)
+        changed |= len(self._selected) != before
+        if changed and self.on_selection_changed is not None:
+            self.on_selection_changed(self.selected_positions())
@@ -0,0 +1,304 @@
+import threading
+import time
+from contextlib import contextmanager
+import psycopg2
+import psycopg2.pool
+import psycopg2.extensions
+
+# --- Bağlantı Havuzu Ayarları ---
+# Havuz; arka plandaki vektör karo (vector_tiles.VECTOR_TILE_WORKERS = 4) ve sorgu katmanı
+# (map_layers.LAYER_FETCH_WORKERS = 4) thread'lerinin hepsine ve ön plandaki ana sorgu, bağlantı
+# testi ve içe aktarıcıya aynı anda yetecek büyüklüktedir. Arka plan işleri (background=True)
+# POOL_FOREGROUND_RESERVE kadar bağlantıya dokunamaz; harita ne kadar karo/katman isterse istesin
+# ana sorgu havuz boşalmasını beklemez.
+POOL_MAX_SIZE = 12                # Aynı veritabanına aynı anda açık tutulabilecek en fazla bağlantı
+POOL_FOREGROUND_RESERVE = 4       # Yalnızca ön plan işlerine (background=False) ayrılan bağlantı sayısı
+POOL_IDLE_TIMEOUT_S = 300         # Bu süreden uzun boşta kalan bağlantılar kapatılır
+POOL_HEALTH_CHECK_INTERVAL_S = 30 # Bu süreden uzun boşta kalan bağlantı verilmeden önce 'SELECT 1' ile denetlenir
+POOL_ACQUIRE_TIMEOUT_S = 30       # Havuz doluyken boş bağlantı için en fazla bekleme süresi
+POOL_CONNECT_TIMEOUT_S = 10
+
+
+class PoolTimeoutError(psycopg2.pool.PoolError):
+    """Havuz dolu ve belirtilen süre içinde bir bağlantı serbest kalmadı."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 bağlantı havuzu.
+    Bağlantılar sorgudan sonra kapatılmaz, havuza iade edilir; böylece her sorguda
+    yeniden TCP/TLS el sıkışması yapılmaz. Boşta uzun kalan bağlantılar verilmeden önce
+    sağlık denetiminden geçirilir, bozuk olanlar yenileriyle değiştirilir ve idle_timeout'u
+    aşanlar kapatılır. acquire/release süreleri stats() ile izlenebilir.
+    """
+
+    def __init__(self, db_params, max_size=POOL_MAX_SIZE, idle_timeout=POOL_IDLE_TIMEOUT_S,
+                 health_check_interval=POOL_HEALTH_CHECK_INTERVAL_S, connect_timeout=POOL_CONNECT_TIMEOUT_S,
+                 foreground_reserve=POOL_FOREGROUND_RESERVE):
+        self.db_params = dict(db_params)
+        self.max_size = max_size
+        # Arka plan işlerinin alabileceği en fazla bağlantı; havuz çok küçükse en az bir bağlantı bırakılır
+        self.background_limit = max(1, max_size - foreground_reserve)
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_timeout = connect_timeout
+        self._lock = threading.Condition()
+        self._idle = []           # (bağlantı, boşa çıkma zamanı); en son iade edilen sonda
+        self._in_use = {}         # id(bağlantı) -> verilme zamanı
+        self._background = set()  # Arka plan işlerine verilmiş bağlantıların id'leri
+        self._background_count = 0 # Arka plan işlerine verilmiş + onlar için açılmakta olan bağlantı sayısı
+        self._size = 0            # Açık (boşta + kullanımda) + açılmakta olan bağlantı sayısı
+        self._closed = False
+        self._reaper = None
+        self._metrics = {
+            'acquires': 0, 'waits': 0, 'connects': 0, 'reconnects': 0, 'evictions': 0, 'discards': 0,
+            'acquire_seconds': 0.0, 'max_acquire_seconds': 0.0,
+            'hold_seconds': 0.0, 'max_hold_seconds': 0.0, 'releases': 0,
+        }
+
+    # --- Bağlantı Alma / İade ---
+    def acquire(self, timeout=POOL_ACQUIRE_TIMEOUT_S, check=False, background=False):
+        """
+        Havuzdan bir bağlantı verir. Boşta bağlantı yoksa ve havuz dolu değilse yeni bağlantı açar;
+        havuz doluysa timeout saniye boyunca bir bağlantının iade edilmesini bekler.
+        check=True ise bağlantı, boşta kalma süresinden bağımsız olarak sağlık denetiminden geçirilir.
+        background=True (karo/katman çekimi gibi arka plan işleri) ise en fazla background_limit
+        bağlantı verilir; kalanlar ön plan işlerine ayrılmıştır.
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        waited = False
+        while True:
+            conn, idle_since = None, None
+            with self._lock:
+                if self._closed:
+                    raise psycopg2.pool.PoolError("Bağlantı havuzu kapatıldı.")
+                self._evict_idle_locked()
+                blocked = background and self._background_count >= self.background_limit
+                if not blocked and self._idle:
+                    conn, idle_since = self._idle.pop()
+                elif not blocked and self._size < self.max_size:
+                    self._size += 1 # Yer ayır; bağlantı kilit dışında açılır
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        limit = self.background_limit if blocked else self.max_size
+                        raise PoolTimeoutError(f"Bağlantı havuzu dolu ({limit}); {timeout} sn içinde bağlantı serbest kalmadı.")
+                    waited = True
+                    self._lock.wait(remaining)
+                    continue
+                if background:
+                    self._background_count += 1
+
+            if conn is not None:
+                if self._is_healthy(conn, idle_since, check):
+                    break
+                self._close_quietly(conn)
+                with self._lock:
+                    self._metrics['reconnects'] += 1
+                conn = None # Bozuk bağlantının havuzdaki yeri yeni bağlantıya devredilir
+            try:
+                conn = psycopg2.connect(**self.db_params, connect_timeout=self.connect_timeout)
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    if background:
+                        self._background_count -= 1
+                    self._lock.notify_all()
+                raise
+            with self._lock:
+                self._metrics['connects'] += 1
+            break
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._in_use[id(conn)] = time.perf_counter()
+            if background:
+                self._background.add(id(conn))
+            m = self._metrics
+            m['acquires'] += 1
+            m['waits'] += int(waited)
+            m['acquire_seconds'] += elapsed
+            m['max_acquire_seconds'] = max(m['max_acquire_seconds'], elapsed)
+        self._schedule_reaper()
+        return conn
+
+    def release(self, conn, discard=False):
+        """
+        Bağlantıyı havuza iade eder. Açık işlem geri alınır (SET LOCAL ayarları da böylece sıfırlanır).
+        Bağlantı kapanmışsa, geri alma başarısız olursa veya discard=True ise bağlantı kapatılır.
+        """
+        if conn is None:
+            return
+        if not discard and not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        with self._lock:
+            acquired_at = self._in_use.pop(id(conn), None)
+            if id(conn) in self._background:
+                self._background.discard(id(conn))
+                self._background_count -= 1
+            if acquired_at is not None:
+                held = time.perf_counter() - acquired_at
+                m = self._metrics
+                m['releases'] += 1
+                m['hold_seconds'] += held
+                m['max_hold_seconds'] = max(m['max_hold_seconds'], held)
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                self._metrics['discards'] += 1
+                conn_to_close = conn
+            else:
+                self._idle.append((conn, time.monotonic()))
+                conn_to_close = None
+            # Ön plan ve arka plan bekleyenlerinin koşulları farklı; hepsi uyandırılır, uygun olan alır
+            self._lock.notify_all()
+        if conn_to_close is not None:
+            self._close_quietly(conn_to_close)
+
+    @contextmanager
+    def connection(self, timeout=POOL_ACQUIRE_TIMEOUT_S, check=False, background=False):
+        """
+        'with pool.connection() as conn:' kullanımı için. Bağlantı hatası (OperationalError/InterfaceError)
+        oluşursa bağlantı havuza geri konmaz; bir sonraki istekte yenisi açılır.
+        """
+        conn = self.acquire(timeout=timeout, check=check, background=background)
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            # İptal/zaman aşımı (QueryCanceledError) bağlantıyı bozmaz; havuza geri konabilir
+            discard = not isinstance(e, psycopg2.extensions.QueryCanceledError)
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    # --- Sağlık Denetimi ve Boşta Bekleyenleri Temizleme ---
+    def _is_healthy(self, conn, idle_since, force=False):
+        if conn.closed:
+            return False
+        if not force and time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _evict_idle_locked(self):
+        """Kilit altındayken çağrılır; idle_timeout'u aşan boştaki bağlantıları kapatır."""
+        if not self._idle:
+            return
+        now = time.monotonic()
+        keep = []
+        for conn, idle_since in self._idle:
+            if now - idle_since > self.idle_timeout or conn.closed:
+                self._size -= 1
+                self._metrics['evictions'] += 1
+                self._close_quietly(conn)
+            else:
+                keep.append((conn, idle_since))
+        self._idle = keep
+
+    def _schedule_reaper(self):
+        """Uygulama boştayken de eski bağlantıların kapanması için arka planda periyodik temizlik planlar."""
+        with self._lock:
+            if self._reaper is not None or self._closed:
+                return
+            self._reaper = threading.Timer(max(self.idle_timeout / 2, 1), self._reap)
+            self._reaper.daemon = True
+            self._reaper.start()
+
+    def _reap(self):
+        with self._lock:
+            self._reaper = None
+            self._evict_idle_locked()
+            busy = bool(self._idle or self._in_use)
+        if busy:
+            self._schedule_reaper()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Boştaki bütün bağlantıları kapatır; kullanımdakiler iade edildiklerinde kapatılır."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            if self._reaper is not None:
+                self._reaper.cancel()
+                self._reaper = None
+            self._lock.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    # --- Ölçümler ---
+    def stats(self):
+        """Havuz durumunu ve acquire/release süre ölçümlerini sözlük olarak döndürür."""
+        with self._lock:
+            m = dict(self._metrics)
+            m['size'] = self._size
+            m['idle'] = len(self._idle)
+            m['in_use'] = len(self._in_use)
+            m['background'] = len(self._background)
+            m['max_size'] = self.max_size
+            m['background_limit'] = self.background_limit
+        m['avg_acquire_ms'] = 1000 * m['acquire_seconds'] / m['acquires'] if m['acquires'] else 0.0
+        m['avg_hold_ms'] = 1000 * m['hold_seconds'] / m['releases'] if m['releases'] else 0.0
+        return m
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"Havuz: {s['in_use']}/{s['size']} kullanımda (en fazla {s['max_size']}; arka plan "
+                f"{s['background']}/{s['background_limit']}), {s['idle']} boşta | "
+                f"{s['acquires']} alım, {s['connects']} yeni bağlantı, {s['reconnects']} yenileme, "
+                f"{s['evictions']} zaman aşımı, {s['waits']} bekleme | "
+                f"alım ort. {s['avg_acquire_ms']:.1f} ms (en fazla {1000 * s['max_acquire_seconds']:.1f} ms), "
+                f"kullanım ort. {s['avg_hold_ms']:.0f} ms")
+
+
+# --- Paylaşılan Havuzlar ---
+# Görüntüleyici ve içe aktarıcı aynı bağlantı bilgileri için aynı havuzu kullanır.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(db_params):
+    return tuple(sorted((k, str(v)) for k, v in db_params.items()))
+
+
+def get_pool(db_params, **pool_kwargs):
+    """Verilen bağlantı bilgileri için paylaşılan havuzu döndürür; yoksa oluşturur."""
+    key = _pool_key(db_params)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_params, **pool_kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def close_pool(db_params):
+    """Verilen bağlantı bilgilerine ait havuzu kapatır ve kayıttan siler (ör. bağlantı başarısız olduğunda)."""
+    with _pools_lock:
+        pool = _pools.pop(_pool_key(db_params), None)
+    if pool is not None:
+        pool.close()
+
+
+def close_all():
+    """Uygulama kapanırken bütün havuzları kapatır."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,144 @@
+import datetime
+import importlib.util
+
+# --- Excel Okuyucu Katmanı ---
+# Her okuyucu, bir çalışma kitabının sayfa adlarını ve her sayfanın satırlarını (tuple) sırayla verir.
+# Satırlar tam bir DataFrame kurulmadan tüketilebilir; böylece sayfa boyutu bellek kullanımını belirlemez.
+# 'auto' seçildiğinde kurulu olan en hızlı motor kullanılır.
+EXCEL_READER_PRIORITY = ('calamine', 'openpyxl', 'pandas')
+
+
+def normalize_cell(value):
+    """
+    Hücre değerini motordan bağımsız hale getirir: tam sayı değerli float'lar int'e çevrilir
+    (pd.read_excel davranışı), boş metinler None olur.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value == "":
+        return None
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+class CalamineExcelReader:
+    """Rust tabanlı python-calamine ile okur; openpyxl'e göre kat kat hızlıdır."""
+    name = 'calamine'
+    module = 'python_calamine'
+
+    def __init__(self, path):
+        from python_calamine import CalamineWorkbook
+        self._workbook = CalamineWorkbook.from_path(path)
+
+    @classmethod
+    def available(cls):
+        return importlib.util.find_spec(cls.module) is not None
+
+    def sheet_names(self):
+        return list(self._workbook.sheet_names)
+
+    def iter_rows(self, sheet_name):
+        sheet = self._workbook.get_sheet_by_name(sheet_name)
+        rows = sheet.iter_rows() if hasattr(sheet, 'iter_rows') else sheet.to_python(skip_empty_area=False)
+        for row in rows:
+            yield tuple(normalize_cell(v) for v in row)
+
+    def close(self):
+        close = getattr(self._workbook, 'close', None)
+        if close:
+            close()
+
+
+class OpenpyxlStreamReader:
+    """openpyxl read-only modunda satır satır okur; sayfa belleğe alınmaz."""
+    name = 'openpyxl'
+    module = 'openpyxl'
+
+    def __init__(self, path):
+        import openpyxl
+        self._workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+
+    @classmethod
+    def available(cls):
+        return importlib.util.find_spec(cls.module) is not None
+
+    def sheet_names(self):
+        return list(self._workbook.sheetnames)
+
+    def iter_rows(self, sheet_name):
+        for row in self._workbook[sheet_name].iter_rows(values_only=True):
+            yield tuple(normalize_cell(v) for v in row)
+
+    def close(self):
+        self._workbook.close()
+
+
+class PandasExcelReader:
+    """Eski yol: her sayfa pd.read_excel ile tamamen okunur. Diğer motorlar yoksa kullanılır."""
+    name = 'pandas'
+    module = 'pandas'
+
+    def __init__(self, path):
+        import pandas as pd
+        self._pd = pd
+        self._excel_file = pd.ExcelFile(path)
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def sheet_names(self):
+        return list(self._excel_file.sheet_names)
+
+    def iter_rows(self, sheet_name):
+        df = self._pd.read_excel(self._excel_file, sheet_name=sheet_name, header=None)
+        for row in df.itertuples(index=False, name=None):
+            yield tuple(None if self._pd.isna(v) else normalize_cell(v) for v in row)
+
+    def close(self):
+        self._excel_file.close()
+
+
+EXCEL_READERS = {reader.name: reader for reader in (CalamineExcelReader, OpenpyxlStreamReader, PandasExcelReader)}
+
+
+def available_excel_readers():
+    return [name for name in EXCEL_READER_PRIORITY if EXCEL_READERS[name].available()]
+
+
+def open_excel_reader(path, engine='auto'):
+    """Verilen motorla (veya 'auto' ise kurulu en hızlı motorla) bir Excel okuyucusu açar."""
+    if engine == 'auto':
+        engine = available_excel_readers()[0]
+    if engine not in EXCEL_READERS:
+        raise ValueError(f"Bilinmeyen Excel okuma motoru: '{engine}'. Seçenekler: {', '.join(EXCEL_READERS)}")
+    return EXCEL_READERS[engine](path)
+
+
+def sheet_header_and_rows(rows):
+    """
+    Sayfa satırlarından başlığı ve veri satırlarını ayırır. Tamamen boş satırlar atlanır.
+    Başlıktaki boş hücreler pd.read_excel gibi 'Unnamed: n' olarak adlandırılır; başlığın sağındaki
+    boş sütunlar atılır. Veri satırları başlık genişliğine kırpılır/tamamlanır.
+    (başlık listesi, veri satırı iterator'ı) döndürür; sayfa boşsa başlık None olur.
+    """
+    rows = (row for row in rows if any(v is not None for v in row))
+    header = next(rows, None)
+    if header is None:
+        return None, iter(())
+    width = len(header)
+    while width and header[width - 1] is None:
+        width -= 1
+    if width == 0:
+        return None, iter(())
+    columns = [f"Unnamed: {i}" if v is None else v for i, v in enumerate(header[:width])]
+
+    def data_rows():
+        for row in rows:
+            if len(row) >= width:
+                yield row[:width]
+            else:
+                yield row + (None,) * (width - len(row))
+
+    return columns, data_rows()
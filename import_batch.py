@@ -0,0 +1,119 @@
+import glob
+import os
+import time
+import db_pool
+import import_engine
+import import_manifest
+from import_engine import sanitize_db_identifier
+
+# --- Klasör Bazında Toplu Aktarım ---
+# Arayüzden (EXECSV2PG.DataImporterApp) ve komut satırından (import_cli) ortak kullanılır.
+# Bu modül Tk/ttkbootstrap içe aktarmaz; cron ve konteynerlerde pencere açılmadan çalışır.
+
+# kaynak türü -> (görünen ad, dosya deseni)
+SOURCE_KINDS = {
+    'excel': ('Excel', '*.xlsx'),
+    'csv': ('CSV', '*.csv'),
+}
+
+
+def summarize_results(results):
+    """Dosya özetlerinden toplam dosya/tablo/satır/bayt sayılarını çıkarır."""
+    tables = [table for result in results for table in result['tables']]
+    return {
+        'files': len(results),
+        'processed': sum(1 for r in results if r['tables'] or r['skipped']),
+        'skipped': sum(1 for r in results if r['skipped']),
+        'failed': sum(1 for r in results if r['errors']),
+        'tables': len(tables),
+        'rows': sum(t['rows'] for t in tables),
+        'bytes': sum(t['bytes'] for t in tables),
+    }
+
+
+def import_folder(db_config, schema_name, folder_path, kind, status_callback, workers=1, **import_options):
+    """
+    Klasördeki bütün kind ('excel' veya 'csv') dosyalarını şemaya aktarır.
+    import_options (engine, chunk_rows, infer_types, build_geometry, srid, load_mode, upsert_key)
+    import_engine.import_excel_path / import_csv_path'e aynen iletilir; workers > 1 ise dosyalar
+    süreç havuzunda paralel aktarılır. ok, şema, dosya özetleri, toplamlar ve süreyi içeren özeti döndürür.
+    """
+    label, pattern = SOURCE_KINDS[kind]
+    started = time.perf_counter()
+    summary = {'ok': True, 'source': kind, 'schema': None, 'folder': folder_path, 'files': [],
+               'totals': summarize_results([]), 'seconds': 0.0}
+    status_callback(f"{label} Aktarımı Başlatılıyor: {db_config.get('host')}/{db_config.get('dbname')}")
+    pool = db_pool.get_pool(db_config)
+    conn = None
+    cur = None
+    try:
+        conn = pool.acquire()
+        cur = conn.cursor()
+        status_callback(f"Veritabanı bağlantısı başarılı ({label}).")
+
+        safe_schema_name = sanitize_db_identifier(schema_name, is_schema=True)
+        if schema_name != safe_schema_name:
+            status_callback(f"Bilgi: Şema adı '{schema_name}' -> '{safe_schema_name}' olarak düzenlendi.")
+        summary['schema'] = safe_schema_name
+        status_callback(f"Şema '{safe_schema_name}' kontrol ediliyor/oluşturuluyor...")
+        cur.execute(f"CREATE SCHEMA IF NOT EXISTS \"{safe_schema_name}\";")
+        conn.commit()
+        if import_options.get('load_mode') == 'upsert':
+            # Artımlı modda değişmemiş dosyaları atlamak için manifest tablosu
+            import_manifest.ensure_manifest(conn, safe_schema_name)
+
+        paths = sorted(glob.glob(os.path.join(folder_path, pattern)))
+        if not paths:
+            status_callback(f"Bilgi: Seçilen klasörde {label} dosyası bulunamadı.")
+            return summary
+
+        total_files = len(paths)
+        status_callback(f"Toplam {total_files} {label} dosyası bulundu.")
+
+        if workers > 1:
+            # Dosyalar süreç havuzunda, her işçi kendi bağlantısıyla paralel aktarılır
+            results = import_engine.import_files_parallel(db_config, safe_schema_name, paths, kind,
+                                                          status_callback, workers, **import_options)
+        else:
+            results = []
+            for i, path in enumerate(paths):
+                status_callback(f"İşleniyor ({i+1}/{total_files}): {os.path.basename(path)}")
+                results.append(import_engine.FILE_IMPORTERS[kind](conn, path, safe_schema_name, status_callback,
+                                                                  **import_options))
+        summary['files'] = results
+        totals = summary['totals'] = summarize_results(results)
+        summary['ok'] = totals['failed'] == 0
+        if totals['skipped']:
+            status_callback(f"{totals['skipped']} dosya son aktarımdan beri değişmediği için atlandı.")
+
+        if totals['processed'] == total_files:
+             status_callback(f"Tüm {total_files} {label} dosyası başarıyla işlendi.")
+        elif totals['processed'] > 0:
+             status_callback(f"{totals['processed']}/{total_files} {label} dosyası kısmen veya tamamen işlendi. Detaylar için logları kontrol edin.")
+        else:
+             status_callback(f"Hiçbir {label} dosyası başarıyla işlenemedi. Detaylar için logları kontrol edin.")
+
+    except Exception as e:
+        status_callback(f"{label} Aktarımında Genel HATA: {e}")
+        summary['ok'] = False
+        summary['error'] = str(e)
+    finally:
+        if cur: cur.close()
+        if conn: pool.release(conn, discard=conn.closed)
+        status_callback(f"Veritabanı bağlantısı havuza iade edildi ({label}).")
+        summary['seconds'] = time.perf_counter() - started
+    return summary
+
+
+# --- Excel İşleme Fonksiyonu (Çoklu Sayfa Destekli) ---
+def excel_multi_sheet_to_postgres(db_config, schema_name, folder_path, status_callback, workers=1, **import_options):
+    # import_options (engine, infer_types, build_geometry, srid, load_mode, upsert_key) import_engine.import_excel_path'e aynen iletilir
+    return import_folder(db_config, schema_name, folder_path, 'excel', status_callback, workers, **import_options)['ok']
+
+
+# --- CSV İşleme Fonksiyonu ---
+def csv_files_to_postgres(db_config, schema_name, folder_path, status_callback, chunk_rows=import_engine.CSV_CHUNK_ROWS,
+                          workers=1, **import_options):
+    # import_options (infer_types, build_geometry, srid, load_mode, upsert_key) import_engine.import_csv_path'e aynen iletilir
+    return import_folder(db_config, schema_name, folder_path, 'csv', status_callback, workers, chunk_rows=chunk_rows,
+                         **import_options)['ok']
@@ -0,0 +1,116 @@
+"""
+Veri aktarım aracının komut satırı (pencere açmadan) giriş noktası.
+
+Tk/ttkbootstrap içe aktarılmaz; cron, konteyner ve CI'dan çalıştırılabilir. İlerleme mesajları
+stderr'e satır başına bir JSON nesnesi olarak, en sondaki özet (dosya başına tablo, satır, bayt ve
+süreler) stdout'a JSON olarak yazılır. Çıkış kodu: 0 başarılı, 1 en az bir dosya/tablo hatalı,
+2 geçersiz argüman.
+
+Kullanım:
+    PGPASSWORD=... python import_cli.py --source csv --folder ./veri --schema public --workers 4
+    python import_cli.py --source excel --folder ./veri --host db --dbname gis --user importer \\
+        --load-mode upsert --key id --summary-file ozet.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import db_pool
+import excel_readers
+import import_batch
+import import_engine
+import import_geometry
+from import_engine import sanitize_db_identifier
+
+
+def json_progress(stream=sys.stderr):
+    """status_callback: her mesajı başlangıçtan geçen süreyle birlikte tek satırlık JSON olarak yazar."""
+    started = time.perf_counter()
+
+    def report(message):
+        stream.write(json.dumps({'elapsed': round(time.perf_counter() - started, 3), 'message': message},
+                                ensure_ascii=False) + "\n")
+        stream.flush()
+    return report
+
+
+def parse_key_columns(value):
+    return tuple(sanitize_db_identifier(col.strip()) for col in value.split(',') if col.strip())
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Excel/CSV dosyalarını PostgreSQL'e aktarır (pencere açmadan).")
+    conn_group = parser.add_argument_group("bağlantı (verilmezse libpq ortam değişkenleri kullanılır)")
+    conn_group.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    conn_group.add_argument("--port", default=os.environ.get("PGPORT", "5432"))
+    conn_group.add_argument("--dbname", default=os.environ.get("PGDATABASE", "postgres"))
+    conn_group.add_argument("--user", default=os.environ.get("PGUSER", "postgres"))
+    conn_group.add_argument("--password", default=os.environ.get("PGPASSWORD", ""),
+                            help="komut geçmişinde görünmemesi için PGPASSWORD tercih edilmeli")
+
+    parser.add_argument("--source", required=True, choices=sorted(import_batch.SOURCE_KINDS), help="kaynak dosya türü")
+    parser.add_argument("--folder", required=True, help="dosyaların bulunduğu klasör")
+    parser.add_argument("--schema", default="public", help="hedef şema (yoksa oluşturulur)")
+    parser.add_argument("--workers", type=int, default=1, help="paralel işçi süreç sayısı (1 = sıralı)")
+    parser.add_argument("--chunk-rows", type=int, default=None,
+                        help=f"parça başına satır (varsayılan CSV {import_engine.CSV_CHUNK_ROWS}, "
+                             f"Excel {import_engine.EXCEL_CHUNK_ROWS})")
+    parser.add_argument("--engine", default="auto", choices=['auto'] + list(excel_readers.EXCEL_READER_PRIORITY),
+                        help="Excel okuma motoru")
+    parser.add_argument("--load-mode", default="replace", choices=list(import_engine.LOAD_MODES),
+                        help="replace: tabloyu yeniden oluştur, upsert: anahtarla birleştir, swap: kesintisiz takas")
+    parser.add_argument("--key", type=parse_key_columns, default=(),
+                        help="upsert anahtar sütun(lar)ı, virgülle ayrılmış")
+    parser.add_argument("--no-infer-types", dest="infer_types", action="store_false",
+                        help="bütün sütunları TEXT olarak yükle")
+    parser.add_argument("--no-geometry", dest="build_geometry", action="store_false",
+                        help="koordinat/WKT sütunlarından 'geom' üretme")
+    parser.add_argument("--srid", type=int, default=import_geometry.DEFAULT_SRID)
+    parser.add_argument("--quiet", action="store_true", help="ilerleme mesajlarını yazma, yalnızca özet")
+    parser.add_argument("--summary-file", help="JSON özeti stdout yerine bu dosyaya yaz")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.folder):
+        parser.error(f"klasör bulunamadı: {args.folder}")
+    if args.workers < 1:
+        parser.error("--workers en az 1 olmalıdır")
+    if args.chunk_rows is not None and args.chunk_rows < 1:
+        parser.error("--chunk-rows en az 1 olmalıdır")
+    if args.srid <= 0:
+        parser.error("--srid pozitif bir tam sayı olmalıdır")
+    if args.load_mode == 'upsert' and not args.key:
+        parser.error("--load-mode upsert için --key gereklidir")
+
+    db_config = {'host': args.host, 'port': args.port, 'dbname': args.dbname, 'user': args.user,
+                 'password': args.password}
+    import_options = {'infer_types': args.infer_types, 'build_geometry': args.build_geometry, 'srid': args.srid,
+                      'load_mode': args.load_mode, 'upsert_key': args.key}
+    if args.chunk_rows is not None:
+        import_options['chunk_rows'] = args.chunk_rows
+    if args.source == 'excel':
+        import_options['engine'] = args.engine
+
+    status_callback = (lambda message: None) if args.quiet else json_progress()
+    try:
+        summary = import_batch.import_folder(db_config, args.schema, args.folder, args.source, status_callback,
+                                             args.workers, **import_options)
+    finally:
+        db_pool.close_all()
+
+    output = json.dumps(summary, ensure_ascii=False, indent=2, default=str)
+    if args.summary_file:
+        with open(args.summary_file, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0 if summary['ok'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,924 @@
+import csv
+import io
+import itertools
+import os
+import re
+import time
+import pandas as pd
+import psycopg2
+import psycopg2.errors
+import db_pool
+import excel_readers
+import import_geometry
+import import_manifest
+import type_inference
+
+# --- COPY Akış Ayarları ---
+COPY_CHUNK_ROWS = 10000       # DataFrame'in CSV'ye her seferde kodlanacak satır sayısı
+CSV_CHUNK_ROWS = 50000        # Büyük CSV dosyalarının her seferde okunacak satır sayısı
+EXCEL_CHUNK_ROWS = 20000      # Excel sayfalarından her seferde DataFrame'e toplanacak satır sayısı
+PROGRESS_INTERVAL_S = 2.0     # İlerleme mesajlarının en sık gönderilme aralığı
+UPSERT_STAGING_TABLE = '_upsert_staging'  # Artımlı modda COPY'nin yapıldığı geçici (WAL'sız) tablo
+TYPE_FALLBACK_RETRIES = 3     # Tahmin edilen tipe uymayan sütunlar tek tek TEXT'e düşürülerek en fazla bu kadar yeniden denenir
+SWAP_TABLE_SUFFIX = '__yeni'  # Takas modunda yeni tablonun ve indekslerinin yükleme süresince taşıdığı ek
+SWAP_LOCK_TIMEOUT_MS = 2000   # Takasta eski tablonun kilidi için en fazla beklenecek süre (okuyucuları kuyrukta bekletmemek için)
+SWAP_LOCK_RETRIES = 5
+DUPLICATE_KEY_SAMPLES = 5     # Artımlı modda anahtarı tekil olmayan tablo için hata mesajında gösterilen örnek sayısı
+# Yükleme modları: 'replace' tabloyu baştan oluşturur, 'upsert' anahtar sütun(lar)la mevcut tabloya birleştirir,
+# 'swap' yeni tabloyu başka adla kurup yükleme bitince eskisinin yerine geçirir
+LOAD_MODES = {'replace': 'Değiştir', 'upsert': 'Artımlı (upsert)', 'swap': 'Takas (kesintisiz)'}
+
+
+# --- Yardımcı Fonksiyon: Tablo/Sütun Adlarını Güvenli Hale Getirme ---
+def sanitize_db_identifier(name, is_schema=False):
+    """
+    PostgreSQL tablo/sütun/şema adları için bir ismi güvenli hale getirir.
+    """
+    name = str(name).strip()
+    if not is_schema:
+        name = name.lower()
+
+    name = re.sub(r'[\s\-.\(\)]+', '_', name)
+    name = re.sub(r'[^\w_]', '', name)
+    name = re.sub(r'__+', '_', name)
+
+    if not name:
+        name = "unnamed_object" if not is_schema else "public"
+
+    if name and name[0].isdigit() and not is_schema:
+        name = '_' + name
+
+    name = name.strip('_')
+    return name[:63]
+
+
+def safe_column_names(original_cols):
+    """Sütun başlıklarını güvenli ve tekil veritabanı sütun adlarına çevirir (çakışanlara _1, _2... eklenir)."""
+    safe_cols = []
+    seen_cols = set()
+    for idx, col in enumerate(original_cols):
+        s_col = sanitize_db_identifier(col if pd.notna(col) else f"column_{idx+1}")
+        if not s_col: s_col = f"unnamed_col_{idx+1}"
+        temp_s_col = s_col
+        counter = 1
+        while temp_s_col in seen_cols:
+            temp_s_col = f"{s_col}_{counter}"
+            counter += 1
+        s_col = temp_s_col
+        safe_cols.append(s_col)
+        seen_cols.add(s_col)
+    return safe_cols
+
+
+# --- COPY FROM STDIN Akışı ---
+class FrameCopyStream(io.RawIOBase):
+    """
+    DataFrame parçalarını üreten bir iterator'ı COPY ... FROM STDIN için okunabilir bir dosya gibi sunar.
+    Parçalar, copy_expert read() çağırdıkça sırayla CSV'ye kodlanır; böylece diske geçici dosya
+    yazılmaz ve bellekte aynı anda yalnızca bir parçanın metni tutulur.
+    Üretilen CSV: başlıksız, tüm alanlar tırnaklı, UTF-8.
+    """
+
+    def __init__(self, frames):
+        self._frames = iter(frames)
+        self._buffer = b""
+        self._buffer_pos = 0
+        self.rows_sent = 0
+        self.bytes_sent = 0
+        self.error = None # read() içindeki hata; psycopg2 bunu genel bir COPY hatasına çevirir
+
+    def readable(self):
+        return True
+
+    def _encode_next_chunk(self):
+        for chunk in self._frames:
+            if chunk.empty:
+                continue
+            text = chunk.to_csv(index=False, header=False, quoting=csv.QUOTE_ALL, lineterminator="\n")
+            self._buffer = text.encode('utf-8')
+            self._buffer_pos = 0
+            self.rows_sent += len(chunk)
+            return True
+        return False
+
+    def read(self, size=-1):
+        try:
+            return self._read(size)
+        except Exception as e:
+            self.error = e
+            raise
+
+    def _read(self, size):
+        if size is None or size < 0:
+            parts = [self._buffer[self._buffer_pos:]]
+            while self._encode_next_chunk():
+                parts.append(self._buffer)
+            self._buffer, self._buffer_pos = b"", 0
+            data = b"".join(parts)
+            self.bytes_sent += len(data)
+            return data
+        while self._buffer_pos >= len(self._buffer):
+            if not self._encode_next_chunk():
+                return b""
+        data = self._buffer[self._buffer_pos:self._buffer_pos + size]
+        self._buffer_pos += len(data)
+        self.bytes_sent += len(data)
+        return data
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def iter_frame_slices(dataframe, chunk_rows=COPY_CHUNK_ROWS):
+    """Bellekteki bir DataFrame'i chunk_rows satırlık dilimler halinde üretir."""
+    chunk_rows = max(int(chunk_rows), 1)
+    for start in range(0, len(dataframe), chunk_rows):
+        yield dataframe.iloc[start:start + chunk_rows]
+
+
+def copy_frames(cur, qualified_table_name, quoted_cols, frames, force_null_cols=()):
+    """
+    DataFrame parçalarını geçici dosya kullanmadan COPY FROM STDIN ile tabloya yükler.
+    force_null_cols'taki sütunlarda boş değerler ('""') boş metin yerine NULL olarak yüklenir.
+    (gönderilen satır, gönderilen bayt) döndürür.
+    """
+    stream = FrameCopyStream(frames)
+    force_null = f", FORCE_NULL ({', '.join(force_null_cols)})" if force_null_cols else ""
+    copy_sql = (f"COPY {qualified_table_name} ({', '.join(quoted_cols)}) "
+                f"FROM STDIN WITH (FORMAT CSV, HEADER FALSE, ENCODING 'UTF8'{force_null})")
+    try:
+        cur.copy_expert(sql=copy_sql, file=stream)
+    except Exception:
+        if stream.error is not None:
+            raise stream.error # Asıl hata (ör. UnicodeDecodeError) çağırana iletilir
+        raise
+    return stream.rows_sent, stream.bytes_sent
+
+
+def copy_dataframe(cur, qualified_table_name, quoted_cols, dataframe, chunk_rows=COPY_CHUNK_ROWS):
+    """Bellekteki bir DataFrame'i parça parça kodlayarak COPY ile yükler. Gönderilen bayt sayısını döndürür."""
+    _, sent_bytes = copy_frames(cur, qualified_table_name, quoted_cols, iter_frame_slices(dataframe, chunk_rows))
+    return sent_bytes
+
+
+# --- İlerleme Bildirimi ---
+def format_duration(seconds):
+    seconds = int(max(seconds, 0))
+    if seconds >= 3600:
+        return f"{seconds // 3600} sa {seconds % 3600 // 60} dk"
+    if seconds >= 60:
+        return f"{seconds // 60} dk {seconds % 60} sn"
+    return f"{seconds} sn"
+
+
+class CopyProgress:
+    """
+    Okunan satır ve bayt sayısını izler; en fazla interval_s saniyede bir status_callback'e
+    satır, MB, hız ve tahmini kalan süre (ETA) bilgisini gönderir.
+    """
+
+    def __init__(self, status_callback, label, total_bytes, source=None, interval_s=PROGRESS_INTERVAL_S):
+        self.status_callback = status_callback
+        self.label = label
+        self.total_bytes = total_bytes
+        self.source = source  # tell() ile okunan bayt konumu alınabilen kaynak dosya
+        self.interval_s = interval_s
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def bytes_read(self):
+        if self.source is not None:
+            try:
+                return min(self.source.tell(), self.total_bytes)
+            except (OSError, ValueError):
+                pass
+        return 0
+
+    def update(self, rows):
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval_s:
+            self._last_report = now
+            self.status_callback(self.format())
+
+    def format(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        done = self.bytes_read()
+        text = f"    {self.label}: {self.rows:,} satır"
+        if self.total_bytes and done:
+            rate = done / elapsed
+            text += (f", {done / 1e6:.1f}/{self.total_bytes / 1e6:.1f} MB (%{100 * done / self.total_bytes:.0f}), "
+                     f"{rate / 1e6:.1f} MB/sn, kalan ~{format_duration((self.total_bytes - done) / rate)}")
+        return text
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+# --- Tipli Tablo Oluşturma ---
+def resolve_column_types(sample, safe_cols, infer_types, text_columns):
+    """
+    Sütun tiplerini örnekten tahmin eder. text_columns'taki sütunlar TEXT'e zorlanır;
+    text_columns None ise veya tahmin kapalıysa bütün sütunlar TEXT olur.
+    """
+    if not infer_types or text_columns is None:
+        return ['TEXT'] * len(safe_cols)
+    inferred = type_inference.infer_column_types(sample)
+    return ['TEXT' if col in text_columns else col_type for col, col_type in zip(safe_cols, inferred)]
+
+
+def create_typed_table(cur, qualified_table_name, quoted_cols, column_types, unlogged=False):
+    """Tabloyu verilen tiplerle yeniden oluşturur; COPY'de boş değerleri NULL'a çevrilecek sütunları döndürür."""
+    cur.execute(f"DROP TABLE IF EXISTS {qualified_table_name} CASCADE;") # CASCADE eklendi
+    columns_sql = ', '.join(f'{c} {t}' for c, t in zip(quoted_cols, column_types))
+    cur.execute(f"CREATE {'UNLOGGED ' if unlogged else ''}TABLE {qualified_table_name} ({columns_sql});")
+    return [c for c, t in zip(quoted_cols, column_types) if t != 'TEXT']
+
+
+def failed_copy_column(error):
+    """COPY veri hatasının bağlamından ('COPY t, line 5, column x: ...') hatalı sütunun adını çıkarır."""
+    context = getattr(getattr(error, 'diag', None), 'context', None) or ""
+    match = re.search(r'(?:column|sütun) (\w+)', context)
+    return match.group(1) if match else None
+
+
+def load_with_type_fallback(conn, load, status_callback, label):
+    """
+    load(text_columns) çağrısını, tahmin edilen tipe uymayan değer yüzünden COPY başarısız olursa
+    işlemi geri alıp yeniden dener. Hatalı sütun belirlenebiliyorsa yalnızca o sütun TEXT'e düşürülür;
+    belirlenemiyorsa veya TYPE_FALLBACK_RETRIES aşılırsa bütün sütunlar TEXT olarak yüklenir.
+    """
+    text_columns = set()
+    for attempt in itertools.count():
+        try:
+            return load(text_columns)
+        except psycopg2.DataError as e:
+            conn.rollback()
+            if text_columns is None:
+                raise
+            reason = str(e).strip().splitlines()[0]
+            column = failed_copy_column(e)
+            if column is None or column in text_columns or attempt >= TYPE_FALLBACK_RETRIES:
+                text_columns = None
+                status_callback(f"    UYARI: {label} tahmin edilen tiplerle yüklenemedi ({reason}); "
+                                f"tüm sütunlar TEXT olarak yeniden yükleniyor.")
+            else:
+                text_columns = text_columns | {column}
+                status_callback(f"    UYARI: {label}: '{column}' sütunu tahmin edilen tipe uymuyor ({reason}); "
+                                f"TEXT olarak yeniden yükleniyor.")
+
+
+def format_column_types(column_types):
+    typed = [f"{c}:{t.lower()}" for c, t in column_types.items() if t != 'TEXT']
+    return ", ".join(typed) if typed else "tüm sütunlar text"
+
+
+def load_frames_into_table(cur, qualified_table_name, safe_cols, column_types, frames, progress, geometry=None,
+                           load_mode='replace', upsert_key=()):
+    """
+    Parçaları (sütunları safe_cols olarak adlandırılmış) COPY ile tabloya yükler.
+    load_mode='replace': tablo silinip tahmin edilen tiplerle yeniden oluşturulur.
+    load_mode='upsert' : tablo korunur; parçalar geçici tabloya yüklenip upsert_key üzerinden
+                         birleştirilir (merge_staged_rows).
+    load_mode='swap'   : yeni tablo UNLOGGED olarak başka adla kurulup yüklenir, indeksleri veriden
+                         sonra kurulur ve eskisinin yerine geçirilir (swap_in_table). Okuyucular yükleme
+                         boyunca eski tabloyu görür.
+    geometry (import_geometry.GeometryPlan) verilirse her parçaya 'geom' sütunu eklenir, yeni kurulan
+    tabloda yüklemeden sonra GiST indeksi kurulur; tablo ANALYZE edilir. Hepsi çağıranın açık
+    işlemi içinde yapılır. Satır, bayt, sütun tipleri ve (upsert/swap'ta) birleştirme/takas özetini döndürür.
+    """
+    table_cols = geometry.output_columns(safe_cols) if geometry else list(safe_cols)
+    table_types = column_types + [geometry.column_type] if geometry else list(column_types)
+    quoted_cols = [f'"{col}"' for col in table_cols]
+
+    def copy_chunks():
+        for chunk in frames:
+            yield geometry.apply(chunk) if geometry else chunk
+            progress.update(len(chunk))
+
+    merge = swap = None
+    if load_mode == 'upsert':
+        missing = [key for key in upsert_key if key not in table_cols]
+        if missing:
+            raise ValueError(f"Anahtar sütun(lar) kaynakta bulunamadı: {', '.join(missing)}")
+        existing_types = table_column_types(cur, qualified_table_name)
+        created = not existing_types
+        if created:
+            create_typed_table(cur, qualified_table_name, quoted_cols, table_types)
+            existing_types = dict(zip(table_cols, table_types))
+        added = add_missing_columns(cur, qualified_table_name, table_cols, table_types, existing_types)
+        ensure_unique_key(cur, qualified_table_name, upsert_key)
+        # Hedef tablodaki tipler esastır; geçici tablo onun kopyası olarak kurulur
+        cur.execute(f"CREATE TEMP TABLE {UPSERT_STAGING_TABLE} (LIKE {qualified_table_name} INCLUDING DEFAULTS) "
+                    f"ON COMMIT DROP;")
+        table_types = [existing_types[col] for col in table_cols]
+        force_null_cols = [q for q, t in zip(quoted_cols, table_types) if not is_text_type(t)]
+        rows, sent_bytes = copy_frames(cur, UPSERT_STAGING_TABLE, quoted_cols, copy_chunks(), force_null_cols)
+        merge = merge_staged_rows(cur, qualified_table_name, table_cols, upsert_key, rows)
+        merge['added_columns'] = added
+    elif load_mode == 'swap':
+        shadow_table = swap_table_name(qualified_table_name)
+        force_null_cols = create_typed_table(cur, shadow_table, quoted_cols, table_types, unlogged=True)
+        rows, sent_bytes = copy_frames(cur, shadow_table, quoted_cols, copy_chunks(), force_null_cols)
+        # Veri yazıldıktan sonra tablo tek geçişte WAL'a alınır; indeksler satır satır değil, toplu kurulur
+        cur.execute(f"ALTER TABLE {shadow_table} SET LOGGED;")
+        indexes = copy_table_indexes(cur, qualified_table_name, shadow_table)
+        if geometry and not has_index_on(cur, shadow_table, import_geometry.GEOMETRY_COLUMN):
+            # Geçici adla kurulur ve diğer indekslerle birlikte takasta asıl adına çevrilir
+            _, table = split_table_name(qualified_table_name)
+            index_name = f"{table}_{import_geometry.GEOMETRY_COLUMN}_idx"[:63]
+            temp_name = _suffixed(index_name)
+            import_geometry.finalize_geometry_table(cur, shadow_table, index_name=temp_name)
+            indexes.append((temp_name, index_name))
+        else:
+            cur.execute(f"ANALYZE {shadow_table};")
+        swap = swap_in_table(cur, qualified_table_name, shadow_table, indexes)
+    else:
+        created = True
+        force_null_cols = create_typed_table(cur, qualified_table_name, quoted_cols, table_types)
+        rows, sent_bytes = copy_frames(cur, qualified_table_name, quoted_cols, copy_chunks(), force_null_cols)
+
+    if load_mode == 'swap':
+        pass # İndeks ve ANALYZE takastan önce yeni tabloda yapıldı
+    elif geometry and created:
+        import_geometry.finalize_geometry_table(cur, qualified_table_name)
+    else:
+        cur.execute(f"ANALYZE {qualified_table_name};")
+    return {'rows': rows, 'sent_bytes': sent_bytes, 'column_types': dict(zip(table_cols, table_types)),
+            'merge': merge, 'swap': swap}
+
+
+# --- Artımlı (Upsert) Yükleme ---
+_TEXT_TYPES = ('text', 'character varying', 'character')
+
+
+def is_text_type(type_name):
+    return type_name.lower().split('(')[0].strip() in _TEXT_TYPES
+
+
+def table_column_types(cur, qualified_table_name):
+    """Var olan tablonun {sütun: tip} sözlüğünü döndürür; tablo yoksa boş sözlük."""
+    cur.execute("""
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped
+        ORDER BY a.attnum""", (qualified_table_name,))
+    return dict(cur.fetchall())
+
+
+def add_missing_columns(cur, qualified_table_name, table_cols, table_types, existing_types):
+    """Kaynakta olup hedefte olmayan sütunları ekler (varsayılan değersiz ADD COLUMN tabloyu yeniden yazmaz)."""
+    added = []
+    for col, col_type in zip(table_cols, table_types):
+        if col not in existing_types:
+            cur.execute(f'ALTER TABLE {qualified_table_name} ADD COLUMN "{col}" {col_type};')
+            existing_types[col] = col_type
+            added.append(col)
+    return added
+
+
+def ensure_unique_key(cur, qualified_table_name, upsert_key):
+    """
+    ON CONFLICT için anahtar sütunlarda tekil bir indeks yoksa oluşturur. Hedef tabloda anahtarı
+    tekrarlanan satırlar varsa indeks kurulamaz; artımlı mod örnek değerlerle açık bir hata verir.
+    """
+    cur.execute("""
+        SELECT 1 FROM pg_index i
+        WHERE i.indrelid = to_regclass(%s) AND i.indisunique AND i.indpred IS NULL AND i.indexprs IS NULL
+          AND (SELECT array_agg(a.attname::text ORDER BY a.attname::text)
+               FROM pg_attribute a
+               WHERE a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)) = %s::text[]""",
+                (qualified_table_name, sorted(upsert_key)))
+    if cur.fetchone() is None:
+        key_sql = ', '.join(f'"{key}"' for key in upsert_key)
+        # Anahtarı boş satırlar birleştirmede atlanır ve tekil indeksi bozmaz; yalnızca dolu anahtarlar sayılır
+        key_present = ' AND '.join(f'"{key}" IS NOT NULL' for key in upsert_key)
+        cur.execute(f"""
+            SELECT {key_sql}, count(*) OVER () AS duplicate_keys, count(*) AS duplicate_rows
+            FROM {qualified_table_name} WHERE {key_present}
+            GROUP BY {key_sql} HAVING count(*) > 1 ORDER BY count(*) DESC LIMIT {DUPLICATE_KEY_SAMPLES};""")
+        duplicates = cur.fetchall()
+        if duplicates:
+            samples = ', '.join(f"({', '.join(map(str, row[:-2]))}) x{row[-1]}" for row in duplicates)
+            raise ValueError(f"Artımlı mod kullanılamaz: {qualified_table_name} tablosunda anahtar "
+                             f"({', '.join(upsert_key)}) tekil değil; {duplicates[0][-2]} değer birden çok "
+                             f"satırda geçiyor (ör. {samples}). Başka bir anahtar seçin veya tabloyu "
+                             f"'{LOAD_MODES['replace']}' moduyla yeniden yükleyin.")
+        cur.execute(f"CREATE UNIQUE INDEX ON {qualified_table_name} ({key_sql});")
+
+
+def merge_staged_rows(cur, qualified_table_name, table_cols, upsert_key, staged_rows):
+    """
+    Geçici tablodaki satırları INSERT ... ON CONFLICT ile hedefe birleştirir. Yalnızca değeri gerçekten
+    değişen satırlar güncellenir (IS DISTINCT FROM), böylece değişmeyen satırlar ölü kayıt üretmez.
+    Aynı anahtar birden çok kez geçiyorsa son satır kazanır; anahtarı boş satırlar atlanır.
+    """
+    quoted_cols = [f'"{col}"' for col in table_cols]
+    quoted_keys = [f'"{key}"' for key in upsert_key]
+    key_sql = ', '.join(quoted_keys)
+    cols_sql = ', '.join(quoted_cols)
+    non_key = [q for q in quoted_cols if q not in quoted_keys]
+    if non_key:
+        changed = (f"({', '.join(f't.{c}' for c in non_key)}) IS DISTINCT FROM "
+                   f"({', '.join(f'EXCLUDED.{c}' for c in non_key)})")
+        on_conflict = f"DO UPDATE SET {', '.join(f'{c} = EXCLUDED.{c}' for c in non_key)} WHERE {changed}"
+    else:
+        on_conflict = "DO NOTHING"
+    key_present = ' AND '.join(f'{k} IS NOT NULL' for k in quoted_keys)
+
+    cur.execute(f"SELECT count(*) FROM {UPSERT_STAGING_TABLE} WHERE NOT ({key_present});")
+    null_keys = cur.fetchone()[0]
+    cur.execute(f"""
+        WITH merged AS (
+            INSERT INTO {qualified_table_name} AS t ({cols_sql})
+            SELECT DISTINCT ON ({key_sql}) {cols_sql} FROM {UPSERT_STAGING_TABLE}
+            WHERE {key_present}
+            ORDER BY {key_sql}, ctid DESC
+            ON CONFLICT ({key_sql}) {on_conflict}
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged;""")
+    inserted, updated = cur.fetchone()
+    return {'key': list(upsert_key), 'inserted': inserted, 'updated': updated, 'null_keys': null_keys,
+            'unchanged': staged_rows - null_keys - inserted - updated}
+
+
+# --- Takas (Swap) Yükleme ---
+_QUALIFIED_NAME_RE = re.compile(r'^"?([^".]+)"?\."?([^".]+)"?$')
+
+
+def split_table_name(qualified_table_name):
+    """'"şema"."tablo"' biçimindeki adı (şema, tablo) olarak ayırır."""
+    match = _QUALIFIED_NAME_RE.match(qualified_table_name)
+    if match is None:
+        raise ValueError(f"Tablo adı şema.tablo biçiminde değil: {qualified_table_name}")
+    return match.group(1), match.group(2)
+
+
+def _suffixed(name, suffix=SWAP_TABLE_SUFFIX):
+    return name[:63 - len(suffix)] + suffix
+
+
+def swap_table_name(qualified_table_name):
+    schema, table = split_table_name(qualified_table_name)
+    return f'"{schema}"."{_suffixed(table)}"'
+
+
+def has_index_on(cur, qualified_table_name, column):
+    cur.execute("""
+        SELECT 1 FROM pg_index i JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = to_regclass(%s) AND a.attname = %s""", (qualified_table_name, column))
+    return cur.fetchone() is not None
+
+
+_INDEX_DEF_RE = re.compile(r'^(CREATE (?:UNIQUE )?INDEX) \S+ ON (?:ONLY )?\S+ ')
+
+
+def copy_table_indexes(cur, qualified_table_name, shadow_table):
+    """
+    Eski tablonun indekslerini (kullanıcının eklediği indeksler dahil) yüklenmiş yeni tabloda geçici adlarla
+    yeniden kurar. Yeni tabloya uymayan indeksler (ör. kaldırılmış sütun) atlanır.
+    Kurulan indekslerin (geçici ad, asıl ad) listesini döndürür; asıl adlar takasta geri verilir.
+    """
+    cur.execute("""
+        SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = to_regclass(%s) ORDER BY c.relname""", (qualified_table_name,))
+    indexes = []
+    for index_name, index_def in cur.fetchall():
+        temp_name = _suffixed(index_name)
+        cur.execute("SAVEPOINT copy_index;")
+        try:
+            cur.execute(_INDEX_DEF_RE.sub(lambda m: f'{m.group(1)} "{temp_name}" ON {shadow_table} ', index_def))
+        except psycopg2.Error:
+            cur.execute("ROLLBACK TO SAVEPOINT copy_index;")
+            continue
+        cur.execute("RELEASE SAVEPOINT copy_index;")
+        indexes.append((temp_name, index_name))
+    return indexes
+
+
+def dependent_views(cur, qualified_table_name):
+    """
+    Tabloya doğrudan veya başka görünümler üzerinden bağlı (materialized dahil) görünümleri bulur.
+    (tür, '"şema"."ad"', tanım) listesini, yeniden oluşturma sırasında (önce tabloya en yakın olanlar) döndürür.
+    """
+    cur.execute("""
+        WITH RECURSIVE deps(oid, depth) AS (
+            SELECT r.ev_class, 1 FROM pg_depend d JOIN pg_rewrite r ON r.oid = d.objid
+            WHERE d.classid = 'pg_rewrite'::regclass AND d.refclassid = 'pg_class'::regclass
+              AND d.refobjid = to_regclass(%s) AND r.ev_class <> d.refobjid
+            UNION ALL
+            SELECT r.ev_class, deps.depth + 1 FROM deps
+            JOIN pg_depend d ON d.refobjid = deps.oid AND d.classid = 'pg_rewrite'::regclass
+                AND d.refclassid = 'pg_class'::regclass
+            JOIN pg_rewrite r ON r.oid = d.objid
+            WHERE r.ev_class <> deps.oid
+        )
+        SELECT c.relkind, n.nspname, c.relname, pg_get_viewdef(c.oid), max(deps.depth) AS depth
+        FROM deps JOIN pg_class c ON c.oid = deps.oid JOIN pg_namespace n ON n.oid = c.relnamespace
+        GROUP BY c.oid, c.relkind, n.nspname, c.relname ORDER BY depth, n.nspname, c.relname""",
+                (qualified_table_name,))
+    return [('MATERIALIZED VIEW' if relkind == 'm' else 'VIEW', f'"{schema}"."{name}"', definition)
+            for relkind, schema, name, definition, _ in cur.fetchall()]
+
+
+def swap_in_table(cur, qualified_table_name, shadow_table, indexes):
+    """
+    Eski tabloyu siler ve yeni tabloyla indekslerini asıl adlarına çevirir. Yalnızca katalog işlemleridir;
+    eski tablonun kilidi bu noktadan çağıranın commit'ine kadar (milisaniyeler) tutulur ve okuyucular
+    ya eski ya yeni tabloyu görür. Kilit, uzun süren bir okuyucu yüzünden SWAP_LOCK_TIMEOUT_MS içinde
+    alınamazsa (yeni okuyucular kuyrukta bekletilmeden) kısa aralarla yeniden denenir.
+    Tabloya bağlı görünümler aynı işlemde silinip yeni tablo üzerinde aynı tanımla yeniden oluşturulur
+    (görünümlere verilmiş yetkiler ve yorumlar taşınmaz). Başka bağımlılıklar (ör. yabancı anahtarlar)
+    varsa tablo silinmez; takas açık bir hatayla durur ve eski tablo yerinde kalır.
+    """
+    schema, table = split_table_name(qualified_table_name)
+    views = dependent_views(cur, qualified_table_name)
+    for attempt in range(1, SWAP_LOCK_RETRIES + 1):
+        cur.execute("SAVEPOINT table_swap;")
+        cur.execute(f"SET LOCAL lock_timeout = {SWAP_LOCK_TIMEOUT_MS};")
+        try:
+            start = time.perf_counter()
+            for kind, view_name, _ in reversed(views):
+                cur.execute(f"DROP {kind} {view_name};")
+            cur.execute(f"DROP TABLE IF EXISTS {qualified_table_name};")
+            break
+        except psycopg2.errors.LockNotAvailable:
+            cur.execute("ROLLBACK TO SAVEPOINT table_swap;")
+            if attempt == SWAP_LOCK_RETRIES:
+                raise
+            time.sleep(0.5 * attempt)
+        except psycopg2.errors.DependentObjectsStillExist as e:
+            detail = (e.diag.message_detail or "").strip()
+            raise ValueError(f"Takas yapılamadı: {qualified_table_name} tablosuna bağlı, görünüm olmayan "
+                             f"nesneler var. Eski tablo korundu.\n{detail}") from e
+    cur.execute(f'ALTER TABLE {shadow_table} RENAME TO "{table}";')
+    for temp_name, index_name in indexes:
+        cur.execute(f'ALTER INDEX "{schema}"."{temp_name}" RENAME TO "{index_name}";')
+    for kind, view_name, definition in views:
+        try:
+            cur.execute(f"CREATE {kind} {view_name} AS {definition}")
+        except psycopg2.Error as e:
+            raise ValueError(f"Takas yapılamadı: bağlı görünüm {view_name} yeni tabloyla yeniden oluşturulamadı "
+                             f"(ör. kullandığı bir sütun kaldırılmış). Eski tablo korundu.\n{str(e).strip()}") from e
+    cur.execute("RELEASE SAVEPOINT table_swap;")
+    return {'indexes': [index_name for _, index_name in indexes], 'views': [name for _, name, _ in views],
+            'attempts': attempt, 'lock_ms': 1000 * (time.perf_counter() - start)}
+
+
+def describe_geometry(geometry):
+    if geometry is None:
+        return None
+    return {'source': geometry.describe(), 'srid': geometry.srid, 'built': geometry.built, 'empty': geometry.empty}
+
+
+def log_table_details(status_callback, loaded):
+    status_callback(f"    Sütun tipleri: {format_column_types(loaded['column_types'])}")
+    geometry = loaded.get('geometry')
+    if geometry:
+        empty = f", {geometry['empty']} boş/geçersiz (NULL)" if geometry['empty'] else ""
+        status_callback(f"    Geometri: {geometry['source']}; {geometry['built']} obje{empty}. "
+                        f"GiST indeksi ve ANALYZE tamamlandı.")
+    merge = loaded.get('merge')
+    if merge:
+        null_keys = f", anahtarı boş {merge['null_keys']} satır atlandı" if merge['null_keys'] else ""
+        added = f", eklenen sütunlar: {', '.join(merge['added_columns'])}" if merge['added_columns'] else ""
+        status_callback(f"    Birleştirme (anahtar: {', '.join(merge['key'])}): {merge['inserted']} yeni, "
+                        f"{merge['updated']} güncellenen, {merge['unchanged']} değişmeyen/yinelenen satır"
+                        f"{null_keys}{added}.")
+    swap = loaded.get('swap')
+    if swap:
+        indexes = f"yeniden kurulan indeksler: {', '.join(swap['indexes'])}" if swap['indexes'] else "eski indeks yok"
+        status_callback(f"    Takas: yeni tablo {swap['lock_ms']:.0f} ms kilitle devreye alındı ({indexes}).")
+        if swap.get('views'):
+            status_callback(f"    Takas: bağlı görünümler yeniden oluşturuldu: {', '.join(swap['views'])}")
+
+
+def _load_chunks(cur, qualified_table_name, safe_cols, first, rest, progress, text_columns, infer_types=True,
+                 build_geometry=True, srid=import_geometry.DEFAULT_SRID, load_mode='replace', upsert_key=()):
+    """İlk parçadan tipleri ve geometri kaynağını belirler, tüm parçaları load_frames_into_table ile yükler."""
+    column_types = resolve_column_types(first, safe_cols, infer_types, text_columns)
+    geometry = import_geometry.plan_geometry(first, safe_cols, srid) if build_geometry else None
+    loaded = load_frames_into_table(cur, qualified_table_name, safe_cols, column_types, itertools.chain([first], rest),
+                                    progress, geometry, load_mode, upsert_key)
+    loaded['geometry'] = describe_geometry(geometry)
+    return loaded
+
+
+# --- Parça Parça (Streaming) CSV Aktarımı ---
+def _load_csv_file(conn, csv_path, qualified_table_name, encoding, status_callback, chunk_rows, text_columns=(),
+                   **table_options):
+    total_bytes = os.path.getsize(csv_path)
+    label = os.path.basename(csv_path)
+    with open(csv_path, 'rb') as raw, conn.cursor() as cur:
+        # Tüm değerler metin olarak okunur: parçalar arasında pandas'ın tip çıkarımı farklılaşmaz
+        # ve kaynaktaki yazım (ör. '007', '1' yerine '1.0' olmaması) korunur. Sütun tipleri
+        # ilk parçadan tahmin edilir ve dönüşümü PostgreSQL COPY sırasında yapar.
+        reader = pd.read_csv(raw, encoding=encoding, dtype=str, chunksize=chunk_rows)
+        first = next(reader, None)
+        if first is None or first.empty:
+            return None
+
+        safe_cols = safe_column_names(first.columns.tolist())
+        first.columns = safe_cols
+        progress = CopyProgress(status_callback, label, total_bytes, source=raw)
+        rest = (chunk.set_axis(safe_cols, axis=1) for chunk in reader)
+        loaded = _load_chunks(cur, qualified_table_name, safe_cols, first, rest, progress, text_columns,
+                              **table_options)
+    conn.commit()
+    loaded.update({'bytes': total_bytes, 'seconds': progress.elapsed(), 'encoding': encoding})
+    return loaded
+
+
+def import_csv_file(conn, csv_path, qualified_table_name, status_callback, chunk_rows=CSV_CHUNK_ROWS,
+                    infer_types=True, build_geometry=True, srid=import_geometry.DEFAULT_SRID, load_mode='replace',
+                    upsert_key=()):
+    """
+    Bir CSV dosyasını, tamamını belleğe almadan chunk_rows satırlık parçalarla okuyup COPY ile yükler.
+    Bellek kullanımı dosya boyutundan bağımsız olarak bir parçayla sınırlıdır.
+    infer_types=True ise sütun tipleri ilk parçadan tahmin edilir; tahmine uymayan değerler çıkarsa
+    ilgili sütun TEXT'e düşürülerek yeniden yüklenir (load_with_type_fallback).
+    build_geometry=True ise lat/lon, x/y veya WKT sütunlarından srid ile 'geom' sütunu üretilir.
+    load_mode='upsert' ise tablo silinmez, satırlar upsert_key üzerinden birleştirilir; load_mode='swap'
+    ise yeni tablo başka adla yüklenip eskisinin yerine geçirilir.
+    Dosya UTF-8 olarak çözülemezse (hata dosyanın ortasında çıksa bile) işlem geri alınır ve
+    'latin1' ile baştan denenir. Dosya boşsa None, aksi halde satır/bayt/süre özetini döndürür.
+    """
+    csv_file_base = os.path.splitext(os.path.basename(csv_path))[0]
+    label = f"{csv_file_base}.csv"
+    table_options = dict(infer_types=infer_types, build_geometry=build_geometry, srid=srid, load_mode=load_mode,
+                         upsert_key=upsert_key)
+
+    def load(encoding):
+        return load_with_type_fallback(
+            conn, lambda text_columns: _load_csv_file(conn, csv_path, qualified_table_name, encoding, status_callback,
+                                                      chunk_rows, text_columns, **table_options),
+            status_callback, label)
+
+    try:
+        return load('utf-8')
+    except UnicodeDecodeError:
+        conn.rollback()
+        status_callback(f"  UYARI: {label} UTF-8 ile okunamadı, 'latin1' ile deneniyor.")
+        return load('latin1')
+
+
+# --- Dosya Bazında Aktarım (Seri ve Paralel Yolların Ortak Gövdesi) ---
+def _new_file_result(path, kind):
+    return {'file': path, 'kind': kind, 'ok': True, 'skipped': False, 'tables': [], 'errors': [], 'seconds': 0.0}
+
+
+def _check_manifest(conn, path, safe_schema_name, result, status_callback):
+    """Artımlı modda dosya son aktarımdan beri değişmediyse result'u atlandı olarak işaretler. İmzayı döndürür."""
+    unchanged, signature = import_manifest.check_file(conn, safe_schema_name, path)
+    if unchanged:
+        result['skipped'] = True
+        status_callback(f"  Değişmemiş (boyut/mtime/SHA-256 aynı), atlanıyor: {os.path.basename(path)}")
+    return signature
+
+
+def _record_manifest(conn, path, safe_schema_name, result, signature, status_callback):
+    if not result['ok'] or not result['tables']:
+        return
+    try:
+        import_manifest.record_import(conn, safe_schema_name, path, result['kind'], signature,
+                                      [t['table'] for t in result['tables']], sum(t['rows'] for t in result['tables']))
+    except Exception as e:
+        conn.rollback()
+        status_callback(f"  UYARI: {os.path.basename(path)} manifeste yazılamadı (bir sonraki aktarımda yeniden okunacak): {e}")
+
+
+def import_csv_path(conn, csv_path, safe_schema_name, status_callback, chunk_rows=CSV_CHUNK_ROWS, infer_types=True,
+                    build_geometry=True, srid=import_geometry.DEFAULT_SRID, load_mode='replace', upsert_key=()):
+    """
+    Tek bir CSV dosyasını şemaya aktarır; tablo ve hata bilgilerini içeren dosya özetini döndürür.
+    load_mode='upsert' ise son aktarımdan beri değişmemiş dosyalar manifeste bakılarak atlanır.
+    """
+    started = time.perf_counter()
+    result = _new_file_result(csv_path, 'csv')
+    csv_file_base = os.path.splitext(os.path.basename(csv_path))[0]
+    table_name = sanitize_db_identifier(csv_file_base)
+    qualified_table_name = f'"{safe_schema_name}"."{table_name}"'
+    try:
+        signature = None
+        if load_mode == 'upsert':
+            signature = _check_manifest(conn, csv_path, safe_schema_name, result, status_callback)
+            if result['skipped']:
+                return result
+        # YENİ: Dosya tamamen belleğe alınmaz; parça parça okunup COPY'ye aktarılır
+        loaded = import_csv_file(conn, csv_path, qualified_table_name, status_callback, chunk_rows=chunk_rows,
+                                 infer_types=infer_types, build_geometry=build_geometry, srid=srid,
+                                 load_mode=load_mode, upsert_key=upsert_key)
+        if loaded is None:
+            status_callback(f"  UYARI: {csv_file_base}.csv dosyası boş, atlanıyor.")
+            result['ok'] = False
+        else:
+            result['tables'].append({'table': qualified_table_name, 'rows': loaded['rows'],
+                                     'bytes': loaded['bytes'], 'seconds': loaded['seconds'],
+                                     'column_types': loaded['column_types'], 'geometry': loaded['geometry'],
+                                     'merge': loaded['merge'], 'swap': loaded['swap']})
+            status_callback(f"  '{qualified_table_name}' başarıyla aktarıldı ({loaded['rows']} satır, "
+                            f"{loaded['bytes'] / 1e6:.1f} MB, {loaded['seconds']:.1f} sn).")
+            log_table_details(status_callback, loaded)
+            if signature is not None:
+                _record_manifest(conn, csv_path, safe_schema_name, result, signature, status_callback)
+    except Exception as e:
+        conn.rollback()
+        status_callback(f"  HATA ({qualified_table_name}): {e}")
+        result['ok'] = False
+        result['errors'].append(f"{qualified_table_name}: {e}")
+    finally:
+        result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def iter_row_frames(columns, rows, chunk_rows=EXCEL_CHUNK_ROWS):
+    """Satır tuple'larını chunk_rows satırlık küçük DataFrame'ler halinde üretir; tüm sayfa bellekte tutulmaz."""
+    chunk_rows = max(int(chunk_rows), 1)
+    while True:
+        batch = list(itertools.islice(rows, chunk_rows))
+        if not batch:
+            return
+        # object dtype: boş hücre içeren tam sayı sütunları float'a ('1.0') dönüşmez
+        yield pd.DataFrame(batch, columns=columns, dtype=object)
+
+
+def _load_excel_sheet(conn, reader, sheet_name, qualified_table_name, status_callback, chunk_rows, text_columns=(),
+                      **table_options):
+    """Bir sayfayı satır satır okuyup COPY ile yükler. Sayfa boşsa None, aksi halde özet döndürür."""
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        header, rows = excel_readers.sheet_header_and_rows(reader.iter_rows(sheet_name))
+        safe_cols = safe_column_names(header) if header else []
+        first = next(iter_row_frames(safe_cols, rows, chunk_rows), None) if header else None
+        if first is None:
+            return None
+
+        # YENİ: Sayfa tek bir DataFrame'e okunmaz; satırlar parça parça doğrudan COPY'ye akar
+        progress = CopyProgress(status_callback, f"'{sheet_name}'", 0)
+        loaded = _load_chunks(cur, qualified_table_name, safe_cols, first, iter_row_frames(safe_cols, rows, chunk_rows),
+                              progress, text_columns, **table_options)
+    conn.commit()
+    loaded.update({'bytes': loaded['sent_bytes'], 'seconds': time.perf_counter() - started})
+    return loaded
+
+
+def import_excel_path(conn, xlsx_path, safe_schema_name, status_callback, engine='auto', chunk_rows=EXCEL_CHUNK_ROWS,
+                      infer_types=True, build_geometry=True, srid=import_geometry.DEFAULT_SRID, load_mode='replace',
+                      upsert_key=()):
+    """
+    Bir Excel dosyasının her sayfasını ayrı bir tabloya aktarır; dosya özetini döndürür.
+    Sayfalar excel_readers üzerinden satır satır okunur ve chunk_rows'luk parçalarla doğrudan
+    COPY'ye aktarılır; engine 'auto' ise kurulu en hızlı okuma motoru seçilir.
+    infer_types=True ise sütun tipleri sayfanın ilk parçasından tahmin edilir; build_geometry=True ise
+    koordinat/WKT sütunlarından srid ile 'geom' sütunu üretilir. load_mode='upsert' ise sayfalar
+    upsert_key üzerinden birleştirilir ve değişmemiş dosyalar manifeste bakılarak atlanır; load_mode='swap'
+    ise her sayfanın tablosu kesintisiz takasla yenilenir.
+    """
+    started = time.perf_counter()
+    result = _new_file_result(xlsx_path, 'excel')
+    excel_file_base = os.path.splitext(os.path.basename(xlsx_path))[0]
+    table_options = dict(infer_types=infer_types, build_geometry=build_geometry, srid=srid, load_mode=load_mode,
+                         upsert_key=upsert_key)
+    signature = None
+    if load_mode == 'upsert':
+        try:
+            signature = _check_manifest(conn, xlsx_path, safe_schema_name, result, status_callback)
+        except Exception as e:
+            conn.rollback()
+            status_callback(f"  HATA: {excel_file_base}.xlsx manifesti denetlenemedi: {e}")
+            result['ok'] = False
+            result['errors'].append(f"{excel_file_base}.xlsx: {e}")
+            return result
+        if result['skipped']:
+            return result
+    try:
+        reader = excel_readers.open_excel_reader(xlsx_path, engine)
+        sheet_names = reader.sheet_names()
+    except Exception as e:
+        status_callback(f"  HATA: {excel_file_base}.xlsx okunamadı/açılamadı: {e}")
+        result['ok'] = False
+        result['errors'].append(f"{excel_file_base}.xlsx: {e}")
+        return result
+    result['engine'] = reader.name
+    if not sheet_names:
+        status_callback(f"  UYARI: {excel_file_base}.xlsx içinde sayfa bulunamadı, atlanıyor.")
+        reader.close()
+        return result
+
+    try:
+        for sheet_name in sheet_names:
+            safe_excel_base = sanitize_db_identifier(excel_file_base)
+            safe_sheet_name = sanitize_db_identifier(sheet_name)
+            table_name = f"{safe_excel_base}_{safe_sheet_name}"
+            table_name = sanitize_db_identifier(table_name)
+            qualified_table_name = f'"{safe_schema_name}"."{table_name}"'
+            status_callback(f"  Sayfa: '{sheet_name}' -> Tablo: {qualified_table_name} (motor: {reader.name})")
+
+            try:
+                loaded = load_with_type_fallback(
+                    conn, lambda text_columns: _load_excel_sheet(conn, reader, sheet_name, qualified_table_name,
+                                                                 status_callback, chunk_rows, text_columns,
+                                                                 **table_options),
+                    status_callback, f"'{sheet_name}'")
+                if loaded is None:
+                    status_callback(f"    UYARI: '{sheet_name}' sayfası boş, atlanıyor.")
+                    continue
+                result['tables'].append({'table': qualified_table_name, **loaded})
+                status_callback(f"    '{qualified_table_name}' başarıyla aktarıldı ({loaded['rows']} satır, "
+                                f"{loaded['bytes'] / 1e6:.1f} MB, {loaded['seconds']:.1f} sn).")
+                log_table_details(status_callback, loaded)
+            except Exception as e:
+                conn.rollback()
+                status_callback(f"    HATA ({qualified_table_name}): {e}")
+                result['ok'] = False
+                result['errors'].append(f"{qualified_table_name}: {e}")
+    finally:
+        reader.close()
+    if signature is not None:
+        _record_manifest(conn, xlsx_path, safe_schema_name, result, signature, status_callback)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+FILE_IMPORTERS = {'csv': import_csv_path, 'excel': import_excel_path}
+
+
+# --- Paralel Çoklu Dosya Aktarımı ---
+# Her dosya bir süreç havuzu işçisinde okunur ve o işçinin kendi bağlantısıyla yüklenir;
+# Excel ayrıştırma gibi GIL'i tutan CPU yoğun okuma işleri böylece gerçekten paralel çalışır.
+_worker_messages = None
+
+
+def _init_import_worker(message_queue):
+    global _worker_messages
+    _worker_messages = message_queue
+
+
+def _import_file_task(kind, path, db_config, safe_schema_name, options):
+    """Süreç havuzu işçisinde çalışır. Mesajlar ve en sonda dosya özeti, sırayla mesaj kuyruğuna yazılır."""
+    def report(message):
+        _worker_messages.put((path, message))
+
+    try:
+        # Havuz işçi sürecine özeldir; bağlantılar süreçler arasında paylaşılamaz
+        with db_pool.get_pool(db_config, max_size=1).connection() as conn:
+            result = FILE_IMPORTERS[kind](conn, path, safe_schema_name, report, **options)
+    except Exception as e:
+        report(f"  HATA: {e}")
+        result = _new_file_result(path, kind)
+        result['ok'] = False
+        result['errors'].append(str(e))
+    _worker_messages.put((path, result)) # Dosyanın son mesajı: özet
+    return result
+
+
+def import_files_parallel(db_config, safe_schema_name, paths, kind, status_callback, workers, **options):
+    """
+    Dosyaları workers adet süreçte paralel aktarır (her süreç kendi veritabanı bağlantısını kullanır).
+    İşçilerden gelen mesajlar tek bir aktarım thread'i üzerinden status_callback'e iletilir; bir dosyanın
+    mesajları kendi içinde sıralı kalır ve '[dosya]' önekiyle işaretlenir. Dosya özetleri listesini döndürür.
+    """
+    import multiprocessing
+    import threading
+    from concurrent.futures import ProcessPoolExecutor
+
+    ctx = multiprocessing.get_context('spawn') # Tk/thread'ler içeren ana süreçten fork güvenli değil
+    message_queue = ctx.Queue()
+    results = {}
+    total = len(paths)
+
+    def relay_messages():
+        while len(results) < total:
+            path, message = message_queue.get()
+            label = os.path.basename(path)
+            if isinstance(message, dict):
+                results[path] = message
+                state = "atlandı (değişmemiş)" if message['skipped'] else "tamamlandı" if message['ok'] else "hatalı"
+                rows = sum(t['rows'] for t in message['tables'])
+                status_callback(f"[{label}] {state} ({len(results)}/{total}): {len(message['tables'])} tablo, "
+                                f"{rows} satır, {message['seconds']:.1f} sn.")
+            else:
+                status_callback(f"[{label}] {message.strip()}")
+
+    relay = threading.Thread(target=relay_messages, daemon=True)
+    relay.start()
+    status_callback(f"Paralel aktarım: {total} dosya, {workers} işçi süreç.")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_import_worker, initargs=(message_queue,)) as executor:
+        futures = {executor.submit(_import_file_task, kind, path, db_config, safe_schema_name, options): path
+                   for path in paths}
+        for future, path in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                # İşçi süreç çöktüyse özet mesajı hiç gelmez; yerine hata özeti konur
+                failed = _new_file_result(path, kind)
+                failed['ok'] = False
+                failed['errors'].append(f"İşçi süreç hatası: {e}")
+                message_queue.put((path, failed))
+    relay.join()
+    return [results[path] for path in paths]
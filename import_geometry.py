@@ -0,0 +1,187 @@
+import re
+import numpy as np
+import pandas as pd
+
+# --- Aktarım Sırasında Geometri Oluşturma ---
+# İlk parçadan koordinat (lat/lon, x/y) veya WKT/WKB sütunları bulunur; her parçada geometri
+# istemcide hex EWKB olarak üretilip COPY'ye 'geom' sütunu olarak eklenir. Böylece yüklemeden
+# sonra tabloyu baştan yazan ALTER TABLE ... ADD COLUMN + UPDATE geçişlerine gerek kalmaz.
+# Çözülemeyen değerler COPY'yi durdurmaz, geometrisi NULL olarak yüklenir.
+DEFAULT_SRID = 4326
+GEOMETRY_COLUMN = 'geom'             # PostGISApp sorgularında beklenen geometri sütunu
+GEOMETRY_MIN_VALID_RATIO = 0.9       # Örnekteki dolu değerlerin en az bu oranı geçerliyse sütun kaynak kabul edilir
+GEOMETRY_SAMPLE_VALUES = 500
+
+# (x sütunu adları, y sütunu adları, coğrafi mi); ilk eşleşen çift kullanılır
+COORDINATE_COLUMN_PAIRS = [
+    (('lon', 'lng', 'long', 'longitude', 'boylam'), ('lat', 'latitude', 'enlem'), True),
+    (('x', 'x_coord', 'xcoord', 'koord_x', 'easting'), ('y', 'y_coord', 'ycoord', 'koord_y', 'northing'), False),
+]
+WKT_COLUMN_NAMES = ('wkt', 'geom', 'geometry', 'the_geom', 'shape', 'geom_wkt', 'wkt_geom')
+
+_EWKT_SRID_RE = re.compile(r'^\s*SRID=(\d+);', re.IGNORECASE)
+_WKT_RE = re.compile(r'^\s*(SRID=\d+;\s*)?(MULTI)?(POINT|LINESTRING|POLYGON|GEOMETRYCOLLECTION)\s*(Z|M|ZM)?\s*(\(|EMPTY)',
+                     re.IGNORECASE)
+_HEX_WKB_RE = re.compile(r'^(00|01)[0-9A-Fa-f]{16,}$')
+
+
+def _sample_values(series):
+    values = series.dropna()
+    values = values[values.astype(str).str.strip() != ""]
+    return values.iloc[:GEOMETRY_SAMPLE_VALUES]
+
+
+def _valid_ratio(mask):
+    return mask.mean() if len(mask) else 0.0
+
+
+def _numeric(series):
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+
+
+def _coordinate_mask(x, y, geographic):
+    mask = np.isfinite(x) & np.isfinite(y)
+    if geographic:
+        mask &= (np.abs(x) <= 180) & (np.abs(y) <= 90)
+    return mask
+
+
+class GeometryPlan:
+    """
+    Bir tablonun geometrisinin hangi sütunlardan ve nasıl üretileceğini tutar.
+    kind: 'point' (x/y sütunları), 'wkt' veya 'wkb' (tek sütun).
+    """
+
+    def __init__(self, kind, columns, srid, geographic=False):
+        self.kind = kind
+        self.columns = columns
+        self.srid = int(srid)
+        self.geographic = geographic
+        self.source_rename = None  # Kaynak sütunun adı 'geom' ise tabloda bu adla metin olarak tutulur
+        self.built = 0
+        self.empty = 0
+
+    @property
+    def column_type(self):
+        geometry_type = 'Point' if self.kind == 'point' else 'Geometry'
+        return f"geometry({geometry_type}, {self.srid})"
+
+    def describe(self):
+        source = ", ".join(self.columns)
+        names = {'point': 'koordinat', 'wkt': 'WKT', 'wkb': 'WKB'}
+        return f"{names[self.kind]} ({source}) -> {GEOMETRY_COLUMN} {self.column_type}"
+
+    def output_columns(self, safe_cols):
+        """Tablonun sütun adları: kaynak sütunlar (gerekirse yeniden adlandırılmış) + 'geom'."""
+        renamed = [self.source_rename if self.source_rename and col == GEOMETRY_COLUMN else col for col in safe_cols]
+        return renamed + [GEOMETRY_COLUMN]
+
+    def geometries(self, chunk):
+        """Parçanın geometrilerini shapely dizisi olarak üretir; çözülemeyen değerler None olur."""
+        import shapely
+        if self.kind == 'point':
+            x = _numeric(chunk[self.columns[0]])
+            y = _numeric(chunk[self.columns[1]])
+            valid = _coordinate_mask(x, y, self.geographic)
+            geoms = np.full(len(chunk), None, dtype=object)
+            geoms[valid] = shapely.points(x[valid], y[valid])
+            return geoms
+        values = chunk[self.columns[0]].astype('string').str.strip()
+        if self.kind == 'wkt':
+            values = values.str.replace(_EWKT_SRID_RE, '', regex=True)
+            return shapely.from_wkt(values.to_numpy(dtype=object, na_value=None), on_invalid='ignore')
+        return shapely.from_wkb(values.to_numpy(dtype=object, na_value=None), on_invalid='ignore')
+
+    def apply(self, chunk):
+        """Parçaya hex EWKB 'geom' sütununu ekler; sütun adları output_columns ile aynı sırada olur."""
+        import shapely
+        geoms = shapely.set_srid(self.geometries(chunk), self.srid)
+        hex_ewkb = shapely.to_wkb(geoms, hex=True, include_srid=True)
+        empty = int(pd.isna(hex_ewkb).sum())
+        self.built += len(chunk) - empty
+        self.empty += empty
+        out = chunk.copy(deep=False)
+        out.columns = range(chunk.shape[1])
+        out[chunk.shape[1]] = hex_ewkb
+        return out
+
+
+def _embedded_srid(plan, values):
+    """Örnekteki geçerli EWKT/EWKB değerlerinin hepsi aynı SRID'yi taşıyorsa onu döndürür."""
+    if plan.kind == 'wkt':
+        wkt_values = [str(v) for v in values if _WKT_RE.match(str(v))]
+        srids = {int(m.group(1)) if m else 0 for m in (_EWKT_SRID_RE.match(v) for v in wkt_values)}
+    else:
+        import shapely
+        geoms = shapely.from_wkb(np.asarray(values.astype(str), dtype=object), on_invalid='ignore')
+        srids = set(shapely.get_srid(geoms[pd.notna(geoms)]).tolist())
+    return srids.pop() if len(srids) == 1 and 0 not in srids else None
+
+
+def _find_text_geometry(sample, safe_cols):
+    named = [col for col in safe_cols if col in WKT_COLUMN_NAMES]
+    for col in named + [col for col in safe_cols if col not in named]:
+        values = _sample_values(sample[col])
+        if values.empty or not all(isinstance(v, str) for v in values.iloc[:20]):
+            continue
+        text = values.astype(str).str.strip()
+        if _valid_ratio(text.str.match(_WKT_RE)) >= GEOMETRY_MIN_VALID_RATIO:
+            return 'wkt', col, values
+        if _valid_ratio(text.str.match(_HEX_WKB_RE)) >= GEOMETRY_MIN_VALID_RATIO:
+            return 'wkb', col, values
+    return None
+
+
+def _find_coordinates(sample, safe_cols):
+    present = set(safe_cols)
+    for x_names, y_names, geographic in COORDINATE_COLUMN_PAIRS:
+        x_col = next((name for name in x_names if name in present), None)
+        y_col = next((name for name in y_names if name in present), None)
+        if x_col is None or y_col is None:
+            continue
+        both = sample[[x_col, y_col]].dropna()
+        if both.empty:
+            continue
+        mask = _coordinate_mask(_numeric(both[x_col]), _numeric(both[y_col]), geographic)
+        if _valid_ratio(mask) >= GEOMETRY_MIN_VALID_RATIO:
+            return x_col, y_col, geographic
+    return None
+
+
+def plan_geometry(sample, safe_cols, srid=DEFAULT_SRID):
+    """
+    İlk parçadan (sütunları safe_cols olarak adlandırılmış) geometri kaynağını bulur.
+    Öncelik WKT/WKB sütunlarındadır, yoksa lat/lon ve x/y çiftlerine bakılır. EWKT/EWKB değerleri
+    kendi SRID'lerini taşıyorsa o SRID, aksi halde srid kullanılır. Kaynak yoksa None döndürür.
+    """
+    sample = sample.set_axis(safe_cols, axis=1)
+    found = _find_text_geometry(sample, safe_cols)
+    if found is not None:
+        kind, col, values = found
+        plan = GeometryPlan(kind, [col], srid)
+        plan.srid = _embedded_srid(plan, values) or plan.srid
+    else:
+        coords = _find_coordinates(sample, safe_cols)
+        if coords is None:
+            return None
+        x_col, y_col, geographic = coords
+        plan = GeometryPlan('point', [x_col, y_col], srid, geographic)
+
+    if GEOMETRY_COLUMN in safe_cols:
+        if plan.columns != [GEOMETRY_COLUMN]:
+            return None # Kaynakta geometri olmayan bir 'geom' sütunu var; üzerine yazılmaz
+        rename, counter = f"{GEOMETRY_COLUMN}_src", 1
+        while rename in safe_cols:
+            rename, counter = f"{GEOMETRY_COLUMN}_src_{counter}", counter + 1
+        plan.source_rename = rename
+    return plan
+
+
+def finalize_geometry_table(cur, qualified_table_name, index_name=None):
+    """
+    Yüklemeden sonra GiST indeksini kurar ve istatistikleri günceller (geometry_columns'ta hemen görünür).
+    index_name verilmezse indeks adını PostgreSQL seçer.
+    """
+    name_sql = f'"{index_name}" ' if index_name else ''
+    cur.execute(f'CREATE INDEX {name_sql}ON {qualified_table_name} USING GIST ("{GEOMETRY_COLUMN}");')
+    cur.execute(f"ANALYZE {qualified_table_name};")
@@ -0,0 +1,100 @@
+import hashlib
+import os
+
+# --- Artımlı Aktarım Bildirimi (Manifest) ---
+# Her şemada, aktarılan dosyaların boyutu, değişiklik zamanı ve SHA-256 özeti tutulur.
+# Artımlı modda boyutu ve mtime'ı değişmemiş dosyalar okunmadan atlanır; mtime değişmiş ama
+# boyutu aynı olan dosyaların yalnızca özeti hesaplanır. Tablo veritabanında tutulduğundan
+# paralel işçiler ve sonraki aktarımlar aynı bilgiyi görür. Kayıtlar dosyanın mutlak yoluyla
+# tutulur; farklı klasörlerdeki aynı adlı dosyalar birbirinin yerine geçmez.
+MANIFEST_TABLE = '_import_manifest'
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
+
+def manifest_table(safe_schema_name):
+    return f'"{safe_schema_name}"."{MANIFEST_TABLE}"'
+
+
+def ensure_manifest(conn, safe_schema_name):
+    """Manifest tablosunu yoksa oluşturur (paralel işçiler başlamadan önce bir kez çağrılır)."""
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {manifest_table(safe_schema_name)} (
+                source_file TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                size_bytes BIGINT NOT NULL,
+                mtime DOUBLE PRECISION NOT NULL,
+                sha256 TEXT NOT NULL,
+                tables TEXT[] NOT NULL,
+                row_count BIGINT NOT NULL,
+                imported_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );""")
+    conn.commit()
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_key(path):
+    """Manifestte dosyayı tanımlayan anahtar: normalleştirilmiş mutlak yol."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': None}
+
+
+def check_file(conn, safe_schema_name, path):
+    """
+    Dosyanın son aktarımdan beri değişip değişmediğini denetler.
+    (değişmedi mi, imza) döndürür; imza record_import'a aynen verilir. Manifestteki tablolardan
+    biri silinmişse dosya değişmiş sayılır.
+    """
+    signature = file_signature(path)
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT size_bytes, mtime, sha256, tables FROM {manifest_table(safe_schema_name)} "
+                    f"WHERE source_file = %s", (source_key(path),))
+        row = cur.fetchone()
+        if row is None:
+            return False, signature
+        size, mtime, sha256, tables = row
+        cur.execute("SELECT count(*) FROM unnest(%s::text[]) AS t(name) WHERE to_regclass(t.name) IS NULL", (tables,))
+        missing_tables = cur.fetchone()[0]
+    conn.rollback()
+    if missing_tables or size != signature['size']:
+        return False, signature
+    if mtime == signature['mtime']:
+        signature['sha256'] = sha256
+        return True, signature
+    signature['sha256'] = file_checksum(path)
+    if signature['sha256'] != sha256:
+        return False, signature
+    # İçerik aynı, yalnızca mtime değişmiş (ör. dosya yeniden kopyalanmış): bir sonraki denetim özetsiz geçsin
+    with conn.cursor() as cur:
+        cur.execute(f"UPDATE {manifest_table(safe_schema_name)} SET mtime = %s WHERE source_file = %s",
+                    (signature['mtime'], source_key(path)))
+    conn.commit()
+    return True, signature
+
+
+def record_import(conn, safe_schema_name, path, kind, signature, tables, row_count):
+    """Başarılı aktarımı manifeste yazar; özet henüz hesaplanmadıysa burada hesaplanır."""
+    sha256 = signature['sha256'] or file_checksum(path)
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            INSERT INTO {manifest_table(safe_schema_name)}
+                (source_file, kind, size_bytes, mtime, sha256, tables, row_count, imported_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, now())
+            ON CONFLICT (source_file) DO UPDATE SET
+                kind = EXCLUDED.kind, size_bytes = EXCLUDED.size_bytes, mtime = EXCLUDED.mtime,
+                sha256 = EXCLUDED.sha256, tables = EXCLUDED.tables, row_count = EXCLUDED.row_count,
+                imported_at = EXCLUDED.imported_at;""",
+                    (source_key(path), kind, signature['size'], signature['mtime'], sha256,
+                     list(tables), int(row_count)))
+    conn.commit()
@@ -0,0 +1,51 @@
+import importlib
+import threading
+import time
+
+# --- Gecikmeli (Lazy) Modül Yükleme ---
+# Ağır modüller (pandas, geopandas, içe aktarma aracı) pencere açılmadan önce yüklenmez; ilk
+# kullanımda veya pencere gösterildikten sonra arka plandaki ısınma thread'inde yüklenir.
+# Python'un modül başına içe aktarma kilidi sayesinde ana thread ile ısınma thread'i aynı modülü
+# aynı anda isterse modül bir kez yüklenir, ikinci thread yüklemenin bitmesini bekler.
+
+
+class LazyModule:
+    """Modülü ilk öznitelik erişiminde içe aktaran vekil (ör. pd = LazyModule('pandas'); pd.DataFrame())."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "yüklendi" if self._module is not None else "yüklenmedi"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def warm_up(module_names, on_done=None):
+    """
+    Modülleri arka plan thread'inde sırayla içe aktarır; bitince on_done(süre_sn, hatalar) çağrılır
+    (çağrı ısınma thread'inden yapılır, Tk'ye root.after ile aktarılmalıdır). Yüklenemeyen modüller
+    uygulamayı durdurmaz; hata, modül ilk kullanıldığında normal yolla yeniden ortaya çıkar.
+    """
+    def _worker():
+        started = time.perf_counter()
+        errors = {}
+        for name in module_names:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                errors[name] = str(e)
+        if on_done is not None:
+            on_done(time.perf_counter() - started, errors)
+
+    thread = threading.Thread(target=_worker, daemon=True, name="module-warm-up")
+    thread.start()
+    return thread
@@ -0,0 +1,159 @@
+import itertools
+import re
+import threading
+import time
+
+import map_render
+
+# --- Sorgu Katmanları ---
+# Her katman kendi sorgusunu, stilini ve görünürlüğünü taşır. Katmanlar arka planda, bir thread
+# havuzunda birbirine paralel çekilir (sunucu tarafı imleçle, parça parça). Her parça gelir gelmez
+# çizim parçalarına ayrılıp Web Mercator'a projekte edilir (map_render.RasterLayer); öznitelikler ve
+# geometri nesneleri bellekte tutulmaz. Gizleme, sıralama ve stil değişikliği yalnızca katmanın
+# görüntüsünü etkiler, sorgu tekrarlanmaz. Projekte koordinatların boyutu katman başına sınırı
+# aşacaksa çekim durdurulur ve katman o ana kadar gelen objelerle gösterilir.
+LAYER_FETCH_WORKERS = 4       # Aynı anda çekilebilecek katman sayısı (havuzun arka plan payından alınır, bkz. db_pool)
+LAYER_RENDER_WORKERS = 2      # Kaydırma/zoom sonrası katman görüntülerini çizen thread sayısı
+LAYER_MEMORY_LIMIT_MB = 256   # Varsayılan katman başına bellek sınırı
+
+LAYER_COLORS = {
+    "Sarı": (255, 255, 0),
+    "Camgöbeği": (0, 220, 255),
+    "Kırmızı": (255, 60, 60),
+    "Yeşil": (60, 220, 60),
+    "Mor": (190, 90, 255),
+    "Turuncu": (255, 150, 0),
+    "Beyaz": (255, 255, 255),
+}
+LAYER_FILL_ALPHA = 90
+
+_FROM_TABLE_RE = re.compile(r'\bfrom\s+((?:"[^"]+"|\w+)(?:\.(?:"[^"]+"|\w+))?)', re.IGNORECASE)
+
+
+def layer_style(color):
+    """Renk adından RasterLayer.render için stil sözlüğü üretir (yarı saydam dolgu, opak kenar ve nokta)."""
+    r, g, b = LAYER_COLORS.get(color, LAYER_COLORS["Sarı"])
+    return {'fill': (r, g, b, LAYER_FILL_ALPHA), 'outline': (r, g, b, 255), 'point': (r, g, b, 255)}
+
+
+def layer_name_from_sql(sql, fallback):
+    """Katman adı olarak sorgunun ilk FROM tablosunu kullanır; bulunamazsa fallback döner."""
+    match = _FROM_TABLE_RE.search(sql)
+    return match.group(1).replace('"', '') if match else fallback
+
+
+class QueryLayer:
+    """Haritada kendi görüntüsüyle gösterilen bir sorgu sonucu ve çekim durumu."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, sql, name=None, color="Sarı"):
+        self.id = next(QueryLayer._ids)
+        self.sql = sql
+        self.name = name or layer_name_from_sql(sql, f"Katman {self.id}")
+        self.color = color
+        self.visible = True
+        self.generation = 0      # Her çekimde artar; eski (iptal edilmiş) çekimin sonucu atılır
+        self.status = "Bekliyor"
+        self.raster = None
+        self.rows = 0
+        self.truncated = False
+        self.error = None
+        self.fetch_seconds = 0.0
+        self.active_conn = None  # Çekim sürerken kullanılan bağlantı (iptal için)
+        self._lock = threading.Lock()
+
+    @property
+    def tag(self):
+        """Katman görüntüsünün canvas etiketi."""
+        return f"query_layer_{self.id}"
+
+    @property
+    def style(self):
+        return layer_style(self.color)
+
+    @property
+    def memory_bytes(self):
+        raster = self.raster
+        return raster.nbytes if raster is not None else 0
+
+    def start_fetch(self):
+        """Yeni bir çekim başlatır ve neslini döndürür; önceki çekim bu nesli görünce kendini bırakır."""
+        with self._lock:
+            self.generation += 1
+            self.status = "Çekiliyor"
+            self.error = None
+            return self.generation
+
+    def is_current(self, generation):
+        return generation == self.generation
+
+    def set_result(self, generation, raster, rows, truncated, seconds):
+        """Çekim sonucunu katmana yazar; çekim bu arada geçersiz kılındıysa False döner."""
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self.raster = raster
+            self.rows = rows
+            self.truncated = truncated
+            self.fetch_seconds = seconds
+            self.status = "Sınırda kesildi" if truncated else "Hazır"
+            return True
+
+    def set_error(self, generation, error):
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self.error = error
+            self.status = "Hata"
+            return True
+
+    def release(self):
+        """Katmanı kaldırırken verisini bırakır ve süren çekimi geçersiz kılar."""
+        with self._lock:
+            self.generation += 1
+            self.raster = None
+            self.rows = 0
+            self.status = "Kaldırıldı"
+
+    def format_stats(self):
+        text = (f"Katman '{self.name}': {self.rows} obje, {self.memory_bytes / 1e6:.1f} MB, "
+                f"çekim {self.fetch_seconds:.2f} sn")
+        if self.truncated:
+            text += " (bellek sınırında kesildi)"
+        return text
+
+
+def fetch_layer(conn, sql, memory_limit_bytes, is_cancelled=lambda: False):
+    """
+    Worker thread'de çalışır. Sorguyu sunucu tarafı imleçle parça parça çeker; her parça hemen
+    RasterLayer'a çevrilir. Projekte koordinatlar memory_limit_bytes'ı aşacaksa çekim o parçada durur.
+    (RasterLayer, obje sayısı, kesildi mi) döndürür; çekim iptal edildiyse None döner.
+    """
+    import query_engine # pandas/geopandas ilk katman çekiminde yüklenir (açılışı yavaşlatmaz)
+    rasters, rows, total_bytes, truncated = [], 0, 0, False
+    chunks = query_engine.stream_query_chunks(conn, sql, geom_col='geom')
+    try:
+        for chunk in chunks:
+            if is_cancelled():
+                return None
+            raster = map_render.RasterLayer.from_parts(query_engine.explode_draw_parts(chunk.geometry.values))
+            if total_bytes + raster.nbytes > memory_limit_bytes:
+                truncated = True
+                break
+            rasters.append(raster)
+            rows += len(chunk)
+            total_bytes += raster.nbytes
+    finally:
+        chunks.close()
+    return map_render.RasterLayer.concat(rasters), rows, truncated
+
+
+def render_layer(layer, upper_left, zoom, width, height, tile_size=256):
+    """Worker thread'de çalışır. Katmanı verilen görünüm için kendi stiliyle çizer; (görüntü, süre) döndürür."""
+    raster = layer.raster
+    if raster is None:
+        return None, 0.0
+    start = time.perf_counter()
+    image = raster.render(upper_left, zoom, width, height, tile_size=tile_size, style=layer.style)
+    return image, time.perf_counter() - start
@@ -0,0 +1,439 @@
+import time
+import math
+import numpy as np
+import shapely
+
+# --- Detay Seviyesi (LOD) Ayarları ---
+LOD_PIXEL_TOLERANCE = 0.5     # Sadeleştirme toleransı (ekran pikseli cinsinden)
+LOD_VERTEX_BUDGET = 200000    # Tek bir çizimde haritaya gönderilecek en fazla köşe sayısı
+LOD_MAX_STEPS = 8             # Bütçe aşılırsa toleransın en fazla kaç kez ikiye katlanacağı
+
+
+def tolerance_for_zoom(zoom, tile_size=256, pixel_tolerance=LOD_PIXEL_TOLERANCE):
+    """Verilen zoom seviyesinde pixel_tolerance kadar pikselin derece (lon/lat) karşılığını döndürür."""
+    return pixel_tolerance * 360.0 / (tile_size * (2 ** zoom))
+
+
+def count_vertices(geometries):
+    """Geometri dizisindeki toplam köşe sayısını döndürür (None geometriler 0 sayılır)."""
+    return int(shapely.get_num_coordinates(np.asarray(geometries, dtype=object)).sum())
+
+
+def simplify_to_budget(geometries, zoom, vertex_budget=LOD_VERTEX_BUDGET, start_tolerance=None):
+    """
+    Geometrileri zoom seviyesine uygun toleransla (vektörel, topolojiyi koruyarak) sadeleştirir.
+    Toplam köşe sayısı vertex_budget'ı aşıyorsa tolerans, bütçeye inilene kadar ikiye katlanır.
+    Sadeleştirilmiş geometri dizisi ve istatistik sözlüğü döner.
+    """
+    start_time = time.perf_counter()
+    geoms = np.asarray(geometries, dtype=object)
+    vertices_before = count_vertices(geoms)
+    tolerance = start_tolerance if start_tolerance is not None else tolerance_for_zoom(zoom)
+
+    simplified = shapely.simplify(geoms, tolerance, preserve_topology=True)
+    vertices_after = count_vertices(simplified)
+    steps = 0
+    while vertex_budget and vertices_after > vertex_budget and steps < LOD_MAX_STEPS:
+        tolerance *= 2
+        simplified = shapely.simplify(geoms, tolerance, preserve_topology=True)
+        vertices_after = count_vertices(simplified)
+        steps += 1
+
+    stats = {
+        'zoom': zoom,
+        'tolerance': tolerance,
+        'vertices_before': vertices_before,
+        'vertices_after': vertices_after,
+        'seconds': time.perf_counter() - start_time,
+    }
+    return simplified, stats
+
+
+def merge_lod_stats(total, stats):
+    """Akış modunda parça parça üretilen LOD istatistiklerini tek bir özet altında toplar."""
+    if total is None:
+        return dict(stats)
+    merged = dict(total)
+    merged['zoom'] = stats['zoom']
+    merged['tolerance'] = max(total['tolerance'], stats['tolerance'])
+    merged['vertices_after'] = total['vertices_after'] + stats['vertices_after']
+    merged['seconds'] = total['seconds'] + stats['seconds']
+    if total['vertices_before'] is None or stats['vertices_before'] is None:
+        merged['vertices_before'] = None
+    else:
+        merged['vertices_before'] = total['vertices_before'] + stats['vertices_before']
+    return merged
+
+
+# --- Nokta Kümeleme (Clustering) ---
+CLUSTER_RADIUS_PX = 40   # Bir kümenin ekranda kapladığı ızgara hücresinin kenarı (piksel)
+CLUSTER_MAX_ZOOM = 18    # Bu zoom seviyesinden sonra kümeler daha fazla bölünmez
+MAX_MERCATOR_LAT = 85.0511287798
+
+
+def lonlat_to_unit_mercator(lons, lats):
+    """Lon/lat dizilerini [0, 1] aralığında Web Mercator koordinatlarına (x sağa, y aşağı) çevirir."""
+    lats = np.clip(np.asarray(lats, dtype=float), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    x = (np.asarray(lons, dtype=float) + 180.0) / 360.0
+    lat_rad = np.radians(lats)
+    y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / np.pi) / 2.0
+    return np.clip(x, 0.0, 1.0), np.clip(y, 0.0, 1.0)
+
+
+def unit_mercator_to_lonlat(x, y):
+    """lonlat_to_unit_mercator dönüşümünün tersi."""
+    lons = np.asarray(x, dtype=float) * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * np.asarray(y, dtype=float)))))
+    return lons, lats
+
+
+def point_coordinates(geometries, sources=None):
+    """Geometri dizisindeki boş olmayan Point'lerin lon, lat ve kaynak satır dizilerini döndürür."""
+    geoms = np.asarray(geometries, dtype=object)
+    mask = (shapely.get_type_id(geoms) == 0) & ~shapely.is_empty(geoms)
+    coords = shapely.get_coordinates(geoms[mask])
+    positions = np.flatnonzero(mask) if sources is None else np.asarray(sources)[mask]
+    return coords[:, 0], coords[:, 1], positions
+
+
+def without_points(geometries):
+    """Point geometrileri None ile değiştirilmiş bir kopya döndürür (noktalar kümeleme ile çizilirken)."""
+    geoms = np.array(geometries, dtype=object)
+    geoms[shapely.get_type_id(geoms) == 0] = None
+    return geoms
+
+
+class PointClusterIndex:
+    """
+    Bir nokta sonuç kümesi için bir kez kurulan, zoom seviyesine göre ızgara tabanlı kümeleme indeksi.
+    En ayrıntılı seviyedeki hücre numaraları bir kez hesaplanır; her kaba seviye (zoom - 1),
+    bir alt seviyenin kümelerinden hücre numaraları ikiye bölünerek türetilir ve önbellekte tutulur.
+    """
+
+    def __init__(self, lons, lats, sources, radius_px=CLUSTER_RADIUS_PX, tile_size=256, max_zoom=CLUSTER_MAX_ZOOM):
+        self.x, self.y = lonlat_to_unit_mercator(lons, lats)
+        self.sources = np.asarray(sources)
+        self.max_zoom = max_zoom
+        cell_size = radius_px / (tile_size * 2.0 ** max_zoom)
+        self._cell_x = np.floor(self.x / cell_size).astype(np.int64)
+        self._cell_y = np.floor(self.y / cell_size).astype(np.int64)
+        self._levels = {}
+
+    @classmethod
+    def from_geometries(cls, geometries, sources=None, **kwargs):
+        """Geometri dizisindeki Point'lerden indeks kurar; hiç nokta yoksa None döner."""
+        lons, lats, positions = point_coordinates(geometries, sources)
+        if not len(lons):
+            return None
+        return cls(lons, lats, positions, **kwargs)
+
+    def __len__(self):
+        return len(self.x)
+
+    def _clamp_zoom(self, zoom):
+        return int(min(max(round(zoom), 0), self.max_zoom))
+
+    def _keys_at(self, zoom, cell_x, cell_y):
+        shift = self.max_zoom - zoom
+        return ((cell_x >> shift) << 32) | (cell_y >> shift)
+
+    def _level(self, zoom):
+        zoom = self._clamp_zoom(zoom)
+        if zoom in self._levels:
+            return self._levels[zoom]
+        if zoom == self.max_zoom:
+            cell_x, cell_y = self._cell_x, self._cell_y
+            weights, sum_x, sum_y = np.ones(len(self.x)), self.x, self.y
+        else:
+            child = self._level(zoom + 1)
+            cell_x, cell_y = child['cell_x'] // 2, child['cell_y'] // 2
+            weights, sum_x, sum_y = child['count'], child['sum_x'], child['sum_y']
+
+        keys = (cell_x << 32) | cell_y
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        level = {
+            'keys': unique_keys,
+            'cell_x': unique_keys >> 32,
+            'cell_y': unique_keys & 0xFFFFFFFF,
+            'count': np.bincount(inverse, weights=weights, minlength=len(unique_keys)).astype(np.int64),
+            'sum_x': np.bincount(inverse, weights=sum_x, minlength=len(unique_keys)),
+            'sum_y': np.bincount(inverse, weights=sum_y, minlength=len(unique_keys)),
+        }
+        self._levels[zoom] = level
+        return level
+
+    def clusters(self, zoom, bounds=None, margin=0.1):
+        """
+        Verilen zoom seviyesindeki kümeleri (lon, lat, nokta sayısı, küme anahtarı) dizileri olarak döndürür.
+        bounds (min_lon, min_lat, max_lon, max_lat) verilirse yalnızca görünen alandaki kümeler döner.
+        """
+        level = self._level(zoom)
+        x = level['sum_x'] / level['count']
+        y = level['sum_y'] / level['count']
+        mask = np.ones(len(x), dtype=bool)
+        if bounds is not None:
+            min_lon, min_lat, max_lon, max_lat = bounds
+            (x0, x1), (y1, y0) = lonlat_to_unit_mercator([min_lon, max_lon], [min_lat, max_lat])
+            pad_x, pad_y = (x1 - x0) * margin, (y1 - y0) * margin
+            mask = (x >= x0 - pad_x) & (x <= x1 + pad_x) & (y >= y0 - pad_y) & (y <= y1 + pad_y)
+        lons, lats = unit_mercator_to_lonlat(x[mask], y[mask])
+        return lons, lats, level['count'][mask], level['keys'][mask]
+
+    def members(self, zoom, key):
+        """Verilen kümeye düşen noktaların indeks içindeki konumlarını döndürür."""
+        zoom = self._clamp_zoom(zoom)
+        return np.flatnonzero(self._keys_at(zoom, self._cell_x, self._cell_y) == key)
+
+    def expansion_zoom(self, zoom, key):
+        """Kümenin ilk kez birden fazla parçaya bölündüğü zoom seviyesini döndürür (tıklayınca açmak için)."""
+        members = self.members(zoom, key)
+        cell_x, cell_y = self._cell_x[members], self._cell_y[members]
+        for next_zoom in range(self._clamp_zoom(zoom) + 1, self.max_zoom + 1):
+            if len(np.unique(self._keys_at(next_zoom, cell_x, cell_y))) > 1:
+                return next_zoom
+        return self.max_zoom
+
+
+# --- Raster Katman (Tek Görüntüye Çizim) ---
+RASTER_AUTO_THRESHOLD = 20000            # 'Otomatik' modda bu sayıdan fazla obje raster olarak çizilir
+RASTER_POLYGON_FILL = (255, 255, 0, 90)
+RASTER_OUTLINE = (255, 255, 0, 255)
+RASTER_POINT = (255, 165, 0, 255)
+RASTER_POINT_RADIUS = 3
+RASTER_DEFAULT_STYLE = {'fill': RASTER_POLYGON_FILL, 'outline': RASTER_OUTLINE, 'point': RASTER_POINT}
+_KIND_CODES = {'polygon': 0, 'path': 1, 'point': 2}
+
+
+def _disk_offsets(radius):
+    """Verilen yarıçaptaki dolu dairenin piksel ofsetlerini döndürür."""
+    grid = np.arange(-radius, radius + 1)
+    dx, dy = np.meshgrid(grid, grid)
+    inside = dx ** 2 + dy ** 2 <= radius ** 2
+    return dx[inside], dy[inside]
+
+
+def _splat(pixels, px, py, radius, color):
+    """Noktaları, her biri için ayrı çizim çağrısı yapmadan, NumPy ile RGBA diziye damgalar."""
+    height, width = pixels.shape[:2]
+    px = np.round(px).astype(np.int64)
+    py = np.round(py).astype(np.int64)
+    for dx, dy in zip(*_disk_offsets(radius)):
+        x, y = px + dx, py + dy
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        pixels[y[inside], x[inside]] = color
+
+
+class RasterLayer:
+    """
+    Çizim parçalarını (explode_draw_parts çıktısı) tek bir RGBA görüntüye çizen katman.
+    Koordinatlar bir kez Web Mercator birim koordinatlarına projekte edilip saklanır;
+    kaydırma/zoom'da yalnızca ölçek ve öteleme uygulanır. Ekranda 1.5 pikselden küçük kalan
+    parçalar ve noktalar tek tek değil, NumPy ile topluca damgalanır.
+    """
+
+    def __init__(self, kinds, starts, counts, x, y):
+        self.kinds = kinds
+        self.starts = starts
+        self.counts = counts
+        self.x = x
+        self.y = y
+        self._update_bounds()
+
+    @classmethod
+    def from_parts(cls, parts):
+        """explode_draw_parts çıktısından katman kurar; koordinatlar parça sırasına göre sıkıştırılır."""
+        kinds = np.array([_KIND_CODES[kind] for kind in parts.kinds], dtype=np.int8)
+        counts = parts.counts.astype(np.int64)
+        starts = np.cumsum(counts) - counts
+        coord_index = np.repeat(parts.starts.astype(np.int64) - starts, counts) + np.arange(int(counts.sum()))
+        coords = parts.coords[coord_index]
+        x, y = lonlat_to_unit_mercator(coords[:, 0], coords[:, 1])
+        return cls(kinds, starts, counts, x, y)
+
+    @classmethod
+    def concat(cls, layers):
+        """Birden çok katmanı tek seferde birleştirir (parça parça extend'in tekrarlı kopyalamasından kaçınır)."""
+        layers = list(layers)
+        if not layers:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(np.zeros(0, dtype=np.int8), empty, empty, np.zeros(0), np.zeros(0))
+        offsets = np.cumsum([0] + [len(layer.x) for layer in layers[:-1]])
+        merged = cls.__new__(cls)
+        merged.kinds = np.concatenate([layer.kinds for layer in layers])
+        merged.starts = np.concatenate([layer.starts + offset for layer, offset in zip(layers, offsets)])
+        merged.counts = np.concatenate([layer.counts for layer in layers])
+        merged.x = np.concatenate([layer.x for layer in layers])
+        merged.y = np.concatenate([layer.y for layer in layers])
+        merged.bounds = np.concatenate([layer.bounds for layer in layers])
+        return merged
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @property
+    def nbytes(self):
+        """Katmanın bellekte tuttuğu dizilerin toplam boyutu (bayt)."""
+        return sum(array.nbytes for array in (self.kinds, self.starts, self.counts, self.x, self.y, self.bounds))
+
+    def _update_bounds(self):
+        """Her parçanın Web Mercator kapsamını (min_x, min_y, max_x, max_y) hesaplar (ekran dışı ayıklama için)."""
+        if not len(self.kinds):
+            self.bounds = np.zeros((0, 4))
+            return
+        self.bounds = np.column_stack([
+            np.minimum.reduceat(self.x, self.starts),
+            np.minimum.reduceat(self.y, self.starts),
+            np.maximum.reduceat(self.x, self.starts),
+            np.maximum.reduceat(self.y, self.starts),
+        ])
+
+    def extend(self, other):
+        """Akış modunda gelen yeni parçanın katmanını bu katmana ekler."""
+        offset = len(self.x)
+        self.kinds = np.concatenate([self.kinds, other.kinds])
+        self.starts = np.concatenate([self.starts, other.starts + offset])
+        self.counts = np.concatenate([self.counts, other.counts])
+        self.x = np.concatenate([self.x, other.x])
+        self.y = np.concatenate([self.y, other.y])
+        self.bounds = np.concatenate([self.bounds, other.bounds])
+
+    def render(self, upper_left_tile, zoom, width, height, tile_size=256, style=None):
+        """
+        Katmanı, sol üst köşesi upper_left_tile (zoom seviyesindeki OSM karo koordinatı) olan
+        width x height boyutlu bir görünüm için çizer ve PIL Image (RGBA) döndürür.
+        style ('fill', 'outline', 'point' RGBA renkleri) verilmezse RASTER_DEFAULT_STYLE kullanılır.
+        """
+        from PIL import Image, ImageDraw
+
+        style = RASTER_DEFAULT_STYLE if style is None else style
+        width, height = max(int(width), 1), max(int(height), 1)
+        scale = tile_size * 2.0 ** zoom
+        origin_x, origin_y = upper_left_tile[0] * tile_size, upper_left_tile[1] * tile_size
+        pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        if not len(self.kinds):
+            return Image.fromarray(pixels, 'RGBA')
+
+        px = self.x * scale - origin_x
+        py = self.y * scale - origin_y
+        box = self.bounds * scale - np.array([origin_x, origin_y, origin_x, origin_y])
+        visible = (box[:, 2] >= 0) & (box[:, 0] < width) & (box[:, 3] >= 0) & (box[:, 1] < height)
+        tiny = ((box[:, 2] - box[:, 0]) < 1.5) & ((box[:, 3] - box[:, 1]) < 1.5)
+        points = visible & (self.kinds == _KIND_CODES['point'])
+        specks = visible & tiny & ~points
+
+        _splat(pixels, px[self.starts[specks]], py[self.starts[specks]], 1, style['outline'])
+        image = Image.fromarray(pixels, 'RGBA')
+        draw = ImageDraw.Draw(image, 'RGBA')
+
+        for part in np.flatnonzero(visible & ~tiny & ~points):
+            start, end = self.starts[part], self.starts[part] + self.counts[part]
+            xy = np.column_stack([px[start:end], py[start:end]]).round()
+            keep = np.ones(len(xy), dtype=bool)
+            keep[1:] = np.any(np.diff(xy, axis=0) != 0, axis=1) # Aynı piksele düşen ardışık köşeleri at
+            xy = xy[keep].ravel().tolist()
+            if self.kinds[part] == _KIND_CODES['polygon']:
+                if len(xy) >= 6:
+                    draw.polygon(xy, fill=style['fill'], outline=style['outline'])
+            elif len(xy) >= 4:
+                draw.line(xy, fill=style['outline'], width=2)
+
+        if points.any():
+            point_pixels = np.asarray(image)
+            point_pixels = point_pixels.copy()
+            _splat(point_pixels, px[self.starts[points]], py[self.starts[points]], RASTER_POINT_RADIUS, style['point'])
+            image = Image.fromarray(point_pixels, 'RGBA')
+        return image
+
+
+# --- Kare Bütçeli Çizim Zamanlayıcısı ---
+DRAW_FRAME_BUDGET_MS = 12     # Tk ana döngüsüne her karede çizim için ayrılan süre (milisaniye)
+DRAW_COST_SMOOTHING = 0.2     # Obje başına çizim süresi tahmininde (EWMA) yeni ölçümün ağırlığı
+
+
+def order_parts_by_distance(parts, center):
+    """
+    Çizim parçalarını, ilk köşelerinin harita merkezine (lat, lon) uzaklığına göre sıralayan
+    indeks dizisini döndürür; görünümün ortasındaki objeler önce çizilir.
+    """
+    if len(parts.starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    center_lat, center_lon = center
+    first = parts.coords[parts.starts]
+    dx = (first[:, 0] - center_lon) * np.cos(np.radians(center_lat))
+    dy = first[:, 1] - center_lat
+    return np.argsort(dx * dx + dy * dy, kind='stable')
+
+
+def new_draw_stats():
+    """Kare bütçeli çizim zamanlayıcısının ölçüm sözlüğünü oluşturur."""
+    return {
+        'items': 0,
+        'frames': 0,
+        'overruns': 0,
+        'max_frame_ms': 0.0,
+        'busy_seconds': 0.0,
+        'item_cost': None,   # Obje başına tahmini çizim süresi (saniye, EWMA)
+        'started': time.perf_counter(),
+    }
+
+
+def update_item_cost(stats, seconds):
+    """Obje başına çizim süresi tahminini yeni ölçümle günceller."""
+    cost = stats['item_cost']
+    stats['item_cost'] = seconds if cost is None else cost + DRAW_COST_SMOOTHING * (seconds - cost)
+
+
+# --- Mekânsal İndeks (Görünüm Ayıklama, Tıklama ve Kutu Seçimi) ---
+IDENTIFY_PIXEL_TOLERANCE = 6   # Tıklamanın bir objeye isabet sayılacağı en fazla uzaklık (ekran pikseli)
+CULL_MARGIN = 0.5              # Görünüm ayıklamasında kapsamın her yöne genişletildiği oran (kısa kaydırmada boşluk görünmez)
+
+
+def expand_bounds(bounds, margin):
+    """(min_lon, min_lat, max_lon, max_lat) kapsamını genişliğinin/yüksekliğinin margin katı kadar büyütür."""
+    min_lon, min_lat, max_lon, max_lat = bounds
+    pad_x, pad_y = (max_lon - min_lon) * margin, (max_lat - min_lat) * margin
+    return min_lon - pad_x, min_lat - pad_y, max_lon + pad_x, max_lat + pad_y
+
+
+def identify_tolerance(zoom, lat, tile_size=256, pixel_tolerance=IDENTIFY_PIXEL_TOLERANCE):
+    """Tıklama toleransını derece cinsinden döndürür (Mercator'da enlem derecesi cos(lat) kadar kısalır)."""
+    return tolerance_for_zoom(zoom, tile_size, pixel_tolerance) * math.cos(math.radians(lat))
+
+
+class FeatureIndex:
+    """
+    Bir sonuç kümesinin (tam detaylı) geometrileri üzerinde bir kez kurulan STRtree.
+    Dönen değerler GeoDataFrame'deki satır pozisyonlarıdır; böylece ızgara ve harita aynı
+    pozisyonlar üzerinden eşleşir. Boş ve None geometriler indekse girmez.
+    """
+
+    def __init__(self, geometries):
+        start = time.perf_counter()
+        self.geometries = np.asarray(geometries, dtype=object)
+        self.tree = shapely.STRtree(self.geometries)
+        self.build_seconds = time.perf_counter() - start
+
+    def __len__(self):
+        return len(self.geometries)
+
+    def query_bounds(self, bounds):
+        """Zarfı (bounding box) kapsamla kesişen satırları döndürür; görünüm ayıklaması için yeterlidir."""
+        return np.sort(self.tree.query(shapely.box(*bounds)))
+
+    def select_box(self, bounds):
+        """Geometrisi kapsamla gerçekten kesişen satırları döndürür (kutu seçimi)."""
+        return np.sort(self.tree.query(shapely.box(*bounds), predicate='intersects'))
+
+    def identify(self, lon, lat, tolerance):
+        """
+        Noktaya tolerance (derece) içindeki en yakın objenin satırını, yoksa None döndürür.
+        Noktayı içeren iç içe poligonlarda uzaklıklar eşit (0) olduğundan en küçük alanlı olan seçilir.
+        """
+        hits, distances = self.tree.query_nearest(shapely.Point(lon, lat), max_distance=tolerance,
+                                                  return_distance=True)
+        if not len(hits):
+            return None
+        nearest = hits[distances == distances.min()]
+        if len(nearest) > 1:
+            nearest = nearest[np.argsort(shapely.area(self.geometries[nearest]), kind='stable')]
+        return int(nearest[0])
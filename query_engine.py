@@ -0,0 +1,196 @@
+import uuid
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+# --- Akış (Streaming) Ayarları ---
+STREAM_CHUNK_SIZE = 5000        # Sunucu tarafı imleçten her seferde çekilecek satır sayısı
+STREAM_FIRST_CHUNK_SIZE = 500   # İlk objelerin hızlı görünmesi için ilk parça daha küçük tutulur
+
+
+def strip_trailing_semicolon(sql):
+    """DECLARE ... CURSOR FOR ifadesinin içine gömülebilmesi için sorgu sonundaki ';' karakterlerini temizler."""
+    return sql.strip().rstrip(';').strip()
+
+
+def quote_identifier(name):
+    """Bir kolon adını SQL içinde güvenle kullanılabilecek şekilde çift tırnağa alır."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def set_statement_timeout(conn, seconds):
+    """
+    Açık işlemdeki sonraki ifadeler için sunucu tarafı zaman aşımını (statement_timeout) ayarlar.
+    Süre aşılırsa PostgreSQL ifadeyi kendisi iptal eder ve QueryCanceledError döner. 0 sınırsız demektir.
+    SET LOCAL kullanıldığından ayar işlem bitince (bağlantı havuza iade edilirken) kendiliğinden sıfırlanır.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SET LOCAL statement_timeout = %s", (int(seconds * 1000),))
+
+
+def build_binary_geometry_sql(conn, sql, geom_col='geom', simplify_tolerance=None):
+    """
+    Kullanıcı sorgusunu, geometri kolonu ST_AsBinary ile (bytea/WKB) dönecek şekilde sarar.
+    Kolon listesi, sorgu LIMIT 0 ile çalıştırılarak (veri okumadan) öğrenilir.
+    simplify_tolerance verilirse geometri sunucuda ST_SimplifyPreserveTopology ile sadeleştirilir.
+    """
+    inner_sql = strip_trailing_semicolon(sql)
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT * FROM ({inner_sql}) AS q LIMIT 0")
+        columns = [desc[0] for desc in cur.description]
+    if geom_col not in columns:
+        raise ValueError(f"Sorgu sonucunda '{geom_col}' kolonu bulunamadı.")
+
+    select_list = []
+    for col in columns:
+        quoted = quote_identifier(col)
+        if col == geom_col:
+            geom_expr = f"q.{quoted}"
+            if simplify_tolerance is not None:
+                geom_expr = f"ST_SimplifyPreserveTopology({geom_expr}, {float(simplify_tolerance)!r})"
+            select_list.append(f"ST_AsBinary({geom_expr}) AS {quoted}")
+        else:
+            select_list.append(f"q.{quoted}")
+    return f"SELECT {', '.join(select_list)} FROM ({inner_sql}) AS q"
+
+
+def decode_wkb_column(values):
+    """
+    WKB (bytes/memoryview) veya hex EWKB (str) değerlerinden oluşan kolonu
+    shapely 2.x from_wkb ile tek seferde geometri dizisine çevirir.
+    """
+    wkb_values = np.array([bytes(v) if isinstance(v, memoryview) else v for v in values], dtype=object)
+    return shapely.from_wkb(wkb_values, on_invalid='warn')
+
+
+def rows_to_geodataframe(rows, columns, geom_col='geom', row_offset=0):
+    """
+    İmleçten gelen satırları (tuple listesi) GeoDataFrame'e çevirir.
+    Geometri kolonu (WKB veya hex EWKB) tek seferde, vektörel olarak çözülür.
+    İndeks, akış boyunca obje numaraları kesintisiz olsun diye row_offset'ten başlar.
+    """
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    df.index = pd.RangeIndex(row_offset, row_offset + len(df))
+    if geom_col not in df.columns:
+        raise ValueError(f"Sorgu sonucunda '{geom_col}' kolonu bulunamadı.")
+    df[geom_col] = gpd.GeoSeries(decode_wkb_column(df[geom_col].to_numpy()), index=df.index)
+    return gpd.GeoDataFrame(df, geometry=geom_col)
+
+
+def read_postgis_binary(conn, sql, geom_col='geom', simplify_tolerance=None):
+    """
+    gpd.read_postgis yerine kullanılan hızlı okuma yolu: geometri ST_AsBinary ile
+    WKB olarak istenir ve bütün kolon tek seferde çözülür.
+    """
+    binary_sql = build_binary_geometry_sql(conn, sql, geom_col=geom_col, simplify_tolerance=simplify_tolerance)
+    with conn.cursor() as cur:
+        cur.execute(binary_sql)
+        columns = [desc[0] for desc in cur.description]
+        rows = cur.fetchall()
+    return rows_to_geodataframe(rows, columns, geom_col=geom_col)
+
+
+def stream_query_chunks(conn, sql, geom_col='geom', chunk_size=STREAM_CHUNK_SIZE,
+                        first_chunk_size=STREAM_FIRST_CHUNK_SIZE, binary=True, simplify_tolerance=None):
+    """
+    Sorguyu psycopg2 isimli (sunucu tarafı) imleçle çalıştırır ve sonucu
+    sabit boyutlu GeoDataFrame parçaları halinde üretir (generator).
+    Bellekte aynı anda yalnızca bir parça tutulur.
+    binary=True ise geometri ST_AsBinary ile WKB olarak çekilir.
+    """
+    if binary:
+        sql = build_binary_geometry_sql(conn, sql, geom_col=geom_col, simplify_tolerance=simplify_tolerance)
+    cursor_name = f"geopg_stream_{uuid.uuid4().hex[:12]}"
+    cur = conn.cursor(name=cursor_name)
+    cur.itersize = chunk_size
+    try:
+        cur.execute(strip_trailing_semicolon(sql))
+        row_offset = 0
+        fetch_size = min(first_chunk_size, chunk_size)
+        while True:
+            rows = cur.fetchmany(fetch_size)
+            if not rows:
+                break
+            columns = [desc[0] for desc in cur.description]
+            yield rows_to_geodataframe(rows, columns, geom_col=geom_col, row_offset=row_offset)
+            row_offset += len(rows)
+            fetch_size = chunk_size
+    finally:
+        cur.close()
+
+
+# --- Vektörel Koordinat Çıkarımı ---
+# Her çizilebilir parça için (tür, kaynak satır, koordinat başlangıcı, nokta sayısı) tutulur;
+# koordinatlar tek bir (N, 2) lon/lat dizisinde, ofsetlerle paylaşılır.
+DrawParts = namedtuple('DrawParts', ['kinds', 'sources', 'starts', 'counts', 'coords', 'skipped'])
+
+_POINT_TYPES = (0,)          # Point
+_LINE_TYPES = (1, 5)         # LineString, MultiLineString
+_POLYGON_TYPES = (3, 6)      # Polygon, MultiPolygon
+
+
+def _collect_parts(geoms, positions, kind, min_points):
+    """Belirtilen türdeki geometrileri parçalarına ayırır ve koordinatlarını toplu olarak çıkarır."""
+    parts, part_index = shapely.get_parts(geoms, return_index=True)
+    if kind == 'polygon':
+        parts = shapely.get_exterior_ring(parts)
+    coords, coord_index = shapely.get_coordinates(parts, return_index=True)
+    counts = np.bincount(coord_index, minlength=len(parts))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64) if len(parts) else np.zeros(0, dtype=np.int64)
+    valid = counts >= min_points
+    return positions[part_index][valid], starts[valid], counts[valid], coords, int((~valid).sum())
+
+
+def explode_draw_parts(geometries):
+    """
+    Geometri dizisini haritaya çizilecek parçalara (polygon dış halkası, path, point) ayırır.
+    Satır başına list(geom.exterior.coords) yerine shapely.get_coordinates ve ofset dizileri kullanılır.
+    Parçalar kaynak satır sırasına göre döner; geçersiz parçaların sayısı 'skipped' içinde raporlanır.
+    """
+    geoms = np.asarray(geometries, dtype=object)
+    type_ids = shapely.get_type_id(geoms)
+    drawable = ~shapely.is_empty(geoms)
+    positions = np.arange(len(geoms))
+
+    kinds, sources, starts, counts, coord_blocks = [], [], [], [], []
+    skipped = {}
+    coord_offset = 0
+    for kind, type_group, min_points in (('polygon', _POLYGON_TYPES, 4), ('path', _LINE_TYPES, 2), ('point', _POINT_TYPES, 1)):
+        mask = np.isin(type_ids, type_group) & drawable
+        if not mask.any():
+            continue
+        k_sources, k_starts, k_counts, k_coords, k_skipped = _collect_parts(
+            geoms[mask], positions[mask], kind, min_points)
+        kinds.append(np.full(len(k_sources), kind, dtype=object))
+        sources.append(k_sources)
+        starts.append(k_starts + coord_offset)
+        counts.append(k_counts)
+        coord_blocks.append(k_coords)
+        coord_offset += len(k_coords)
+        if k_skipped:
+            skipped[kind] = k_skipped
+
+    if not kinds:
+        empty = np.zeros(0, dtype=np.int64)
+        return DrawParts(np.zeros(0, dtype=object), empty, empty, empty, np.zeros((0, 2)), skipped)
+
+    sources = np.concatenate(sources)
+    order = np.argsort(sources, kind='stable')
+    return DrawParts(np.concatenate(kinds)[order], sources[order], np.concatenate(starts)[order],
+                     np.concatenate(counts)[order], np.concatenate(coord_blocks), skipped)
+
+
+# --- Görünüm (Viewport) Filtresi ---
+def wrap_viewport_sql(sql, bounds, geom_col='geom', srid=4326):
+    """
+    Kullanıcı sorgusunu, yalnızca harita görünümüyle (min_lon, min_lat, max_lon, max_lat)
+    kesişen objeleri döndürecek şekilde ST_Intersects + ST_MakeEnvelope filtresiyle sarar.
+    """
+    min_lon, min_lat, max_lon, max_lat = bounds
+    min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 180.0)
+    min_lat, max_lat = max(min_lat, -85.06), min(max_lat, 85.06)
+    envelope = f"ST_MakeEnvelope({min_lon:.8f}, {min_lat:.8f}, {max_lon:.8f}, {max_lat:.8f}, {int(srid)})"
+    return (f"SELECT * FROM ({strip_trailing_semicolon(sql)}) AS v "
+            f"WHERE ST_Intersects(v.{quote_identifier(geom_col)}, {envelope})")
@@ -0,0 +1,237 @@
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# --- Sorgu Sonucu Önbelleği (Disk) ---
+# Çözülmüş sonuçlar (öznitelikler + geometri) GeoParquet olarak diske yazılır ve bellek eşlemeli
+# (memory-mapped) okunur; aynı bağlantıda aynı sorgu yeniden çalıştırıldığında sunucuya gidilmeden
+# ve WKB yeniden çözülmeden çizilir. Kayıtlar SQLite dizininde tutulur, toplam boyut
+# RESULT_CACHE_MAX_BYTES'ı aşınca en uzun süredir kullanılmayanlar (LRU) silinir.
+# İsteğe bağlı doğrulama: kayıtla birlikte sorgunun okuduğu tabloların değişiklik imzası
+# (pg_stat_user_tables sayaçları + relfilenode) saklanır, imza değiştiyse kayıt geçersiz sayılır.
+RESULT_CACHE_DIR = os.environ.get('GEOPG_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.geopg_cache', 'results')
+RESULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+RESULT_CACHE_MAX_ENTRY_RATIO = 0.25   # Tek bir sonuç önbelleğin en fazla bu kadarını kaplayabilir
+
+# Tırnaklı metin, tırnaklı ad ve $etiket$ metinleri olduğu gibi kalır; yorumlar ve boşluklar tek boşluğa iner
+_SQL_TOKEN_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|\$((?:[A-Za-z_]\w*)?)\$.*?\$\2\$)"""
+                           r"""|(?:\s|--[^\n]*|/\*.*?\*/)+""", re.DOTALL)
+
+
+def cache_available():
+    """GeoParquet yazmak için pyarrow gerekir; kurulu değilse önbellek kapalı kalır."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def normalize_sql(sql):
+    """
+    Önbellek anahtarı için: yorumları (-- ve /* */) atar, boşlukları tek boşluğa indirir ve sondaki ';'
+    karakterlerini atar; tırnak içindeki metne dokunmaz. Çıktı veritabanına gönderilmez.
+    """
+    return _SQL_TOKEN_RE.sub(lambda m: m.group(1) or ' ', sql).strip().rstrip(';').strip()
+
+
+def connection_identity(db_params):
+    return f"{db_params.get('user')}@{db_params.get('host')}:{db_params.get('port')}/{db_params.get('dbname')}"
+
+
+def cache_key(db_params, sql, **variant):
+    """Bağlantı kimliği + normalleştirilmiş sorgu + sonucu değiştiren seçenekler (ör. sadeleştirme toleransı)."""
+    payload = json.dumps([connection_identity(db_params), normalize_sql(sql), variant], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# --- Tablo Değişiklik İmzaları ---
+def _plan_relations(plan, found):
+    if 'Relation Name' in plan:
+        found.add(f'"{plan.get("Schema", "public")}"."{plan["Relation Name"]}"')
+    for child in plan.get('Plans', ()):
+        _plan_relations(child, found)
+    return found
+
+
+def _in_savepoint(conn, work):
+    """work(cur)'u savepoint içinde çalıştırır; hata olursa yalnızca bu kısım geri alınır ve None döner."""
+    with conn.cursor() as cur:
+        cur.execute("SAVEPOINT result_cache;")
+        try:
+            result = work(cur)
+        except Exception:
+            cur.execute("ROLLBACK TO SAVEPOINT result_cache;")
+            return None
+        cur.execute("RELEASE SAVEPOINT result_cache;")
+        return result
+
+
+def query_tables(conn, sql):
+    """Sorgunun okuduğu tabloları EXPLAIN planından (görünümler açılmış haliyle) bulur; sorgu çalıştırılmaz."""
+    def work(cur):
+        cur.execute(f"EXPLAIN (VERBOSE, FORMAT JSON) {sql}") # Kullanıcının metni aynen (çalıştırılanla aynı plan)
+        plan = cur.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return sorted(_plan_relations(plan[0]['Plan'], set()))
+    return _in_savepoint(conn, work)
+
+
+def table_signatures(conn, tables):
+    """
+    Tabloların değişiklik imzası: oid, relfilenode (TRUNCATE/VACUUM FULL/takas ile değişir) ve
+    ekleme/güncelleme/silme sayaçları. Sayaçlar istatistik sistemine işlem bitiminden kısa süre
+    sonra yansır; bu aralıkta yapılan değişiklik bir sonraki denetimde yakalanır.
+    """
+    def work(cur):
+        cur.execute("""
+            SELECT t.name, c.oid::bigint, c.relfilenode::bigint,
+                   s.n_tup_ins, s.n_tup_upd, s.n_tup_del
+            FROM unnest(%s::text[]) AS t(name)
+            LEFT JOIN pg_class c ON c.oid = to_regclass(t.name)
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid""", (list(tables),))
+        return {name: list(values) for name, *values in cur.fetchall()}
+    return _in_savepoint(conn, work)
+
+
+def snapshot_tables(conn, sql):
+    """
+    Sorgu çalıştırılmadan hemen önce okunan tabloları ve imzalarını döndürür; bulunamazsa (None, None).
+    Planında hiç tablo olmayan sorgular (ör. SELECT * FROM fonksiyon()) da doğrulanamaz sayılır:
+    boş imza hiçbir değişiklikte geçersiz olmazdı.
+    """
+    tables = query_tables(conn, sql)
+    if not tables:
+        return None, None
+    signatures = table_signatures(conn, tables)
+    return (tables, signatures) if signatures is not None else (None, None)
+
+
+def _write_parquet(gdf, path):
+    """
+    GeoArrow kodlamasında koordinatlar düz diziler olarak okunur (WKB çözülmez); karışık geometri
+    tiplerinde (ValueError) veya geometry_encoding bilmeyen eski geopandas'ta (TypeError) WKB yazılır.
+    """
+    try:
+        gdf.to_parquet(path, geometry_encoding='geoarrow')
+    except (TypeError, ValueError):
+        gdf.to_parquet(path)
+
+
+class ResultCache:
+    """GeoDataFrame sonuçlarını GeoParquet dosyaları olarak tutan, boyut sınırlı (LRU) disk önbelleği."""
+
+    def __init__(self, directory=RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.invalidated = 0
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, 'index.sqlite')
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    file TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    sql TEXT NOT NULL,
+                    tables TEXT,
+                    signatures TEXT,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )""")
+
+    def _connect(self):
+        # Her çağrıda ayrı bağlantı: sorgu thread'leri aynı SQLite bağlantısını paylaşmaz
+        return sqlite3.connect(self._index_path, timeout=10)
+
+    def _path(self, file_name):
+        return os.path.join(self.directory, file_name)
+
+    def _remove(self, db, key, file_name):
+        db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._path(file_name))
+        except FileNotFoundError:
+            pass
+
+    def get(self, key, conn=None):
+        """
+        Kayıtlı sonucu GeoDataFrame olarak döndürür; yoksa None. conn verilirse (doğrulama açık) kaydın
+        tablolarının imzası veritabanındakiyle karşılaştırılır, farklıysa kayıt silinir ve None döner.
+        """
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT file, tables, signatures FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        file_name, tables, signatures = row
+        if conn is not None:
+            tables = json.loads(tables) if tables is not None else None
+            current = table_signatures(conn, tables) if tables else None # Tablosuz kayıt doğrulanamaz
+            if current is None or current != json.loads(signatures):
+                with self._lock, self._connect() as db:
+                    self._remove(db, key, file_name)
+                self.invalidated += 1
+                return None
+        import geopandas as gpd
+        try:
+            gdf = gpd.read_parquet(self._path(file_name), memory_map=True)
+        except (OSError, ValueError):
+            with self._lock, self._connect() as db:
+                self._remove(db, key, file_name)
+            self.misses += 1
+            return None
+        with self._lock, self._connect() as db:
+            db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return gdf
+
+    def put(self, key, gdf, sql, tables=None, signatures=None):
+        """
+        Sonucu yazar; tables/signatures verilirse kayıt doğrulamalı okunabilir. Önbelleğin
+        RESULT_CACHE_MAX_ENTRY_RATIO'sundan büyük sonuçlar saklanmaz. Yazılan bayt sayısını döndürür
+        (saklanmadıysa 0). Parquet'e çevrilemeyen sütun tipleri ValueError/TypeError yükseltir.
+        """
+        file_name = f"{key}.parquet"
+        temp_path = self._path(f"{key}.{threading.get_ident()}.tmp")
+        _write_parquet(gdf, temp_path)
+        size = os.path.getsize(temp_path)
+        if size > self.max_bytes * RESULT_CACHE_MAX_ENTRY_RATIO:
+            os.remove(temp_path)
+            return 0
+        os.replace(temp_path, self._path(file_name))
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                       (key, file_name, size, len(gdf), normalize_sql(sql),
+                        json.dumps(tables) if tables is not None else None,
+                        json.dumps(signatures) if signatures is not None else None, now, now))
+            self._evict(db)
+        return size
+
+    def _evict(self, db):
+        total = db.execute("SELECT coalesce(sum(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, file_name, size in db.execute("SELECT key, file, size FROM entries ORDER BY last_used").fetchall():
+            self._remove(db, key, file_name)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, self._connect() as db:
+            for key, file_name in db.execute("SELECT key, file FROM entries").fetchall():
+                self._remove(db, key, file_name)
+
+    def format_stats(self):
+        with self._lock, self._connect() as db:
+            entries, total = db.execute("SELECT count(*), coalesce(sum(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses + self.invalidated
+        hit_rate = f"%{100 * self.hits / lookups:.0f}" if lookups else "-"
+        return (f"Sonuç önbelleği: {entries} kayıt, {total / 1e6:.1f}/{self.max_bytes / 1e6:.0f} MB; "
+                f"bu oturumda {self.hits} isabet, {self.misses} ıskalama, {self.invalidated} geçersiz "
+                f"(isabet oranı {hit_rate}). Dizin: {self.directory}")
@@ -0,0 +1,331 @@
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# --- Harita Altlığı Karo Önbelleği (MBTiles) ---
+# Her altlık kendi MBTiles (SQLite) dosyasına yazılır; indirilen karolar kalıcıdır ve sonraki
+# açılışlarda, altlık değiştirilip geri dönüldüğünde veya çevrimdışı modda ağa gidilmeden okunur.
+# Arka plandaki ön yükleyici (sınırlı thread havuzu) görünen kapsamın komşu karolarını ve bir
+# sonraki zoom seviyesini önceden indirir. Bu modül Tk içe aktarmaz; yerel bir karo sunucusuna
+# karşı tek başına test edilebilir (bkz. benchmarks/bench_tile_cache.py).
+TILE_CACHE_DIR = os.environ.get('GEOPG_TILE_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.geopg_cache', 'tiles')
+TILE_HTTP_TIMEOUT_S = 10
+TILE_USER_AGENT = "GeoPG"
+TILE_PREFETCH_WORKERS = 4          # Ön yükleme için eşzamanlı indirme sayısı
+TILE_PREFETCH_MAX_PENDING = 256    # Kuyrukta bekleyebilecek en fazla ön yükleme karosu
+TILE_PREFETCH_RING = 1             # Görünen kapsamın çevresinde ön yüklenen karo halkası
+TILE_PREFETCH_LIMIT = 160          # Tek bir görünüm için planlanan en fazla karo
+
+_IMAGE_FORMATS = ((b'\x89PNG', 'png'), (b'\xff\xd8', 'jpg'), (b'RIFF', 'webp'))
+
+
+# --- Karo Hesapları (Web Mercator / XYZ) ---
+def lonlat_to_tile(lon, lat, zoom):
+    """Boylam/enlemin verilen zoom'daki kesirli XYZ karo koordinatını döndürür."""
+    lat = max(min(lat, 85.0511), -85.0511)
+    n = 2 ** zoom
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tile_range(bounds, zoom, ring=0):
+    """Kapsamı (min_lon, min_lat, max_lon, max_lat) örten karo aralığını (x0, y0, x1, y1; dahil) döndürür."""
+    min_lon, min_lat, max_lon, max_lat = bounds
+    x0, y0 = lonlat_to_tile(min_lon, max_lat, zoom)
+    x1, y1 = lonlat_to_tile(max_lon, min_lat, zoom)
+    last = 2 ** zoom - 1
+    return (max(int(x0) - ring, 0), max(int(y0) - ring, 0),
+            min(int(x1) + ring, last), min(int(y1) + ring, last))
+
+
+def prefetch_plan(bounds, zoom, max_zoom, ring=TILE_PREFETCH_RING, limit=TILE_PREFETCH_LIMIT):
+    """
+    Ön yüklenecek karoları (zoom, x, y) öncelik sırasıyla döndürür: önce görünen kapsamın çevresindeki
+    halka (kaydırma), sonra bir sonraki zoom'da kapsamı örten karolar (yakınlaştırma), merkeze yakın
+    olanlar önce. Görünen karolar harita tarafından zaten yüklendiği için plana alınmaz.
+    """
+    vx0, vy0, vx1, vy1 = tile_range(bounds, zoom)
+    cx, cy = (vx0 + vx1) / 2, (vy0 + vy1) / 2
+    x0, y0, x1, y1 = tile_range(bounds, zoom, ring)
+    neighbours = [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)
+                  if not (vx0 <= x <= vx1 and vy0 <= y <= vy1)]
+    neighbours.sort(key=lambda t: abs(t[1] - cx) + abs(t[2] - cy))
+    plan = neighbours
+    if zoom < max_zoom:
+        nx0, ny0, nx1, ny1 = tile_range(bounds, zoom + 1)
+        children = [(zoom + 1, x, y) for x in range(nx0, nx1 + 1) for y in range(ny0, ny1 + 1)]
+        children.sort(key=lambda t: abs(t[1] / 2 - cx) + abs(t[2] / 2 - cy))
+        plan = neighbours + children
+    return plan[:limit]
+
+
+def cache_path_for(name, url_template, directory=TILE_CACHE_DIR):
+    """Altlık adından okunabilir, URL şablonundan benzersiz bir MBTiles dosya yolu üretir."""
+    ascii_name = unicodedata.normalize('NFKD', name.replace('ı', 'i').replace('İ', 'I')).encode('ascii', 'ignore').decode()
+    slug = re.sub(r'[^a-z0-9]+', '_', ascii_name.lower()).strip('_') or 'altlik'
+    digest = hashlib.sha1(url_template.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(directory, f"{slug}_{digest}.mbtiles")
+
+
+class MBTilesCache:
+    """
+    Tek bir altlığın karolarını MBTiles şemasında tutan SQLite önbelleği. MBTiles satırları TMS
+    düzenindedir (y ekseni ters); dönüşüm burada yapılır, dışarıya XYZ koordinatları görünür.
+    Her thread kendi SQLite bağlantısını kullanır (harita widget'ı karoları 25 thread'le yükler).
+    """
+
+    def __init__(self, path, name, url_template):
+        self.path = path
+        self._local = threading.local()
+        self._format_known = False
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+                PRIMARY KEY (zoom_level, tile_column, tile_row)
+            )""")
+        db.executemany("INSERT OR IGNORE INTO metadata VALUES (?, ?)",
+                       [('name', name), ('type', 'baselayer'), ('version', '1.1'), ('description', url_template)])
+        self._format_known = db.execute("SELECT 1 FROM metadata WHERE name = 'format'").fetchone() is not None
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                                  check_same_thread=False)
+        return db
+
+    def get(self, zoom, x, y):
+        row = self._db().execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (zoom, x, 2 ** zoom - 1 - y)).fetchone()
+        return row[0] if row else None
+
+    def contains(self, zoom, x, y):
+        return self._db().execute(
+            "SELECT 1 FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (zoom, x, 2 ** zoom - 1 - y)).fetchone() is not None
+
+    def put(self, zoom, x, y, data):
+        db = self._db()
+        db.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", (zoom, x, 2 ** zoom - 1 - y, data))
+        if not self._format_known:
+            fmt = next((name for magic, name in _IMAGE_FORMATS if data.startswith(magic)), None)
+            if fmt:
+                db.execute("INSERT OR IGNORE INTO metadata VALUES ('format', ?)", (fmt,))
+                self._format_known = True
+
+    def stats(self):
+        count, size = self._db().execute("SELECT count(*), coalesce(sum(length(tile_data)), 0) FROM tiles").fetchone()
+        return count, size
+
+
+class TileSource:
+    """
+    Bir altlığın karolarını önce MBTiles önbelleğinden, yoksa (çevrimdışı değilse) sunucudan getirir.
+    Aynı karo aynı anda birden çok thread'den istenirse (harita + ön yükleyici) tek indirme yapılır.
+    Haritanın kendi istekleri için isabet oranı ve gecikme ölçülür; ön yükleme ayrıca sayılır.
+    """
+
+    def __init__(self, name, url_template, offline=False, directory=TILE_CACHE_DIR):
+        self.name = name
+        self.url_template = url_template
+        self.offline = offline
+        self.cache = MBTilesCache(cache_path_for(name, url_template, directory), name, url_template)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._local = threading.local()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.fetched = self.failed = self.offline_misses = self.prefetched = 0
+            self.hit_seconds = self.fetch_seconds = 0.0
+
+    def url_for(self, zoom, x, y):
+        return self.url_template.replace("{x}", str(x)).replace("{y}", str(y)).replace("{z}", str(zoom))
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers['User-Agent'] = TILE_USER_AGENT
+        return session
+
+    def get(self, zoom, x, y, prefetch=False):
+        """Karonun görüntü baytlarını döndürür; bulunamazsa (çevrimdışı, 404, ağ hatası) None."""
+        start = time.perf_counter()
+        data = self.cache.get(zoom, x, y)
+        if data is not None:
+            if not prefetch:
+                self._count('hits', 'hit_seconds', start)
+            return data
+        if self.offline:
+            if not prefetch:
+                self._count('offline_misses')
+            return None
+
+        key = (zoom, x, y)
+        with self._lock:
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+        if not owner:
+            # Başka bir thread aynı karoyu indiriyor; bitince önbellekten okunur
+            event.wait(TILE_HTTP_TIMEOUT_S)
+            data = self.cache.get(zoom, x, y)
+            if not prefetch:
+                self._count('fetched' if data is not None else 'failed', 'fetch_seconds', start)
+            return data
+        try:
+            data = self._download(zoom, x, y)
+            if data is not None:
+                self.cache.put(zoom, x, y, data)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+        if prefetch:
+            self._count('prefetched' if data is not None else 'failed')
+        else:
+            self._count('fetched' if data is not None else 'failed', 'fetch_seconds', start)
+        return data
+
+    def _download(self, zoom, x, y):
+        try:
+            response = self._session().get(self.url_for(zoom, x, y), timeout=TILE_HTTP_TIMEOUT_S)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200 or not response.content:
+            return None
+        return response.content
+
+    def _count(self, counter, seconds_attr=None, start=None):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            if seconds_attr:
+                setattr(self, seconds_attr, getattr(self, seconds_attr) + time.perf_counter() - start)
+
+    def format_stats(self):
+        with self._lock:
+            requests_seen = self.hits + self.fetched + self.failed + self.offline_misses
+            hit_rate = f"%{100 * self.hits / requests_seen:.0f}" if requests_seen else "-"
+            hit_ms = 1000 * self.hit_seconds / self.hits if self.hits else 0.0
+            fetch_ms = 1000 * self.fetch_seconds / self.fetched if self.fetched else 0.0
+            text = (f"{self.name}: {requests_seen} karo isteği, isabet oranı {hit_rate} "
+                    f"(önbellek ort. {hit_ms:.1f} ms, ağ ort. {fetch_ms:.0f} ms), "
+                    f"{self.fetched} indirildi, {self.failed} hata, {self.prefetched} ön yüklendi")
+        if self.offline_misses:
+            text += f", {self.offline_misses} çevrimdışı eksik"
+        count, size = self.cache.stats()
+        return f"{text}. Diskte {count} karo ({size / 1e6:.1f} MB): {self.cache.path}"
+
+
+class TilePrefetcher:
+    """
+    Karoları sınırlı bir thread havuzunda arka planda önbelleğe indirir. Her prefetch çağrısı yeni bir
+    nesil başlatır: görünüm değiştiğinde eski görünümün kuyrukta bekleyen karoları indirilmeden atlanır.
+    Yeni planda da bulunan ve hâlâ kuyrukta bekleyen karolar yeniden kuyruğa konmaz, yeni neslin
+    partisine devredilir; böylece ardışık görünümlerin ortak karoları atlanmaz.
+    """
+
+    def __init__(self, workers=TILE_PREFETCH_WORKERS, max_pending=TILE_PREFETCH_MAX_PENDING):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tile-prefetch")
+        self._lock = threading.Lock()
+        self._pending = {}   # (altlık, zoom, x, y) -> (nesil, parti, on_done): karonun o anki sahibi
+        self._generation = 0
+
+    @staticmethod
+    def _new_batch(source):
+        return {'source': source.name, 'tiles': 0, 'cached': 0, 'fetched': 0, 'failed': 0,
+                'skipped': 0, 'started': time.perf_counter(), 'remaining': 0}
+
+    @staticmethod
+    def _finish(batch, on_done):
+        batch['seconds'] = time.perf_counter() - batch['started']
+        if on_done is not None:
+            on_done(batch)
+
+    def prefetch(self, source, tiles, on_done=None):
+        """
+        tiles'ı (zoom, x, y) kuyruğa ekler; kuyruk doluysa fazlası atlanır. Parti bitince (hiç karo
+        kuyruğa girmediyse hemen) on_done(sonuç) çağrılır; çağrı ön yükleme thread'inden gelebileceği
+        için Tk'ye root.after ile aktarılmalıdır. Partiye giren karo sayısını döndürür.
+        """
+        finished = []
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            batch = self._new_batch(source)
+            queued = []
+            for tile in tiles:
+                key = (source.name,) + tuple(tile)
+                owner = self._pending.get(key)
+                if owner is not None:
+                    # Kuyruktaki (veya inmekte olan) karo yeni partiye devredilir, yeniden kuyruğa konmaz
+                    _, old_batch, old_on_done = owner
+                    if old_batch is not batch:
+                        old_batch['skipped'] += 1
+                        old_batch['remaining'] -= 1
+                        if old_batch['remaining'] == 0:
+                            finished.append((old_batch, old_on_done))
+                        self._pending[key] = (generation, batch, on_done)
+                        batch['tiles'] += 1
+                    continue
+                if len(self._pending) >= self.max_pending:
+                    break
+                self._pending[key] = (generation, batch, on_done)
+                batch['tiles'] += 1
+                queued.append((key, tile))
+            batch['remaining'] = batch['tiles']
+            if not batch['tiles']:
+                finished.append((batch, on_done))
+        for old_batch, old_on_done in finished:
+            self._finish(old_batch, old_on_done)
+        for key, tile in queued:
+            self._executor.submit(self._run, source, key, tile)
+        return batch['tiles']
+
+    def _run(self, source, key, tile):
+        with self._lock:
+            owner_generation = self._pending[key][0]
+        try:
+            if owner_generation != self._generation:
+                outcome = 'skipped' # Karo artık güncel planda değil
+            elif source.cache.contains(*tile):
+                outcome = 'cached'
+            else:
+                outcome = 'fetched' if source.get(*tile, prefetch=True) is not None else 'failed'
+        except Exception:
+            outcome = 'failed'
+        with self._lock:
+            owner = self._pending[key]
+            retry = outcome == 'skipped' and owner[0] == self._generation # Atladıktan hemen sonra devredildi
+            if not retry:
+                del self._pending[key]
+                _, batch, on_done = owner # İndirme sırasında devredildiyse yeni sahibin partisi
+                batch[outcome] += 1
+                batch['remaining'] -= 1
+                finished = batch['remaining'] == 0
+        if retry:
+            self._executor.submit(self._run, source, key, tile)
+        elif finished:
+            self._finish(batch, on_done)
+
+    def close(self):
+        """Bekleyen ön yüklemeleri iptal eder; çalışan indirmelerin bitmesi beklenmez."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,128 @@
+import datetime
+import re
+import numpy as np
+import pandas as pd
+
+# --- Sütun Tipi Tahmini ---
+# İlk parçadan alınan örnek üzerinden her sütun için en dar güvenli PostgreSQL tipi seçilir.
+# Değerler tek tek sınıflandırılır, sınıflar TYPE_MERGE kuralıyla birleştirilir; uyuşmayan
+# sınıflar (ör. tarih + sayı) sütunu TEXT'e düşürür. Yalnızca kaynaktaki yazımı bozmadan
+# geri üretilebilen biçimler tipe çevrilir: '007' gibi baştaki sıfırlar ve 01.02.2020 gibi
+# DateStyle'a bağlı tarihler TEXT kalır.
+TYPE_SAMPLE_ROWS = 10000
+# Makinede üretilmiş ondalıklar (Python/GIS araçlarının float yazımı) en fazla 17 anlamlı basamaklıdır ve
+# double precision'a kayıpsız geri okunur; daha uzun ondalıklar (ör. hassas parasal değerler) NUMERIC olur.
+DOUBLE_MAX_DIGITS = 17
+
+INT32_RANGE = (-2**31, 2**31 - 1)
+INT64_RANGE = (-2**63, 2**63 - 1)
+
+_INTEGER_RE = re.compile(r'^[+-]?(0|[1-9]\d*)$')
+_DECIMAL_RE = re.compile(r'^[+-]?(\d+\.\d*|\.\d+)$')
+_FLOAT_RE = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)[eE][+-]?\d+$')
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d{1,6})?)?([+-]\d{2}(:?\d{2})?|Z)?$')
+_BOOLEAN_VALUES = {'true', 'false', 't', 'f'}
+
+# Sınıf -> PostgreSQL tipi
+PG_TYPES = {
+    'boolean': 'BOOLEAN',
+    'integer': 'INTEGER',
+    'bigint': 'BIGINT',
+    'numeric': 'NUMERIC',
+    'double': 'DOUBLE PRECISION',
+    'date': 'DATE',
+    'timestamp': 'TIMESTAMP',
+    'timestamptz': 'TIMESTAMPTZ',
+    'text': 'TEXT',
+}
+
+# İki sınıfın ortak üst sınıfı; tabloda olmayan çiftler 'text' olur
+_NUMERIC_ORDER = ('integer', 'bigint', 'double', 'numeric')
+TYPE_MERGE = {
+    ('date', 'timestamp'): 'timestamp',
+}
+for _i, _a in enumerate(_NUMERIC_ORDER):
+    for _b in _NUMERIC_ORDER[_i + 1:]:
+        TYPE_MERGE[(_a, _b)] = _b
+
+
+def merge_types(a, b):
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    return TYPE_MERGE.get((a, b)) or TYPE_MERGE.get((b, a)) or 'text'
+
+
+def _integer_class(value):
+    if INT32_RANGE[0] <= value <= INT32_RANGE[1]:
+        return 'integer'
+    if INT64_RANGE[0] <= value <= INT64_RANGE[1]:
+        return 'bigint'
+    return 'numeric'
+
+
+def _significant_digits(text):
+    return len(text.lstrip('+-').replace('.', '').lstrip('0'))
+
+
+def classify_value(value):
+    """Tek bir hücre değerinin sınıfını döndürür; boş değerler için None."""
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return _integer_class(value)
+    if isinstance(value, float):
+        return None if value != value else 'double'  # NaN boş hücredir
+    if isinstance(value, datetime.datetime):
+        return 'timestamptz' if value.tzinfo is not None else 'timestamp'
+    if isinstance(value, datetime.date):
+        return 'date'
+    if not isinstance(value, str):
+        return 'text'
+
+    text = value
+    if text == "":
+        return None
+    if _INTEGER_RE.match(text):
+        return _integer_class(int(text))
+    if _DECIMAL_RE.match(text):
+        return 'double' if _significant_digits(text) <= DOUBLE_MAX_DIGITS else 'numeric'
+    if _FLOAT_RE.match(text):
+        return 'double'
+    if text.lower() in _BOOLEAN_VALUES:
+        return 'boolean'
+    if _DATE_RE.match(text):
+        try:
+            datetime.date.fromisoformat(text)
+            return 'date'
+        except ValueError:
+            return 'text'
+    if _TIMESTAMP_RE.match(text):
+        try:
+            parsed = datetime.datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return 'text'
+        return 'timestamptz' if parsed.tzinfo is not None else 'timestamp'
+    return 'text'
+
+
+def infer_series_type(series):
+    """Bir sütun örneğinin sınıfını döndürür. Tamamen boş sütunlar 'text' kalır."""
+    result = None
+    for value in pd.unique(series.dropna()):
+        result = merge_types(result, classify_value(value))
+        if result == 'text':
+            break
+    return result or 'text'
+
+
+def infer_column_types(frame, sample_rows=TYPE_SAMPLE_ROWS):
+    """DataFrame'in ilk sample_rows satırından her sütun için PostgreSQL tipini tahmin eder (sütun sırasıyla)."""
+    sample = frame.iloc[:sample_rows]
+    return [PG_TYPES[infer_series_type(sample.iloc[:, i])] for i in range(sample.shape[1])]
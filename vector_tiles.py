@@ -0,0 +1,371 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import map_render
+
+# --- PostGIS Vektör Karo (MVT) Katmanı ---
+# Kenar çubuğundaki tablolar bütün sonuç kümesi çekilmeden, görünen her karo için sunucuda
+# ST_AsMVT/ST_TileEnvelope ile üretilen Mapbox Vector Tile olarak okunur. Karolar istemcide
+# çözülüp karo boyutunda birer RGBA görüntüye çizilir ve bellekte LRU olarak saklanır; bir
+# karedeki maliyet tablonun boyutuna değil ekrandaki karo sayısına bağlıdır. Karo başına obje
+# sayısı VECTOR_TILE_MAX_FEATURES ile sınırlanır (düşük zoom'larda çok büyük karo üretilmez).
+MVT_EXTENT = 4096                  # Karo içi tam sayı koordinat aralığı
+MVT_BUFFER = 64                    # Karo kenarından taşan kısım (kenarlarda çizgi kopukluğunu önler)
+MVT_LAYER_NAME = 'katman'
+VECTOR_TILE_MAX_FEATURES = 20000
+VECTOR_TILE_CACHE_MAX_BYTES = 96 * 1024 * 1024   # Çizilmiş karo görüntüleri için bellek sınırı
+VECTOR_TILE_WORKERS = 4            # Eksik karoları paralel üreten thread (ve bağlantı) sayısı
+_EMPTY_TILE_COST = 64              # Boş karo kaydının LRU'da sayılan yaklaşık boyutu
+
+_MVT_POINT, _MVT_LINESTRING, _MVT_POLYGON = 1, 2, 3
+_CMD_MOVE_TO, _CMD_LINE_TO, _CMD_CLOSE_PATH = 1, 2, 7
+
+
+def quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def tile_sql(schema, table, geom_col, srid, max_features=VECTOR_TILE_MAX_FEATURES):
+    """
+    Bir karonun MVT içeriğini ve karo için taranan obje sayısını döndüren sorgu (parametreler: z, x, y).
+    Kapsam filtresi tablonun kendi SRID'sinde yapılır, böylece geometri sütunundaki GiST indeksi kullanılır.
+    SRID'si bilinmeyen (0) tablolar EPSG:4326 kabul edilir.
+    """
+    geom = f"t.{quote_ident(geom_col)}"
+    if srid == 3857:
+        mercator_geom, envelope, filter_geom = geom, "b.env", geom
+    elif srid:
+        mercator_geom, envelope, filter_geom = f"ST_Transform({geom}, 3857)", f"ST_Transform(b.env, {int(srid)})", geom
+    else:
+        mercator_geom = f"ST_Transform(ST_SetSRID({geom}, 4326), 3857)"
+        envelope, filter_geom = "ST_Transform(b.env, 4326)", f"ST_SetSRID({geom}, 4326)"
+    return f"""
+        WITH b AS (SELECT ST_TileEnvelope(%s, %s, %s) AS env),
+        features AS (
+            SELECT ST_AsMVTGeom({mercator_geom}, b.env, {MVT_EXTENT}, {MVT_BUFFER}, true) AS geom
+            FROM {quote_ident(schema)}.{quote_ident(table)} t, b
+            WHERE {filter_geom} && {envelope}
+            LIMIT {int(max_features)}
+        )
+        SELECT ST_AsMVT(f.*, '{MVT_LAYER_NAME}', {MVT_EXTENT}, 'geom') FILTER (WHERE f.geom IS NOT NULL), count(*)
+        FROM features f"""
+
+
+# --- MVT (protobuf) Çözücü ---
+# Yalnızca geometriler okunur (öznitelik yok); bağımlılık eklememek için protobuf elle çözülür.
+def _read_varint(buf, pos):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(buf):
+    """Protobuf mesajının (alan_no, değer) çiftlerini verir; değer varint için int, uzunluklu alan için memoryview."""
+    pos, end = 0, len(buf)
+    while pos < end:
+        key, pos = _read_varint(buf, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(buf, pos)
+        elif wire_type == 2:
+            length, pos = _read_varint(buf, pos)
+            value = buf[pos:pos + length]
+            pos += length
+        elif wire_type == 1:
+            value, pos = None, pos + 8
+        elif wire_type == 5:
+            value, pos = None, pos + 4
+        else:
+            raise ValueError(f"Desteklenmeyen protobuf alan tipi: {wire_type}")
+        yield field, value
+
+
+def decode_packed_varints(data):
+    """Paketlenmiş varint dizisini NumPy ile topluca çözer (geometri komutları en fazla 5 bayt)."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts + 1
+    values = np.zeros(len(ends), dtype=np.int64)
+    payload = (raw & 0x7F).astype(np.int64)
+    for k in range(int(lengths.max())):
+        has_byte = lengths > k
+        values[has_byte] |= payload[starts[has_byte] + k] << (7 * k)
+    return values
+
+
+def _zigzag(values):
+    return (values >> 1) ^ -(values & 1)
+
+
+class TileParts:
+    """
+    Çözülmüş karo geometrileri: explode_draw_parts ile aynı düzende parça türleri, başlangıç/uzunluk
+    indeksleri ve karo birimindeki (0..extent, y aşağı) koordinatlar.
+    """
+
+    def __init__(self, kinds, starts, counts, coords, extent):
+        self.kinds = kinds
+        self.starts = starts
+        self.counts = counts
+        self.coords = coords
+        self.extent = extent
+
+    def __len__(self):
+        return len(self.kinds)
+
+
+def _command_segments(commands, feature_bounds):
+    """
+    Geometri komutlarını yorumlar (yalnızca komut başına Python; köşeler vektörel işlenir).
+    Köşe parametresi dizilerinin (komut dizisindeki ilk x indeksi, köşe sayısı) listesini, her
+    parçanın (tür, ilk köşe, köşe sayısı) bilgisini ve her objenin ilk köşe numarasını döndürür.
+    """
+    segments, parts, feature_first_vertex = [], [], []
+    vertices = 0
+    for geom_type, start, end in feature_bounds:
+        feature_first_vertex.append(vertices)
+        i = start
+        ring_start = None
+        while i < end:
+            command, count = commands[i] & 0x7, commands[i] >> 3
+            i += 1
+            if command == _CMD_CLOSE_PATH:
+                continue
+            count = min(count, (end - i) // 2)
+            segments.append((i, count))
+            i += 2 * count
+            if command == _CMD_MOVE_TO:
+                if geom_type == _MVT_POINT:
+                    parts.extend(('point', vertices + k, 1) for k in range(count))
+                else:
+                    ring_start = vertices
+                    parts.append(['polygon' if geom_type == _MVT_POLYGON else 'path', ring_start, count])
+            elif command == _CMD_LINE_TO and ring_start is not None:
+                parts[-1][2] += count
+            vertices += count
+    return segments, parts, feature_first_vertex
+
+
+def decode_tile(payload):
+    """
+    MVT içeriğini (bytes) çözer ve TileParts döndürür. Bütün objelerin geometri komutları tek bir
+    dizide birleştirilip varint/zigzag çözme ve koordinat birikimi (delta -> mutlak) NumPy ile yapılır.
+    """
+    extent = MVT_EXTENT
+    chunks, feature_types = [], []
+    for field, layer in _iter_fields(memoryview(payload)):
+        if field != 3:
+            continue
+        for layer_field, value in _iter_fields(layer):
+            if layer_field == 5:
+                extent = value
+            elif layer_field == 2:
+                geom_type, geometry = 0, None
+                for feature_field, feature_value in _iter_fields(value):
+                    if feature_field == 3:
+                        geom_type = feature_value
+                    elif feature_field == 4:
+                        geometry = feature_value
+                if geometry is not None and geom_type in (_MVT_POINT, _MVT_LINESTRING, _MVT_POLYGON):
+                    chunks.append(bytes(geometry))
+                    feature_types.append(geom_type)
+    empty = TileParts([], np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros((0, 2)), extent)
+    if not chunks:
+        return empty
+
+    raw = b''.join(chunks)
+    values = decode_packed_varints(raw)
+    # Objelerin komut dizisindeki sınırları: her parçadaki varint sonu (0x80'den küçük bayt) sayısı
+    terminators = np.frombuffer(raw, dtype=np.uint8) < 0x80
+    byte_starts = np.cumsum([0] + [len(chunk) for chunk in chunks[:-1]])
+    per_feature = np.add.reduceat(terminators, byte_starts).astype(np.int64)
+    ends = np.cumsum(per_feature)
+    feature_bounds = zip(feature_types, (ends - per_feature).tolist(), ends.tolist())
+
+    segments, parts, feature_first_vertex = _command_segments(values.tolist(), feature_bounds)
+    if not parts:
+        return empty
+    segment_starts, segment_counts = np.asarray(segments, dtype=np.int64).reshape(-1, 2).T
+    offsets = np.cumsum(segment_counts) - segment_counts
+    vertex_index = (np.repeat(segment_starts, segment_counts)
+                    + 2 * (np.arange(int(segment_counts.sum())) - np.repeat(offsets, segment_counts)))
+    deltas = np.column_stack([_zigzag(values[vertex_index]), _zigzag(values[vertex_index + 1])])
+    coords = np.cumsum(deltas, axis=0)
+    # İmleç her objede sıfırdan başlar: birikimli toplamdan objenin başlangıcındaki değer çıkarılır
+    first = np.asarray(feature_first_vertex, dtype=np.int64)
+    counts = np.diff(np.append(first, len(coords)))
+    base = np.zeros((len(first), 2), dtype=np.int64)
+    has_before = first > 0
+    base[has_before] = coords[first[has_before] - 1]
+    coords -= np.repeat(base, counts, axis=0)
+
+    kinds = [part[0] for part in parts]
+    starts = np.array([part[1] for part in parts], dtype=np.int64)
+    part_counts = np.array([part[2] for part in parts], dtype=np.int64)
+    return TileParts(kinds, starts, part_counts, coords, extent)
+
+
+def ring_areas(coords, starts, counts):
+    """Halkaların işaretli alanları (shoelace); MVT'de dış halkalar pozitif, delikler negatiftir."""
+    areas = np.zeros(len(starts))
+    nonempty = counts > 0
+    starts, counts = starts[nonempty], counts[nonempty]
+    if not len(starts):
+        return areas
+    offsets = np.cumsum(counts) - counts
+    index = np.repeat(starts - offsets, counts) + np.arange(int(counts.sum()))
+    following = index + 1
+    following[offsets + counts - 1] = starts # Her halkanın son köşesi ilk köşesine bağlanır
+    x, y = coords[:, 0].astype(np.float64), coords[:, 1].astype(np.float64)
+    cross = x[index] * y[following] - x[following] * y[index]
+    areas[nonempty] = 0.5 * np.add.reduceat(cross, offsets)
+    return areas
+
+
+def render_tile(parts, tile_size=256):
+    """
+    Çözülmüş karoyu tile_size boyutlu RGBA görüntüye çizer (raster motoruyla aynı renkler).
+    Çokgen dolgusu tek bir maskeye çizilir; dış halkalar maskeyi doldurur, delikler siler.
+    Boş karo için None döner.
+    """
+    if not len(parts):
+        return None
+    from PIL import Image, ImageDraw
+
+    scale = tile_size / parts.extent
+    flat = np.round(parts.coords * scale).astype(np.int64).ravel().tolist()
+    kinds = parts.kinds
+    starts, counts = parts.starts.tolist(), parts.counts.tolist()
+    is_polygon = np.array([kind == 'polygon' for kind in kinds])
+    areas = np.zeros(len(kinds))
+    if is_polygon.any():
+        areas[is_polygon] = ring_areas(parts.coords, parts.starts[is_polygon], parts.counts[is_polygon])
+    exterior = (areas > 0).tolist()
+
+    image = Image.new('RGBA', (tile_size, tile_size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image, 'RGBA')
+    if is_polygon.any():
+        mask = Image.new('L', (tile_size, tile_size), 0)
+        mask_draw = ImageDraw.Draw(mask)
+        for part in np.flatnonzero(is_polygon).tolist():
+            if counts[part] >= 3:
+                xy = flat[2 * starts[part]:2 * (starts[part] + counts[part])]
+                mask_draw.polygon(xy, fill=255 if exterior[part] else 0)
+        image.paste(Image.new('RGBA', image.size, map_render.RASTER_POLYGON_FILL), (0, 0), mask)
+
+    radius = map_render.RASTER_POINT_RADIUS
+    drawn_points = set()
+    for kind, start, count in zip(kinds, starts, counts):
+        xy = flat[2 * start:2 * (start + count)]
+        if kind == 'polygon':
+            if count >= 3:
+                draw.line(xy + xy[:2], fill=map_render.RASTER_OUTLINE, width=1)
+        elif kind == 'path':
+            if count >= 2:
+                draw.line(xy, fill=map_render.RASTER_OUTLINE, width=2)
+        elif (xy[0], xy[1]) not in drawn_points: # Aynı piksele düşen noktalar bir kez çizilir
+            drawn_points.add((xy[0], xy[1]))
+            draw.ellipse((xy[0] - radius, xy[1] - radius, xy[0] + radius, xy[1] + radius),
+                         fill=map_render.RASTER_POINT)
+    return image
+
+
+class TileImageLRU:
+    """Çizilmiş karo görüntülerini toplam bayt sınırıyla tutan LRU önbellek (boş karolar None olarak saklanır)."""
+
+    def __init__(self, max_bytes=VECTOR_TILE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(bulundu, görüntü) döndürür; bulunan kayıt en yeni kullanılan olarak işaretlenir."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def put(self, key, image):
+        size = image.width * image.height * 4 if image is not None else _EMPTY_TILE_COST
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._entries[key] = (image, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class VectorTileLayer:
+    """geometry_columns'daki bir tablonun karo katmanı: karo üretimi (sunucu), çözme/çizim ve LRU önbellek."""
+
+    def __init__(self, schema, table, geom_col, srid, geom_type=None, tile_size=256,
+                 max_bytes=VECTOR_TILE_CACHE_MAX_BYTES):
+        self.name = f"{schema}.{table}"
+        self.geom_type = geom_type
+        self.tile_size = tile_size
+        self.sql = tile_sql(schema, table, geom_col, srid)
+        self.cache = TileImageLRU(max_bytes)
+        self._lock = threading.Lock()
+        self.hits = self.loaded = self.truncated = self.payload_bytes = 0
+        self.query_seconds = self.render_seconds = 0.0
+
+    def cached(self, key):
+        found, image = self.cache.get(key)
+        if found:
+            with self._lock:
+                self.hits += 1
+        return found, image
+
+    def load_tile(self, conn, zoom, x, y):
+        """Karoyu sunucuda üretir, çözer, çizer ve önbelleğe koyar. Görüntü (boş karo için None) döner."""
+        start = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute(self.sql, (zoom, x, y))
+            payload, scanned = cur.fetchone()
+        payload = bytes(payload) if payload is not None else b''
+        query_done = time.perf_counter()
+        image = render_tile(decode_tile(payload), self.tile_size) if payload else None
+        self.cache.put((zoom, x, y), image)
+        with self._lock:
+            self.loaded += 1
+            self.payload_bytes += len(payload)
+            self.truncated += scanned >= VECTOR_TILE_MAX_FEATURES
+            self.query_seconds += query_done - start
+            self.render_seconds += time.perf_counter() - query_done
+        return image
+
+    def format_stats(self):
+        with self._lock:
+            lookups = self.hits + self.loaded
+            hit_rate = f"%{100 * self.hits / lookups:.0f}" if lookups else "-"
+            query_ms = 1000 * self.query_seconds / self.loaded if self.loaded else 0.0
+            render_ms = 1000 * self.render_seconds / self.loaded if self.loaded else 0.0
+            text = (f"Karo katmanı {self.name}: {self.loaded} karo üretildi "
+                    f"(ort. sunucu {query_ms:.0f} ms, çözme+çizim {render_ms:.0f} ms, "
+                    f"{self.payload_bytes / 1e6:.1f} MB MVT), isabet oranı {hit_rate}; bellekte {len(self.cache)} karo "
+                    f"({self.cache.total_bytes / 1e6:.0f}/{self.cache.max_bytes / 1e6:.0f} MB, {self.cache.evictions} atıldı)")
+        if self.truncated:
+            text += f". {self.truncated} karo {VECTOR_TILE_MAX_FEATURES} obje sınırında kırpıldı"
+        return text